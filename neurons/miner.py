@@ -16,7 +16,16 @@
 # DEALINGS IN THE SOFTWARE.
 
 import time
+
+_import_start = time.perf_counter()
+
+import os
+import json
 import typing
+import asyncio
+import functools
+import contextlib
+import concurrent.futures
 import bittensor as bt
 import pytesseract
 
@@ -37,12 +46,117 @@ class Miner(BaseMinerNeuron):
     """
 
     def __init__(self, config=None):
-        super(Miner, self).__init__(config=config)
+        startup = {'imports': time.perf_counter() - _import_start}
+        with ocr_subnet.utils.metrics.timed(startup, 'chain'):
+            super(Miner, self).__init__(config=config)
+
+        # Also serve the streaming protocol, which sends the sections of each band of the page as soon as it is done.
+        self.axon.attach(
+            forward_fn=self.forward_stream,
+            blacklist_fn=self.blacklist_stream,
+            priority_fn=self.priority_stream,
+        )
 
         bt.logging.info(f'pytesseract version: {pytesseract.__version__}')
-        bt.logging.info(f'tesseract version: {pytesseract.get_tesseract_version()}')
 
+        start = time.perf_counter()
+
+        # Executor for the CPU bound part of forward. With a process executor each process owns its own OCR engine,
+        # otherwise a single long-lived OCR engine is shared by all threads.
+        workers = self.workers = self.config.neuron.executor_workers or os.cpu_count()
+        if self.config.neuron.executor == 'process':
+            self.engine = None
+            if self.config.neuron.tile_height > 0:
+                bt.logging.warning(
+                    "Each executor process OCRs the bands of a tiled page one after another. Use --neuron.executor "
+                    "thread with the worker pool engine to OCR bands in parallel."
+                )
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=ocr_subnet.miner.ocr.init_process,
+                initargs=(self.config.neuron.ocr_lang,),
+            )
+        else:
+            self.engine = ocr_subnet.miner.create_engine(self.config)
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+        # Picks how much accuracy each request can afford from the time it has left.
+        self.policy = ocr_subnet.miner.OCRPolicy(mode=self.config.neuron.ocr_mode)
+
+        # Limits the number of requests handed to the executor and sheds requests that would miss their deadline even
+        # in the fastest OCR mode.
+        self.admission = ocr_subnet.miner.AdmissionController(
+            capacity=self.config.neuron.max_pending or 2 * workers,
+            min_cost=self.policy.fastest().cost,
+        )
 
+        # Optionally group concurrent requests into batches which share a single OCR engine call. Images in a batch
+        # must be OCR'd with the same settings, so there is a batcher per mode.
+        self.batchers = {}
+        if self.config.neuron.batch_window > 0:
+            for mode in self.policy.modes:
+                self.batchers[mode.name] = ocr_subnet.miner.MicroBatcher(
+                    functools.partial(
+                        ocr_subnet.miner.ocr.extract_batch,
+                        engine=self.engine,
+                        tile_height=self.config.neuron.tile_height,
+                        tile_overlap=self.config.neuron.tile_overlap,
+                        mode=mode,
+                        steps=self.config.neuron.preprocess,
+                    ),
+                    executor=self.executor,
+                    window=self.config.neuron.batch_window / 1000,
+                    max_batch_size=self.config.neuron.max_batch_size,
+                )
+
+        # Results of recently seen images, keyed by content hash.
+        self.cache = ocr_subnet.miner.ResultCache(
+            maxsize=self.config.neuron.cache_size, ttl=self.config.neuron.cache_ttl
+        )
+        startup['engine'] = time.perf_counter() - start
+
+        # Rolling latency histograms of each stage of forward, optionally served as JSON on localhost.
+        self.stage_metrics = ocr_subnet.utils.metrics.StageMetrics()
+        self.metrics_server = None
+        if self.config.neuron.metrics_port:
+            self.metrics_server = ocr_subnet.utils.metrics.serve_metrics(self.config.neuron.metrics_port, self.metrics)
+            bt.logging.info(f"Serving miner metrics on http://127.0.0.1:{self.config.neuron.metrics_port}/metrics")
+
+        # Run a synthetic page through every worker before the axon is served, so that the first real request doesn't
+        # pay for loading models and page faults.
+        with ocr_subnet.utils.metrics.timed(startup, 'warmup'):
+            self.warmup(max(workers, getattr(self.engine, 'num_workers', 0)))
+
+        bt.logging.info(
+            "Startup time: " + ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in startup.items())
+            + f", total={sum(startup.values()):.2f}s"
+        )
+
+    def warmup(self, n: int):
+        """
+        Runs n copies of a synthetic page through the executor at once in each mode the OCR policy can choose, so that
+        every executor and engine worker has started and loaded its models, and every mode the miner serves has a
+        measured latency. The latencies seed the admission controller's and the OCR policy's estimates.
+        """
+        page = ocr_subnet.miner.ocr.synthetic_page()
+        for mode in self.policy.choices():
+            futures = [
+                self.executor.submit(
+                    ocr_subnet.miner.extract,
+                    page,
+                    self.engine,
+                    self.config.neuron.tile_height,
+                    self.config.neuron.tile_overlap,
+                    mode,
+                    self.config.neuron.preprocess,
+                )
+                for _ in range(n)
+            ]
+            for future in futures:
+                _, timings = future.result()
+                # Recorded relative to the accurate mode, as in AdmissionController.release
+                self.admission.latencies.append(sum(timings.values()) / mode.cost)
+                self.policy.record(mode, sum(timings.values()))
 
     async def forward(
         self, synapse: ocr_subnet.protocol.OCRSynapse
@@ -50,6 +164,11 @@ class Miner(BaseMinerNeuron):
         """
         Processes the incoming OCR synapse and attaches the response to the synapse.
 
+        Repeated images are served from the result cache, and concurrent requests for the same image share a single
+        OCR run. Everything else goes through `extract`. Only results of the most accurate OCR mode are cached, so a
+        page OCR'd in a faster mode under load is never served to a later request which has time for the accurate one.
+        Identical concurrent requests still share a faster result, as they arrive under the same load.
+
         Args:
             synapse (ocr_subnet.protocol.OCRSynapse): The synapse object containing the image data. 
 
@@ -57,39 +176,175 @@ class Miner(BaseMinerNeuron):
             ocr_subnet.protocol.OCRSynapse: The synapse object with the 'response' field set to the extracted data.
 
         """
-        # Get image data
-        image = ocr_subnet.utils.image.deserialize(base64_string=synapse.base64_image)
+        with self.stage_metrics.time('total'):
+            key = self.cache.key(synapse.base64_image)
 
-        # Use pytesseract to get the data
-        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+            result = await self.cache.get_or_compute(
+                key, lambda: self.extract(synapse), cacheable=lambda result: result[1] == self.policy.best()
+            )
 
-        response = []
-        for i in range(len(data['text'])):
-            if data['text'][i].strip() != '':  # This filters out empty text results
-                x1, y1, width, height = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
-                if width * height < 10:  # This filters out small boxes (likely noise)
-                    continue
+            # Attach response to synapse and return it.
+            synapse.response = result[0] if result is not None else None
 
-                x2, y2 = x1 + width, y1 + height
+        return synapse
 
-                # Here we don't have font information, so we'll omit that.
-                # Pytesseract does not extract font family or size information.
-                entry = {
-                    'position': [x1, y1, x2, y2],
-                    'text': data['text'][i]
-                }
-                response.append(entry)
+    async def extract(
+        self, synapse: ocr_subnet.protocol.OCRSynapse
+    ) -> typing.Optional[typing.Tuple[typing.List[dict], ocr_subnet.miner.OCRMode]]:
+        """
+        Runs the CPU bound work (decoding, OCR and post-processing) in the miner's executor so that the axon's event loop
+        stays free to accept, blacklist and prioritize other requests.
 
-        # Merge together words into sections, which are on the same line (same y value) and are close together (small distance in x)
-        response = ocr_subnet.utils.process.group_and_merge_boxes(response)
+        Requests pass through admission control first: when the executor is busy they queue by stake and deadline, and
+        requests which cannot finish before the synapse times out are shed straight away, as they would earn no reward.
+        Admitted requests are OCR'd in the most accurate mode expected to finish in the time left.
 
-        # Sort sections by y, then sort by x so that they read left to right and top to bottom
-        response = sorted(response, key=lambda item: (item['position'][1], item['position'][0]))
+        Args:
+            synapse (ocr_subnet.protocol.OCRSynapse): The synapse object containing the image data.
 
-        # Attach response to synapse and return it.
-        synapse.response = response
+        Returns:
+            Optional[Tuple[List[dict], OCRMode]]: The extracted sections and the mode they were extracted in, or None if
+            the request was shed.
+        """
+        mode = await self.admit(synapse)
+        if mode is None:
+            return None
+
+        start = time.perf_counter()
+        try:
+            if self.batchers:
+                response, timings = await self.batchers[mode.name].submit(synapse.base64_image)
+            else:
+                response, timings = await asyncio.get_running_loop().run_in_executor(
+                    self.executor,
+                    ocr_subnet.miner.extract,
+                    synapse.base64_image,
+                    self.engine,
+                    self.config.neuron.tile_height,
+                    self.config.neuron.tile_overlap,
+                    mode,
+                    self.config.neuron.preprocess,
+                )
+        finally:
+            self.admission.release(time.perf_counter() - start, mode.cost)
+
+        self.policy.record(mode, sum(timings.values()))
+        self.stage_metrics.record_all(timings)
+        return response, mode
+
+    async def admit(self, synapse: bt.Synapse) -> typing.Optional[ocr_subnet.miner.OCRMode]:
+        """
+        Waits for the request to be admitted and picks its OCR mode from the time it has left. Callers must call
+        self.admission.release() once an admitted request is done.
 
-        return synapse
+        Returns:
+            Optional[OCRMode]: The mode to use, or None if the request was shed.
+        """
+        deadline = time.monotonic() + synapse.timeout - self.config.neuron.deadline_margin
+        priority = await self.priority(synapse)
+
+        with self.stage_metrics.time('queue'):
+            admitted = await self.admission.acquire(priority, deadline)
+        if not admitted:
+            bt.logging.debug(f"Shedding request from {synapse.dendrite.hotkey} which cannot finish before its deadline")
+            return None
+
+        mode = self.policy.choose(deadline - time.monotonic(), load=self.admission.running / self.workers)
+        bt.logging.debug(f"OCR mode for request from {synapse.dendrite.hotkey}: {mode.name}")
+        return mode
+
+    async def forward_stream(
+        self, synapse: ocr_subnet.protocol.OCRStreamingSynapse
+    ) -> bt.StreamingSynapse.BTStreamingResponse:
+        """
+        Streaming counterpart of forward: the page is OCR'd as horizontal bands and the sections of each band are sent
+        as a line of JSON as soon as the band is done, so validators get partial results before the deadline.
+
+        Args:
+            synapse (ocr_subnet.protocol.OCRStreamingSynapse): The synapse object containing the image data.
+
+        Returns:
+            BTStreamingResponse: The streaming response sent back to the validator.
+        """
+
+        async def stream(send):
+            with self.stage_metrics.time('total'):
+                async for sections in self.extract_stream(synapse):
+                    await send({"type": "http.response.body", "body": json.dumps(sections).encode() + b"\n", "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        return synapse.create_streaming_response(stream)
+
+    async def extract_stream(self, synapse: ocr_subnet.protocol.OCRStreamingSynapse) -> typing.AsyncIterator[typing.List[dict]]:
+        """
+        Yields the sections of each band as they are extracted, going through the same admission control and OCR mode
+        selection as extract. Each band is pulled from ocr_subnet.miner.ocr.extract_stream in the executor. Process
+        executors cannot share a generator with the event loop, so they extract the whole page and send it as one chunk.
+        """
+        mode = await self.admit(synapse)
+        if mode is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        timings = {}
+        start = time.perf_counter()
+        try:
+            if self.engine is None:
+                response, timings = await loop.run_in_executor(
+                    self.executor,
+                    ocr_subnet.miner.extract,
+                    synapse.base64_image,
+                    None,
+                    self.config.neuron.tile_height,
+                    self.config.neuron.tile_overlap,
+                    mode,
+                    self.config.neuron.preprocess,
+                )
+                yield response
+            else:
+                # Streaming needs bands, so fall back to a default band height when tiling is disabled
+                bands = ocr_subnet.miner.ocr.extract_stream(
+                    synapse.base64_image,
+                    self.engine,
+                    tile_height=self.config.neuron.tile_height or 400,
+                    tile_overlap=self.config.neuron.tile_overlap,
+                    mode=mode,
+                    steps=self.config.neuron.preprocess,
+                    timings=timings,
+                )
+                try:
+                    while True:
+                        sections = await loop.run_in_executor(self.executor, next, bands, None)
+                        if sections is None:
+                            break
+                        yield sections
+                finally:
+                    # Cancels the remaining bands, unless cancellation left a band being read in the executor
+                    with contextlib.suppress(ValueError):
+                        bands.close()
+        finally:
+            self.admission.release(time.perf_counter() - start, mode.cost)
+
+        self.policy.record(mode, sum(timings.values()))
+        self.stage_metrics.record_all(timings)
+
+    def metrics(self) -> dict:
+        """Returns the miner's stage latencies, cache, admission, OCR mode and batching metrics."""
+        return {
+            'stages': self.stage_metrics.summary(),
+            'cache': self.cache.metrics(),
+            'admission': self.admission.metrics(),
+            'modes': self.policy.metrics(),
+            'batching': {name: batcher.metrics() for name, batcher in self.batchers.items()} or None,
+        }
+
+    def log_metrics(self):
+        bt.logging.info(f"Stage latencies: {self.stage_metrics.format()}")
+        bt.logging.info(f"Result cache: {self.cache.metrics()}")
+        bt.logging.info(f"Admission: {self.admission.metrics()}")
+        bt.logging.info(f"OCR modes: {self.policy.metrics()}")
+        for name, batcher in self.batchers.items():
+            bt.logging.info(f"Batching ({name}): {batcher.metrics()}")
 
     async def blacklist(
         self, synapse: ocr_subnet.protocol.OCRSynapse
@@ -118,19 +373,36 @@ class Miner(BaseMinerNeuron):
         - Consider blacklisting entities that are not validators or have insufficient stake.
 
         In practice it would be wise to blacklist requests from entities that are not validators, or do not have
-        enough stake. This can be checked via metagraph.S and metagraph.validator_permit. You can always attain
-        the uid of the sender via a metagraph.hotkeys.index( synapse.dendrite.hotkey ) call.
+        enough stake. The uid, stake and validator permit of the sender are available in constant time via
+        self.hotkey_index[ synapse.dendrite.hotkey ], which is rebuilt on every metagraph resync. Requests from
+        non-registered hotkeys and from hotkeys without a validator permit are handled according to the
+        blacklist.allow_non_registered and blacklist.force_validator_permit config flags.
 
         Otherwise, allow the request to be processed further.
         """
         # TODO(developer): Define how miners should blacklist requests.
-        if synapse.dendrite.hotkey not in self.metagraph.hotkeys:
+        caller = self.hotkey_index.get(synapse.dendrite.hotkey)
+        if caller is None:
+            if self.config.blacklist.allow_non_registered:
+                bt.logging.trace(
+                    f"Not Blacklisting unrecognized hotkey {synapse.dendrite.hotkey}"
+                )
+                return False, "Allowing non-registered hotkey"
+
             # Ignore requests from unrecognized entities.
             bt.logging.trace(
                 f"Blacklisting unrecognized hotkey {synapse.dendrite.hotkey}"
             )
             return True, "Unrecognized hotkey"
 
+        _, _, validator_permit = caller
+        if self.config.blacklist.force_validator_permit and not validator_permit:
+            # Ignore requests from entities which are not validators.
+            bt.logging.trace(
+                f"Blacklisting non-validator hotkey {synapse.dendrite.hotkey}"
+            )
+            return True, "Non-validator hotkey"
+
         bt.logging.trace(
             f"Not Blacklisting recognized hotkey {synapse.dendrite.hotkey}"
         )
@@ -157,21 +429,43 @@ class Miner(BaseMinerNeuron):
         - A higher stake results in a higher priority value.
         """
         # TODO(developer): Define how miners should prioritize requests.
-        caller_uid = self.metagraph.hotkeys.index(
+        caller = self.hotkey_index.get(
             synapse.dendrite.hotkey
-        )  # Get the caller index.
-        prirority = float(
-            self.metagraph.S[caller_uid]
-        )  # Return the stake as the priority.
+        )  # Get the caller's (uid, stake, validator_permit).
+        prirority = (
+            caller[1] if caller is not None else 0.0
+        )  # Return the stake as the priority, non-registered callers have none.
         bt.logging.trace(
             f"Prioritizing {synapse.dendrite.hotkey} with value: ", prirority
         )
         return prirority
 
+    async def blacklist_stream(
+        self, synapse: ocr_subnet.protocol.OCRStreamingSynapse
+    ) -> typing.Tuple[bool, str]:
+        """Applies the same blacklist to streaming requests. The axon requires a function typed for each synapse."""
+        return await self.blacklist(synapse)
+
+    async def priority_stream(self, synapse: ocr_subnet.protocol.OCRStreamingSynapse) -> float:
+        """Applies the same priority to streaming requests. The axon requires a function typed for each synapse."""
+        return await self.priority(synapse)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.engine is not None:
+            self.engine.close()
+
 
 # This is the main function, which runs the miner.
 if __name__ == "__main__":
     with Miner() as miner:
+        last_metrics_log = time.time()
         while True:
             bt.logging.info("Miner running...", time.time())
+            if time.time() - last_metrics_log >= miner.config.neuron.metrics_log_interval:
+                miner.log_metrics()
+                last_metrics_log = time.time()
             time.sleep(5)
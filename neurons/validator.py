@@ -17,7 +17,9 @@
 
 import os
 import time
-import hashlib
+import uuid
+import asyncio
+import functools
 import bittensor as bt
 
 import ocr_subnet
@@ -38,9 +40,6 @@ class Validator(BaseValidatorNeuron):
     def __init__(self, config=None):
         super(Validator, self).__init__(config=config)
 
-        bt.logging.info("load_state()")
-        self.load_state()
-
         self.image_dir = './data/images/'
         if not os.path.exists(self.image_dir):
             os.makedirs(self.image_dir)
@@ -48,49 +47,188 @@ class Validator(BaseValidatorNeuron):
 
     async def forward(self):
         """
-        The forward function is called by the validator every time step.
+        The forward function is called by the validator every time step when the pipeline is disabled.
 
-        It consists of 3 important steps:
+        It consists of 3 important steps, which are also the stages of the validator's pipeline:
         - Generate a challenge for the miners (in this case it creates a synthetic invoice image)
         - Query the miners with the challenge
         - Score the responses from the miners
 
+        Every step either awaits the network or runs its CPU bound work in an executor, so the forwards gathered by
+        concurrent_forward overlap, and raising num_concurrent_forwards scales the number of queries in flight.
+
         Args:
             self (:obj:`bittensor.neuron.Neuron`): The neuron object which contains all the necessary state for the validator.
 
         """
+        challenge = await self.score(await self.query(await self.generate()))
+
+        # Update the scores based on the rewards. You may want to define your own update_scores function for custom behavior.
+        self.update_scores(challenge['rewards'], challenge['uids'], challenge.get('components'))
+
+    async def generate(self) -> dict:
+        """
+        Picks the miners to query and creates a synthetic invoice for them. Rendering the invoice is CPU bound, so it
+        runs in an executor to leave the event loop free for queries in flight.
 
-        # get_random_uids is an example method, but you can replace it with your own.
-        miner_uids = ocr_subnet.utils.uids.get_random_uids(self, k=min(self.config.neuron.sample_size, self.metagraph.n.item()))
+        Returns:
+            dict: The challenge, with the miner 'uids' and the 'image_data' of the invoice.
+        """
+        # The sampling scheduler picks the miners, uniformly at random unless another strategy is configured.
+        miner_uids = self.sample_uids(k=self.config.neuron.sample_size)
 
-        # make a hash from the timestamp
-        filename = hashlib.md5(str(time.time()).encode()).hexdigest()
+        # Unique file name, as several challenges may be generated at the same time
+        filename = uuid.uuid4().hex
 
         # Create a random image and load it.
-        image_data = ocr_subnet.validator.generate.invoice(path=os.path.join(self.image_dir, f"{filename}.pdf"), corrupt=True)
+        image_data = await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                ocr_subnet.validator.generate.invoice, path=os.path.join(self.image_dir, f"{filename}.pdf"), corrupt=True
+            ),
+        )
+        return {'uids': miner_uids, 'image_data': image_data}
+
+    async def query(self, challenge: dict) -> dict:
+        """
+        Sends the challenge to its miners. With streaming enabled, the sections are scored as they arrive, so the
+        challenge comes back with its 'rewards' already attached.
+
+        Returns:
+            dict: The challenge, with the miners' 'responses' or 'rewards'.
+        """
+        miner_uids, image_data = challenge['uids'], challenge['image_data']
+        if self.config.neuron.stream:
+            challenge['rewards'], challenge['components'] = await self.query_stream(miner_uids, image_data)
+            return challenge
 
         # Create synapse object to send to the miner and attach the image.
         synapse = ocr_subnet.protocol.OCRSynapse(base64_image = image_data['base64_image'])
 
-        # The dendrite client queries the network.
-        responses = self.dendrite.query(
-            # Send the query to selected miner axons in the network.
+        if self.cutoff.mode == "full":
+            # The dendrite client queries the network without blocking the event loop.
+            challenge['responses'] = await self.dendrite.forward(
+                # Send the query to selected miner axons in the network.
+                axons=[self.metagraph.axons[uid] for uid in miner_uids],
+                # Pass the synapse to the miner.
+                synapse=synapse,
+                timeout=self.config.neuron.timeout,
+                # Do not deserialize the response so that we have access to the raw response.
+                deserialize=False,
+            )
+        else:
+            challenge['responses'], challenge['cut_off'] = await self.query_with_cutoff(miner_uids, synapse)
+
+        # Log the results for monitoring purposes.
+        bt.logging.info(f"Received responses: {challenge['responses']}")
+        return challenge
+
+    async def score(self, challenge: dict) -> dict:
+        """
+        Scores the miners' responses. Matching sections to labels is CPU bound, so it runs in an executor.
+
+        Returns:
+            dict: The challenge, with the miners' 'rewards'.
+        """
+        if 'rewards' not in challenge:
+            challenge['rewards'], challenge['components'] = await asyncio.get_running_loop().run_in_executor(
+                None,
+                functools.partial(
+                    ocr_subnet.validator.reward.get_rewards,
+                    self,
+                    labels=challenge['image_data']['labels'],
+                    responses=challenge['responses'],
+                    components=True,
+                ),
+            )
+            # The latency of miners cut off is unknown, rather than the timeout
+            if challenge.get('cut_off'):
+                challenge['components']['latency'][challenge['cut_off']] = float('nan')
+
+        bt.logging.info(f"Scored responses: {challenge['rewards']}")
+        return challenge
+
+    async def query_with_cutoff(self, miner_uids, synapse):
+        """
+        Queries each miner separately and stops waiting for them as decided by the query cutoff, either once a quorum
+        has answered or at each miner's deadline from its latency history. Miners cut off are scored as timeouts, and
+        their latency is recorded as unknown.
+
+        Args:
+            miner_uids (List[int]): The uids to query.
+            synapse (OCRSynapse): The challenge to send.
+
+        Returns:
+            List[OCRSynapse]: The response of each miner.
+            List[int]: The indices of the miners which were cut off.
+        """
+        with self.scores_lock:
+            deadlines = self.cutoff.deadlines(self.history, miner_uids)
+
+        responses = await self.cutoff.gather(
+            [
+                self.dendrite.call(
+                    target_axon=self.metagraph.axons[uid],
+                    synapse=synapse.copy(),
+                    timeout=self.config.neuron.timeout,
+                    deserialize=False,
+                )
+                for uid in miner_uids
+            ],
+            deadlines,
+            is_answer=lambda response: response.is_success,
+        )
+        cut_off = [i for i, response in enumerate(responses) if response is None]
+        return [response if response is not None else self.timed_out(synapse) for response in responses], cut_off
+
+    def timed_out(self, synapse):
+        """A response without predictions, marked as timed out like the ones the dendrite returns."""
+        response = ocr_subnet.protocol.OCRSynapse(base64_image=synapse.base64_image)
+        response.dendrite.status_code = 408
+        response.dendrite.status_message = "Cut off by the validator before the timeout"
+        return response
+
+    async def query_stream(self, miner_uids, image_data):
+        """
+        Queries the miners with the streaming protocol and scores each miner's sections while the rest of the page is
+        still being processed. Reading stops at the timeout, and the sections received by then are scored, so a slow
+        miner gets partial credit rather than nothing.
+
+        Args:
+            miner_uids (List[int]): The uids to query.
+            image_data (dict): The challenge, with the 'base64_image' and its 'labels'.
+
+        Returns:
+            torch.FloatTensor: The reward of each miner.
+            dict: The components of the rewards, as returned by get_rewards.
+        """
+        synapse = ocr_subnet.protocol.OCRStreamingSynapse(base64_image=image_data['base64_image'])
+        timeout = self.config.neuron.timeout
+        deadline = time.monotonic() + timeout
+
+        streams = await self.dendrite.forward(
             axons=[self.metagraph.axons[uid] for uid in miner_uids],
-            # Pass the synapse to the miner.
             synapse=synapse,
-            # Do not deserialize the response so that we have access to the raw response.
+            timeout=timeout,
             deserialize=False,
+            streaming=True,
         )
 
-        # Log the results for monitoring purposes.
-        bt.logging.info(f"Received responses: {responses}")
-
-        rewards = ocr_subnet.validator.reward.get_rewards(self, labels=image_data['labels'], responses=responses)
-
-        bt.logging.info(f"Scored responses: {rewards}")
+        scorers = [
+            ocr_subnet.validator.reward.IncrementalScorer(
+                image_data['labels'],
+                alpha_p=self.config.neuron.alpha_position,
+                alpha_f=self.config.neuron.alpha_font,
+                alpha_t=self.config.neuron.alpha_text,
+            )
+            for _ in miner_uids
+        ]
+        times_elapsed = await asyncio.gather(
+            *[ocr_subnet.validator.stream.read_stream(stream, scorer, deadline) for stream, scorer in zip(streams, scorers)]
+        )
 
-        # Update the scores based on the rewards. You may want to define your own update_scores function for custom behavior.
-        self.update_scores(rewards, miner_uids)
+        bt.logging.info(f"Received sections: {[len(scorer.columns) for scorer in scorers]}")
+        return ocr_subnet.validator.reward.get_stream_rewards(self, scorers, times_elapsed, components=True)
 
 
 # The main function parses the configuration and runs the validator.
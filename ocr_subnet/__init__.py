@@ -26,5 +26,15 @@ __spec_version__ = (
 # Import all submodules.
 from . import protocol
 from . import base
-from . import validator
+from . import miner
 from . import utils
+
+
+def __getattr__(name):
+    # The validator package pulls in heavy dependencies (scipy, faker, reportlab, PyMuPDF) which miners never use, so
+    # it is only imported on first access.
+    if name == "validator":
+        import importlib
+
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,175 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import queue
+import pickle
+import threading
+import traceback
+import torch
+import bittensor as bt
+
+from typing import List, Optional
+
+
+class Checkpoint:
+    """
+    Persists a validator's state without blocking the forward path.
+
+    Full snapshots of the state are written by a background thread to a temporary file which is then renamed over the
+    checkpoint, so a crash mid-write leaves the previous snapshot intact. Between snapshots, every score update is
+    appended to a delta log as a small `(seq, step, uids, scores)` record, which is replayed on top of the snapshot when
+    loading. Records hold the new scores of the updated uids rather than the rewards, so replaying one is a plain
+    assignment. Writing a snapshot truncates the log, and the sequence number stored with each snapshot tells which
+    records it already contains, in case the process died between the two.
+
+    Records are queued in the order they are made, so callers must make them under the same lock as the state they
+    describe.
+
+    Args:
+    - path (str): Path of the snapshot. The delta log is written next to it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.deltas_path = path + ".deltas"
+        self.seq = 0
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread: threading.Thread = None
+        self.deltas = None
+        self.errors = 0
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Writes every queued record and stops the writer."""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def flush(self):
+        """Blocks until every queued record is written."""
+        self.queue.join()
+
+    def snapshot(self, state: dict):
+        """Queues a full snapshot of the state, which must not be mutated afterwards."""
+        with self.lock:
+            self.start()
+            self.queue.put(("snapshot", dict(state, seq=self.seq)))
+
+    def delta(self, step: int, uids: List[int], scores: List[float]):
+        """Queues the new scores of the uids updated at a step."""
+        with self.lock:
+            self.start()
+            self.seq += 1
+            self.queue.put(("delta", (self.seq, step, list(uids), list(scores))))
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                kind, record = item
+                if kind == "snapshot":
+                    self.write_snapshot(record)
+                else:
+                    self.write_delta(record)
+            except Exception:
+                self.errors += 1
+                bt.logging.warning(f"Failed to write checkpoint: {traceback.format_exc()}")
+            finally:
+                self.queue.task_done()
+
+    def write_snapshot(self, state: dict):
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            torch.save(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+        # The snapshot contains every delta written so far.
+        if self.deltas is not None:
+            self.deltas.close()
+        self.deltas = open(self.deltas_path, "wb")
+
+    def write_delta(self, record: tuple):
+        if self.deltas is None:
+            self.deltas = open(self.deltas_path, "ab")
+        pickle.dump(record, self.deltas)
+        self.deltas.flush()
+
+    def read_deltas(self) -> List[tuple]:
+        records = []
+        if not os.path.exists(self.deltas_path):
+            return records
+        with open(self.deltas_path, "rb") as f:
+            while True:
+                try:
+                    records.append(pickle.load(f))
+                except EOFError:
+                    break
+                except Exception:
+                    # A record cut short by a crash ends the log.
+                    bt.logging.warning(f"Ignoring truncated checkpoint delta after {len(records)} records.")
+                    break
+        return records
+
+    def load(self) -> Optional[dict]:
+        """
+        Loads the last snapshot and replays the deltas written after it.
+
+        Returns:
+        - dict: The state, or None if there is no readable snapshot.
+        """
+        if not os.path.exists(self.path):
+            bt.logging.info(f"No checkpoint found at {self.path}, starting from scratch.")
+            return None
+
+        try:
+            state = torch.load(self.path)
+        except Exception:
+            bt.logging.warning(f"Ignoring unreadable checkpoint at {self.path}: {traceback.format_exc()}")
+            return None
+
+        seq = state.pop("seq", 0)
+        scores = state["scores"]
+        replayed = 0
+        for record_seq, step, uids, values in self.read_deltas():
+            if record_seq <= seq:
+                continue
+            seq = record_seq
+            valid = [(uid, value) for uid, value in zip(uids, values) if uid < len(scores)]
+            if valid:
+                index, values = zip(*valid)
+                scores[torch.tensor(index)] = torch.tensor(values, dtype=scores.dtype)
+            state["step"] = max(state["step"], step + 1)
+            replayed += 1
+
+        bt.logging.info(f"Loaded checkpoint at step {state['step']}, replayed {replayed} deltas.")
+        with self.lock:
+            self.seq = max(self.seq, seq)
+        return state
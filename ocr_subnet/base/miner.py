@@ -16,7 +16,6 @@
 # DEALINGS IN THE SOFTWARE.
 
 import time
-import torch
 import asyncio
 import threading
 import traceback
@@ -44,6 +43,9 @@ class BaseMinerNeuron(BaseNeuron):
                 "You are allowing non-registered entities to send requests to your miner. This is a security risk."
             )
 
+        # Index of hotkey -> (uid, stake, validator_permit) used to gate requests in constant time.
+        self.build_hotkey_index()
+
         # The axon handles request processing, allowing validators to send this miner requests.
         self.axon = bt.axon(wallet=self.wallet, port=self.config.axon.port)
 
@@ -183,6 +185,9 @@ class BaseMinerNeuron(BaseNeuron):
         Raises:
             Exception: If there's an error while setting weights, the exception is logged for diagnosis.
         """
+        # Only needed here, so miners don't pay for importing torch at startup.
+        import torch
+
         try:
             # --- query the chain for the most current number of peers on the network
             chain_weights = torch.zeros(
@@ -213,3 +218,19 @@ class BaseMinerNeuron(BaseNeuron):
 
         # Sync the metagraph.
         self.metagraph.sync(subtensor=self.subtensor)
+
+        # Rebuild the hotkey index from the new metagraph state.
+        self.build_hotkey_index()
+
+    def build_hotkey_index(self):
+        """
+        Builds a dict mapping each registered hotkey to its (uid, stake, validator_permit), so that blacklist and
+        priority can look up the caller without scanning the metagraph. The new index is built completely before it
+        replaces the old one, so request handlers always read a consistent index without taking a lock.
+        """
+        stakes = self.metagraph.S.tolist()
+        validator_permits = self.metagraph.validator_permit.tolist()
+        self.hotkey_index = {
+            hotkey: (uid, float(stakes[uid]), bool(validator_permits[uid]))
+            for uid, hotkey in enumerate(self.metagraph.hotkeys)
+        }
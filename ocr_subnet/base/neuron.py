@@ -24,7 +24,7 @@ from abc import ABC, abstractmethod
 
 # Sync calls set weights and also resyncs the metagraph.
 from ocr_subnet.utils.config import check_config, add_args, config
-from ocr_subnet.utils.misc import ttl_get_block
+from ocr_subnet.utils.misc import BlockClock
 from ocr_subnet import __spec_version__ as spec_version
 
 
@@ -54,7 +54,12 @@ class BaseNeuron(ABC):
 
     @property
     def block(self):
-        return ttl_get_block(self)
+        # When chain interaction runs in the background, its thread owns the subtensor and anchors the clock on every
+        # block it reads, so the block is only ever extrapolated here
+        chain_sync = getattr(self, "chain_sync", None)
+        if chain_sync is not None and chain_sync.is_alive():
+            return self.block_clock.estimate()
+        return self.block_clock.now()
 
     def __init__(self, config=None):
         base_config = copy.deepcopy(config or BaseNeuron.config())
@@ -83,6 +88,13 @@ class BaseNeuron(ABC):
         self.subtensor = bt.subtensor(config=self.config)
         bt.logging.info(f"Subtensor: {self.subtensor}")
 
+        # Extrapolates the current block between occasional reads from the chain.
+        self.block_clock = BlockClock(
+            self.subtensor.get_current_block,
+            block_time=self.config.neuron.block_time,
+            interval=self.config.neuron.block_clock_interval,
+        )
+
         # The metagraph holds the state of the network, letting us know about other validators and miners.
         self.metagraph = self.subtensor.metagraph(self.config.netuid)
         bt.logging.info(f"Metagraph: {self.metagraph}")
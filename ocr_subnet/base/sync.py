@@ -0,0 +1,94 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import threading
+import traceback
+import bittensor as bt
+
+
+class ChainSync:
+    """
+    Runs a neuron's chain interaction (registration check, metagraph resync, weight setting and saving state) in a
+    background thread on its own cadence, so that RPC latency spikes never stall the forward path.
+
+    The thread owns the neuron's subtensor connection, which is not safe to share between threads. It publishes the
+    last block it read and anchors the neuron's block clock on it, so that the forward path can read `neuron.block`
+    without an RPC. The neuron must publish new metagraphs by assigning a new object rather than syncing the current
+    one in place. Failing syncs are retried with exponential backoff.
+
+    Args:
+    - neuron (BaseNeuron): The neuron to sync.
+    - interval (float): Seconds between syncs.
+    - backoff (float): Seconds before the first retry of a failed sync, doubled after each consecutive failure.
+    - max_backoff (float): Upper bound on the time between retries.
+    """
+
+    def __init__(self, neuron, interval: float = 60.0, backoff: float = 2.0, max_backoff: float = 300.0):
+        self.neuron = neuron
+        self.interval = interval
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.block = None
+        self.failures = 0
+        self.last_sync = None
+        self.stop_event = threading.Event()
+        self.thread: threading.Thread = None
+
+    def start(self):
+        if self.is_alive():
+            return
+        # Read the block before returning, so the forward path never sees None
+        self.read_block()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def read_block(self):
+        self.block = self.neuron.subtensor.get_current_block()
+        block_clock = getattr(self.neuron, "block_clock", None)
+        if block_clock is not None:
+            block_clock.observe(self.block)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.read_block()
+                self.neuron.sync()
+                self.failures = 0
+                self.last_sync = self.block
+                wait = self.interval
+            except SystemExit:
+                # check_registered exits when the hotkey was deregistered, which only ends this thread
+                self.neuron.should_exit = True
+                return
+            except Exception:
+                self.failures += 1
+                wait = min(self.max_backoff, self.backoff * 2 ** (self.failures - 1))
+                bt.logging.warning(
+                    f"Chain sync failed ({self.failures} in a row), retrying in {wait:.0f}s: {traceback.format_exc()}"
+                )
+
+            self.stop_event.wait(wait)
@@ -16,16 +16,24 @@
 # DEALINGS IN THE SOFTWARE.
 
 
-import copy
 import torch
 import asyncio
 import threading
 import bittensor as bt
 
+from abc import abstractmethod
 from typing import List
 from traceback import print_exception
 
 from ocr_subnet.base.neuron import BaseNeuron
+from ocr_subnet.base.sync import ChainSync
+from ocr_subnet.base.checkpoint import Checkpoint
+from ocr_subnet.utils.uids import cached_available_uids
+from ocr_subnet.utils.sampling import SamplingScheduler
+from ocr_subnet.utils.pipeline import Pipeline
+from ocr_subnet.utils.metagraph import axons_fingerprint, diff_hotkeys, hotkeys_fingerprint
+from ocr_subnet.validator.history import History
+from ocr_subnet.validator.cutoff import QueryCutoff
 
 
 class BaseValidatorNeuron(BaseNeuron):
@@ -36,8 +44,10 @@ class BaseValidatorNeuron(BaseNeuron):
     def __init__(self, config=None):
         super().__init__(config=config)
 
-        # Save a copy of the hotkeys to local memory.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        # Save the hotkeys, and fingerprints used to detect changes on resync.
+        self.hotkeys = list(self.metagraph.hotkeys)
+        self.hotkeys_fingerprint = hotkeys_fingerprint(self.hotkeys)
+        self.axons_fingerprint = axons_fingerprint(self.metagraph.axons)
 
         # Dendrite lets us send messages to other nodes (axons) in the network.
         self.dendrite = bt.dendrite(wallet=self.wallet)
@@ -47,6 +57,33 @@ class BaseValidatorNeuron(BaseNeuron):
         bt.logging.info("Building validation weights.")
         self.scores = torch.zeros_like(self.metagraph.S, dtype=torch.float32)
 
+        # Scores are updated by the forward path and resized by the chain sync thread.
+        self.scores_lock = threading.Lock()
+
+        # Picks the miners to query each step from their query history.
+        self.sampler = SamplingScheduler(self.config.neuron.sampling_strategy, n=self.metagraph.n.item())
+
+        # Keeps the last queries of each miner, for analytics and to restore the sampler's statistics on restart.
+        self.history = History(n=self.metagraph.n.item(), size=self.config.neuron.history_size)
+
+        # Decides when to stop waiting for the miners' responses.
+        self.cutoff = QueryCutoff(
+            self.config.neuron.query_mode,
+            timeout=self.config.neuron.timeout,
+            quorum=self.config.neuron.quorum,
+            grace=self.config.neuron.quorum_grace,
+            quantile=self.config.neuron.deadline_quantile,
+            multiplier=self.config.neuron.deadline_multiplier,
+            min_deadline=self.config.neuron.min_deadline,
+        )
+
+        # Runs chain interaction in a background thread once the validator is running.
+        self.chain_sync = ChainSync(self, interval=self.config.neuron.sync_interval)
+
+        # Writes the state in a background thread. Load it before the initial sync, which saves the state.
+        self.checkpoint = Checkpoint(self.config.neuron.full_path + "/state.pt")
+        self.load_state()
+
         # Init sync with the network. Updates the metagraph.
         self.sync()
 
@@ -94,6 +131,65 @@ class BaseValidatorNeuron(BaseNeuron):
         ]
         await asyncio.gather(*coroutines)
 
+    @abstractmethod
+    async def generate(self) -> dict:
+        """Pipeline stage which creates a challenge, a dict with at least the 'uids' of the miners to query."""
+        ...
+
+    @abstractmethod
+    async def query(self, challenge: dict) -> dict:
+        """Pipeline stage which sends the challenge to its miners and attaches their responses."""
+        ...
+
+    @abstractmethod
+    async def score(self, challenge: dict) -> dict:
+        """Pipeline stage which attaches the 'rewards' of the challenge's miners."""
+        ...
+
+    async def update(self, challenge: dict):
+        """
+        Last pipeline stage, which updates the moving average scores with the challenge's rewards and syncs with the
+        chain. It runs with a concurrency of one, so score updates are never interleaved.
+        """
+        self.update_scores(challenge["rewards"], challenge["uids"], challenge.get("components"))
+        self.step += 1
+
+        if self.config.neuron.disable_background_sync:
+            # Sync metagraph and potentially set weights, without blocking the other stages.
+            await asyncio.get_running_loop().run_in_executor(None, self.sync)
+
+    def sample_uids(self, k: int) -> torch.LongTensor:
+        """Picks k miners to query from the uids available in the current metagraph, using the sampling scheduler."""
+        available = cached_available_uids(self)
+        with self.scores_lock:
+            return self.sampler.sample(available, k, self.step)
+
+    def build_pipeline(self) -> Pipeline:
+        return Pipeline(
+            [
+                ("generate", self.generate, self.config.neuron.generate_concurrency),
+                ("query", self.query, self.config.neuron.query_concurrency),
+                ("score", self.score, self.config.neuron.score_concurrency),
+                ("update", self.update, 1),
+            ],
+            queue_size=self.config.neuron.pipeline_queue_size,
+        )
+
+    def log_pipeline(self, metrics: dict):
+        bt.logging.info(
+            f"step({self.step}) block({self.block}) pipeline: "
+            + ", ".join(
+                f"{name}(utilization={stage['utilization']:.0%}, items={stage['items']}, waiting={stage['waiting']}, errors={stage['errors']})"
+                for name, stage in metrics.items()
+            )
+        )
+        if self.cutoff.mode != "full":
+            cutoff = self.cutoff.metrics()
+            bt.logging.info(
+                f"query cutoff({self.cutoff.mode}): {cutoff['cutoffs']}/{cutoff['steps']} steps cut off, "
+                f"{cutoff['saved']:.1f}s saved, {cutoff['dropped']} responses dropped of which {cutoff['late']} answered late"
+            )
+
     def run(self):
         """
         Initiates and manages the main loop for the miner on the Bittensor network. The main loop handles graceful shutdown on keyboard interrupts and logs unforeseen errors.
@@ -101,6 +197,8 @@ class BaseValidatorNeuron(BaseNeuron):
         This function performs the following primary tasks:
         1. Check for registration on the Bittensor network.
         2. Continuously forwards queries to the miners on the network, rewarding their responses and updating the scores accordingly.
+           By default this runs as a pipeline of generate, query, score and update stages connected by bounded queues, so that
+           challenges are generated and scored while other challenges wait on miners.
         3. Periodically resynchronizes with the chain; updating the metagraph with the latest network state and setting weights.
 
         The essence of the validator's operations is in the forward function, which is called every step. The forward function is responsible for querying the network and scoring the responses.
@@ -114,8 +212,12 @@ class BaseValidatorNeuron(BaseNeuron):
             Exception: For unforeseen errors during the miner's operation, which are logged for diagnosis.
         """
 
-        # Check that validator is registered on the network.
-        self.sync()
+        # Check that validator is registered on the network. From here on chain interaction runs in the background,
+        # unless disabled, and the background thread syncs as soon as it starts.
+        if self.config.neuron.disable_background_sync:
+            self.sync()
+        else:
+            self.chain_sync.start()
 
         bt.logging.info(
             f"Running validator {self.axon} on network: {self.config.subtensor.chain_endpoint} with netuid: {self.config.netuid}"
@@ -125,7 +227,18 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # This loop maintains the validator's operations until intentionally stopped.
         try:
-            while True:
+            if not self.config.neuron.disable_pipeline:
+                # Stages run concurrently, each working on a different challenge.
+                self.pipeline = self.build_pipeline()
+                self.loop.run_until_complete(
+                    self.pipeline.run(
+                        lambda: self.should_exit,
+                        report=self.log_pipeline,
+                        report_interval=self.config.neuron.pipeline_log_interval,
+                    )
+                )
+
+            while not self.should_exit:
                 bt.logging.info(f"step({self.step}) block({self.block})")
 
                 # Run multiple forwards concurrently.
@@ -136,12 +249,15 @@ class BaseValidatorNeuron(BaseNeuron):
                     break
 
                 # Sync metagraph and potentially set weights.
-                self.sync()
+                if self.config.neuron.disable_background_sync:
+                    self.sync()
 
                 self.step += 1
 
         # If someone intentionally stops the validator, it'll safely terminate operations.
         except KeyboardInterrupt:
+            self.chain_sync.stop()
+            self.checkpoint.stop()
             self.axon.stop()
             bt.logging.success("Validator killed by keyboard interrupt.")
             exit()
@@ -174,6 +290,8 @@ class BaseValidatorNeuron(BaseNeuron):
             bt.logging.debug("Stopping validator in background thread.")
             self.should_exit = True
             self.thread.join(5)
+            self.chain_sync.stop()
+            self.checkpoint.stop()
             self.is_running = False
             bt.logging.debug("Stopped")
 
@@ -198,6 +316,8 @@ class BaseValidatorNeuron(BaseNeuron):
             bt.logging.debug("Stopping validator in background thread.")
             self.should_exit = True
             self.thread.join(5)
+            self.chain_sync.stop()
+            self.checkpoint.stop()
             self.is_running = False
             bt.logging.debug("Stopped")
 
@@ -214,7 +334,9 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # Calculate the average reward for each uid across non-zero values.
         # Replace any NaN values with 0.
-        raw_weights = torch.nn.functional.normalize(self.scores, p=1, dim=0)
+        with self.scores_lock:
+            scores = self.scores.clone()
+        raw_weights = torch.nn.functional.normalize(scores, p=1, dim=0)
         bt.logging.trace("raw_weights", raw_weights)
         bt.logging.trace("top10 values", raw_weights.sort()[0])
         bt.logging.trace("top10 uids", raw_weights.sort()[1])
@@ -246,43 +368,66 @@ class BaseValidatorNeuron(BaseNeuron):
         bt.logging.info(f"Set weights: {processed_weights}")
 
     def resync_metagraph(self):
-        """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
+        """
+        Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph.
+
+        A new metagraph object is synced and then swapped in with a single assignment, so the forward path, which may
+        run concurrently with this in the chain sync thread, always sees a complete metagraph. The previous metagraph
+        is never copied: fingerprints of its hotkeys and axons tell whether anything changed, and only the uids which
+        changed hands, appeared or disappeared have their scores updated.
+        """
         bt.logging.info("resync_metagraph()")
 
-        # Copies state of metagraph before syncing.
-        previous_metagraph = copy.deepcopy(self.metagraph)
+        # Sync a new metagraph rather than updating the one in use.
+        self.set_metagraph(self.subtensor.metagraph(self.config.netuid))
 
-        # Sync the metagraph.
-        self.metagraph.sync(subtensor=self.subtensor)
+    def set_metagraph(self, metagraph: "bt.metagraph"):
+        """Swaps in a metagraph, updating the scores of the uids whose hotkey differs from the hotkeys in use."""
+        fingerprint = axons_fingerprint(metagraph.axons)
+        if fingerprint != self.axons_fingerprint:
+            bt.logging.info("Metagraph axons updated")
+            self.axons_fingerprint = fingerprint
 
-        # Check if the metagraph axon info has changed.
-        if previous_metagraph.axons == self.metagraph.axons:
+        # Check if any uid changed hands or the metagraph changed size.
+        fingerprint = hotkeys_fingerprint(metagraph.hotkeys)
+        if fingerprint == self.hotkeys_fingerprint:
+            self.metagraph = metagraph
             return
 
+        diff = diff_hotkeys(self.hotkeys, metagraph.hotkeys)
         bt.logging.info(
-            "Metagraph updated, re-syncing hotkeys, dendrite pool and moving averages"
+            f"Metagraph hotkeys updated, re-syncing moving averages: {len(diff.replaced)} replaced, "
+            f"{len(diff.added)} added and {len(diff.removed)} removed uids"
         )
-        # Zero out all hotkeys that have been replaced.
-        for uid, hotkey in enumerate(self.hotkeys):
-            if hotkey != self.metagraph.hotkeys[uid]:
-                self.scores[uid] = 0  # hotkey has been replaced
-
-        # Check to see if the metagraph has changed size.
-        # If so, we need to add new hotkeys and moving averages.
-        if len(self.hotkeys) < len(self.metagraph.hotkeys):
-            # Update the size of the moving average scores.
-            new_moving_average = torch.zeros((self.metagraph.n)).to(
-                self.device
-            )
-            min_len = min(len(self.hotkeys), len(self.scores))
-            new_moving_average[:min_len] = self.scores[:min_len]
-            self.scores = new_moving_average
-
-        # Update the hotkeys.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
-
-    def update_scores(self, rewards: torch.FloatTensor, uids: List[int]):
-        """Performs exponential moving average on the scores based on the rewards received from the miners."""
+        with self.scores_lock:
+            # Zero out all hotkeys that have been replaced.
+            if diff.replaced:
+                self.scores[torch.tensor(diff.replaced)] = 0
+                self.sampler.reset(diff.replaced)
+                self.history.reset(diff.replaced)
+
+            # Check to see if the metagraph has changed size.
+            # If so, we need to resize the moving averages, keeping the scores of the remaining uids.
+            if len(self.scores) != metagraph.n:
+                new_moving_average = torch.zeros((metagraph.n)).to(
+                    self.device
+                )
+                min_len = min(len(self.scores), metagraph.n)
+                new_moving_average[:min_len] = self.scores[:min_len]
+                self.scores = new_moving_average
+                self.sampler.resize(metagraph.n.item())
+                self.history.resize(metagraph.n.item())
+
+            # Update the hotkeys. The new metagraph is never mutated, so its list can be shared.
+            self.hotkeys = metagraph.hotkeys
+            self.hotkeys_fingerprint = fingerprint
+            self.metagraph = metagraph
+
+    def update_scores(self, rewards: torch.FloatTensor, uids: List[int], components: dict = None):
+        """
+        Performs exponential moving average on the scores based on the rewards received from the miners, and records
+        the rewards, with their components if given (see ocr_subnet.validator.reward.get_rewards), in the history.
+        """
 
         # Check if rewards contains NaN values.
         if torch.isnan(rewards).any():
@@ -290,41 +435,66 @@ class BaseValidatorNeuron(BaseNeuron):
             # Replace any NaN values in rewards with 0.
             rewards = torch.nan_to_num(rewards, 0)
 
-        # Compute forward pass rewards, assumes uids are mutually exclusive.
-        # shape: [ metagraph.n ]
-        scattered_rewards: torch.FloatTensor = self.scores.scatter(
-            0, torch.tensor(uids).to(self.device), rewards
-        ).to(self.device)
-        bt.logging.debug(f"Scattered rewards: {rewards}")
-
-        # Update scores with rewards produced by this step.
-        # shape: [ metagraph.n ]
-        alpha: float = self.config.neuron.moving_average_alpha
-        self.scores: torch.FloatTensor = alpha * scattered_rewards + (
-            1 - alpha
-        ) * self.scores.to(self.device)
+        with self.scores_lock:
+            # Compute forward pass rewards, assumes uids are mutually exclusive.
+            # shape: [ metagraph.n ]
+            scattered_rewards: torch.FloatTensor = self.scores.scatter(
+                0, torch.tensor(uids).to(self.device), rewards
+            ).to(self.device)
+            bt.logging.debug(f"Scattered rewards: {rewards}")
+
+            # Update scores with rewards produced by this step.
+            # shape: [ metagraph.n ]
+            alpha: float = self.config.neuron.moving_average_alpha
+            self.scores: torch.FloatTensor = alpha * scattered_rewards + (
+                1 - alpha
+            ) * self.scores.to(self.device)
+
+            # Feed the rewards to the sampling scheduler.
+            self.sampler.record(uids, rewards, self.step)
+            self.history.record(uids, self.step, reward=rewards, **(components or {}))
+
+            # Log the new scores of the queried uids until the next snapshot.
+            uids = torch.as_tensor(uids)
+            self.checkpoint.delta(self.step, uids.tolist(), self.scores[uids].tolist())
         bt.logging.debug(f"Updated moving avg scores: {self.scores}")
 
     def save_state(self):
-        """Saves the state of the validator to a file."""
+        """Queues a snapshot of the state of the validator, which is written to file in the background."""
         bt.logging.info("Saving validator state.")
 
-        # Save the state of the validator to file.
-        torch.save(
-            {
+        # Queue under the lock so the snapshot is ordered with the score deltas.
+        with self.scores_lock:
+            state = {
                 "step": self.step,
-                "scores": self.scores,
-                "hotkeys": self.hotkeys,
-            },
-            self.config.neuron.full_path + "/state.pt",
-        )
+                "scores": self.scores.clone().cpu(),
+                "hotkeys": list(self.hotkeys),
+                "history": {name: torch.from_numpy(array) for name, array in self.history.state_dict().items()},
+                "sampler": self.sampler.state_dict(),
+            }
+            self.checkpoint.snapshot(state)
 
     def load_state(self):
-        """Loads the state of the validator from a file."""
+        """Loads the state of the validator from file, if there is a readable checkpoint."""
         bt.logging.info("Loading validator state.")
 
-        # Load the state of the validator from file.
-        state = torch.load(self.config.neuron.full_path + "/state.pt")
-        self.step = state["step"]
-        self.scores = state["scores"]
-        self.hotkeys = state["hotkeys"]
+        state = self.checkpoint.load()
+        if state is None:
+            return
+        with self.scores_lock:
+            self.step = state["step"]
+            self.scores = state["scores"].to(self.device)
+            self.hotkeys = state["hotkeys"]
+            self.hotkeys_fingerprint = hotkeys_fingerprint(self.hotkeys)
+            if "history" in state:
+                self.history = History.from_state_dict(
+                    {name: t.numpy() for name, t in state["history"].items()}, size=self.config.neuron.history_size
+                )
+            # The history only holds the last records of each uid, so prefer the sampler's own statistics
+            if "sampler" in state:
+                self.sampler.seed(**state["sampler"])
+            elif "history" in state:
+                self.sampler.seed(*self.history.moments())
+
+        # Reset the uids which changed hands while the validator was down.
+        self.set_metagraph(self.metagraph)
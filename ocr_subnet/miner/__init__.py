@@ -0,0 +1,7 @@
+from .engine import create_engine
+from .ocr import extract
+from .cache import ResultCache
+from .admission import AdmissionController
+from .result import OCRResult
+from .batching import MicroBatcher
+from .policy import OCRMode, OCRPolicy
@@ -0,0 +1,137 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import time
+import heapq
+import asyncio
+import itertools
+
+from collections import deque
+
+from ocr_subnet.utils.metrics import snapshot
+
+
+class AdmissionController:
+    """
+    Deadline-aware admission control for the miner's executor.
+
+    At most `capacity` requests run at once. Further requests wait in a queue ordered by priority (the caller's stake)
+    and then by deadline. The time a request would spend in the queue is estimated from the median of recent OCR
+    latencies and the number of requests ahead of it. Requests that cannot finish before their deadline are shed
+    immediately rather than queued, and queued requests whose deadline passes while waiting are shed instead of run.
+
+    A late response earns no time reward and delays everything queued behind it, so shedding keeps the miner's
+    effective throughput close to its capacity under overload.
+
+    Latencies are recorded relative to the accurate OCR mode: a request run in a faster mode is recorded as its latency
+    divided by the mode's relative cost, so fast-mode samples do not drag the estimate down. A request only needs to
+    fit in its deadline in the cheapest mode it may fall back to, which takes `min_cost` times the estimate.
+
+    Args:
+    - capacity (int): Number of requests that may run concurrently.
+    - window (int): Number of recent latencies used for the estimate.
+    - min_cost (float): Latency of the cheapest OCR mode relative to the accurate mode.
+    """
+
+    def __init__(self, capacity: int, window: int = 100, min_cost: float = 1.0):
+        self.capacity = capacity
+        self.min_cost = min_cost
+        self.running = 0
+
+        # Heap of [-priority, deadline, sequence number, future]
+        self.waiting = []
+        self.counter = itertools.count()
+        self.latencies = deque(maxlen=window)
+
+        self.admitted = 0
+        self.shed = 0
+
+    def latency(self) -> float:
+        """Median of recent latencies, or 0 if no requests have completed yet."""
+        # The metrics server reads this from another thread
+        latencies = sorted(snapshot(self.latencies))
+        if not latencies:
+            return 0.0
+        return latencies[len(latencies) // 2]
+
+    async def acquire(self, priority: float, deadline: float) -> bool:
+        """
+        Waits for a slot. Returns True once the request may run, or False if it was shed because it cannot finish
+        before `deadline` (a time.monotonic() timestamp). Callers must call release() after running an admitted request.
+        """
+        now = time.monotonic()
+        latency = self.latency()
+        run = self.min_cost * latency
+
+        if self.running < self.capacity and not self.waiting:
+            if now + run > deadline:
+                self.shed += 1
+                return False
+            self.running += 1
+            self.admitted += 1
+            return True
+
+        # Each slot frees up roughly once per latency, so the wait grows with the number of requests ahead.
+        ahead = sum(1 for entry in self.waiting if (entry[0], entry[1]) < (-priority, deadline))
+        wait = (ahead + 1) / self.capacity * latency
+        if now + wait + run > deadline:
+            self.shed += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiting, [-priority, deadline, next(self.counter), future])
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # If a slot was handed over just before the cancellation, give it to the next request.
+            if future.done() and not future.cancelled() and future.result():
+                self.running -= 1
+                self._dispatch()
+            raise
+
+    def release(self, latency: float, cost: float = 1.0):
+        """Frees the slot of a finished request and records how long it took, in a mode of relative `cost`."""
+        self.latencies.append(latency / cost)
+        self.running -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        now = time.monotonic()
+        run = self.min_cost * self.latency()
+        while self.waiting and self.running < self.capacity:
+            _, deadline, _, future = heapq.heappop(self.waiting)
+            if future.done():  # The waiter was cancelled.
+                continue
+
+            if now + run > deadline:
+                self.shed += 1
+                future.set_result(False)
+                continue
+
+            self.running += 1
+            self.admitted += 1
+            future.set_result(True)
+
+    def metrics(self) -> dict:
+        return {
+            "running": self.running,
+            "waiting": len(self.waiting),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "latency": self.latency(),
+        }
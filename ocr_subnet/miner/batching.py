@@ -0,0 +1,105 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import asyncio
+
+from typing import Any, Callable, List
+
+
+class MicroBatcher:
+    """
+    Collects requests which arrive within a short window and runs them as one batch in an executor.
+
+    The first request of a batch starts a timer of `window` seconds. The batch is run when the timer fires or as soon
+    as it reaches `max_batch_size`, whichever comes first, and each caller receives the result for its own item.
+
+    run_batch may return an exception in place of the result of an item which failed, which is raised to that item's
+    caller only. If run_batch itself raises, the exception is raised to every caller in the batch.
+
+    Args:
+    - run_batch (Callable[[List], List]): Blocking function mapping a list of items to a list of results, in order.
+    - executor (concurrent.futures.Executor): Executor the batches run in.
+    - window (float): Maximum time to wait for more requests, in seconds.
+    - max_batch_size (int): Maximum number of requests per batch.
+    """
+
+    def __init__(self, run_batch: Callable[[List], List], executor, window: float, max_batch_size: int):
+        self.run_batch = run_batch
+        self.executor = executor
+        self.window = window
+        self.max_batch_size = max_batch_size
+
+        self.pending = []
+        self.timer = None
+        # The event loop only keeps weak references to tasks, so keep running batches alive until they finish
+        self.tasks = set()
+
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Adds item to the current batch and waits for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((item, future))
+
+        if len(self.pending) >= self.max_batch_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+
+        return await future
+
+    def flush(self):
+        """Starts running the pending requests as a batch."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, batch: List[tuple]):
+        items = [item for item, _ in batch]
+        self.batches += 1
+        self.items += len(items)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.run_batch, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # The caller may have been cancelled while the batch ran.
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def metrics(self) -> dict:
+        return {
+            "batches": self.batches,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
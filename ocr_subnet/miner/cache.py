@@ -0,0 +1,152 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import time
+import asyncio
+import hashlib
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of OCR results keyed by a hash of the image content, which also coalesces concurrent identical
+    requests so that they share a single in-flight computation.
+
+    Cached results are shared between requests and must not be mutated by callers.
+
+    Args:
+    - maxsize (int): Maximum number of cached results. A non-positive value disables caching (coalescing still applies).
+    - ttl (float): Time-to-live of each cached result, in seconds.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        # key -> (expiry time, result, seconds it took to compute)
+        self.entries = OrderedDict()
+        # key -> future resolving to (result, seconds it took to compute)
+        self.inflight = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.saved_time = 0.0
+
+    @staticmethod
+    def key(base64_image: str) -> str:
+        """Content hash of the image. Hashing the base64 payload avoids decoding it first."""
+        return hashlib.blake2b(base64_image.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str):
+        """Returns the cached (result, cost) for key, or None if missing or expired."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expiry, result, cost = entry
+        if expiry < time.monotonic():
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return result, cost
+
+    def put(self, key: str, result: Any, cost: float):
+        if self.maxsize <= 0:
+            return
+
+        self.entries[key] = (time.monotonic() + self.ttl, result, cost)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable], cacheable: Callable[[Any], bool] = None) -> Any:
+        """
+        Returns the result for key from the cache, from an identical in-flight request, or by awaiting compute().
+        Results of None are treated as failures and are not cached.
+
+        A request waiting on an identical one only shares its result if it succeeded. When that request was shed
+        (returned None) or cancelled, e.g. because its client disconnected, the waiters compute the result themselves.
+
+        Args:
+        - key (str): Content hash of the request, from `key`.
+        - compute (Callable): Coroutine function computing the result.
+        - cacheable (Callable): Whether a computed result may be served to later requests. Defaults to every result
+          which is not None.
+        """
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                result, cost = cached
+                self.hits += 1
+                self.saved_time += cost
+                return result
+
+            inflight = self.inflight.get(key)
+            if inflight is None:
+                break
+
+            try:
+                # Shield so that a cancelled waiter does not cancel the shared computation.
+                result, cost = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    # This waiter was cancelled, not the shared computation.
+                    raise
+                continue
+            if result is not None:
+                self.coalesced += 1
+                self.saved_time += cost
+                return result
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        start = time.perf_counter()
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case there are no waiters.
+            future.exception()
+            raise
+        else:
+            cost = time.perf_counter() - start
+            if result is not None and (cacheable is None or cacheable(result)):
+                self.put(key, result, cost)
+            future.set_result((result, cost))
+            return result
+        finally:
+            del self.inflight[key]
+
+    def metrics(self) -> dict:
+        requests = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / requests if requests else 0.0,
+            "saved_time": self.saved_time,
+        }
@@ -0,0 +1,291 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import tempfile
+import threading
+import concurrent.futures
+
+import numpy as np
+import pytesseract
+import bittensor as bt
+
+from abc import ABC, abstractmethod
+from typing import List
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+
+class OCREngine(ABC):
+    """
+    Base class for OCR engines used by the miner.
+
+    Engines return word level results in the same dict-of-lists format as pytesseract.image_to_data with
+    output_type=pytesseract.Output.DICT, so that the rest of the miner pipeline does not depend on the engine used.
+    """
+
+    def image_to_data(self, image, psm: int = None) -> dict:
+        """
+        Runs OCR on the image and blocks until the result is available.
+
+        Args:
+        - image (PIL.Image or np.ndarray): The image.
+        - psm (int): Tesseract page segmentation mode. Defaults to tesseract's own default (3, fully automatic).
+        """
+        return self.submit(image, psm=psm).result()
+
+    @abstractmethod
+    def submit(self, image, psm: int = None) -> concurrent.futures.Future:
+        """Starts OCR on the image and returns a future of its result."""
+        ...
+
+    def image_to_data_batch(self, images: List, psm: int = None) -> List[dict]:
+        """Runs OCR on several images at once. Engines override this when a batch is cheaper than separate calls."""
+        return [future.result() for future in [self.submit(image, psm=psm) for image in images]]
+
+    def close(self):
+        pass
+
+
+class PytesseractEngine(OCREngine):
+    """
+    Spawns a new tesseract process for every image, which writes the image to a temp file and reloads the
+    language models each time. This is the simplest engine and is kept as a reference. Submitted images are handed to
+    a thread pool, which lets several tesseract processes run at once.
+
+    Args:
+    - num_workers (int): Maximum number of concurrent tesseract processes. Defaults to the number of cpus.
+    """
+
+    def __init__(self, num_workers: int = None):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_workers or os.cpu_count())
+
+    def image_to_data(self, image, psm: int = None) -> dict:
+        return pytesseract.image_to_data(image, config=_psm_config(psm), output_type=pytesseract.Output.DICT)
+
+    def submit(self, image, psm: int = None) -> concurrent.futures.Future:
+        return self.executor.submit(self.image_to_data, image, psm)
+
+    def image_to_data_batch(self, images: List, psm: int = None) -> List[dict]:
+        """
+        Runs a single tesseract process over all images by passing it a list file, so the process spawn and model
+        loading are paid once per batch. Tesseract numbers the images as pages, which are split back into one result
+        per image.
+        """
+        if len(images) == 1:
+            return [self.image_to_data(images[0], psm=psm)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i, image in enumerate(images):
+                paths.append(os.path.join(tmp, f"{i}.png"))
+                image.save(paths[-1])
+
+            list_path = os.path.join(tmp, "images.txt")
+            with open(list_path, "w") as f:
+                f.write("\n".join(paths))
+
+            data = pytesseract.image_to_data(list_path, config=_psm_config(psm), output_type=pytesseract.Output.DICT)
+
+        results = [{key: [] for key in data} for _ in images]
+        for row in range(len(data["page_num"])):
+            result = results[data["page_num"][row] - 1]
+            for key, values in data.items():
+                result[key].append(values[row])
+        return results
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class InProcessEngine(OCREngine):
+    """
+    Runs tesseract in the calling process. When tesserocr is installed the models are loaded once and reused for every
+    image, otherwise it falls back to pytesseract. A tesserocr instance is not thread safe, so this engine must only be
+    used from one thread at a time (e.g. inside a worker process).
+
+    submit runs OCR synchronously and returns a finished future, so images submitted together (e.g. the bands of a
+    tiled page) are processed one after another rather than in parallel.
+
+    Args:
+    - lang (str): Tesseract language.
+    """
+
+    def __init__(self, lang: str = "eng"):
+        self.api = tesserocr.PyTessBaseAPI(lang=lang) if tesserocr is not None else None
+
+    def submit(self, image, psm: int = None) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(self.run(_to_payload(image, psm)))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def run(self, payload: tuple) -> dict:
+        """Runs OCR on a (bytes, width, height, psm) grayscale payload."""
+        data, width, height, psm = payload
+        if self.api is None:
+            image = Image.frombytes("L", (width, height), data)
+            return pytesseract.image_to_data(image, config=_psm_config(psm), output_type=pytesseract.Output.DICT)
+
+        self.api.SetPageSegMode(psm if psm is not None else tesserocr.PSM.AUTO)
+        self.api.SetImageBytes(data, width, height, 1, width)
+        self.api.Recognize()
+
+        result = {"text": [], "left": [], "top": [], "width": [], "height": [], "conf": []}
+        for word in tesserocr.iterate_level(self.api.GetIterator(), tesserocr.RIL.WORD):
+            text = word.GetUTF8Text(tesserocr.RIL.WORD)
+            box = word.BoundingBox(tesserocr.RIL.WORD)
+            if text is None or box is None:
+                continue
+
+            x1, y1, x2, y2 = box
+            result["text"].append(text)
+            result["left"].append(x1)
+            result["top"].append(y1)
+            result["width"].append(x2 - x1)
+            result["height"].append(y2 - y1)
+            result["conf"].append(word.Confidence(tesserocr.RIL.WORD))
+
+        return result
+
+
+class WorkerPoolEngine(OCREngine):
+    """
+    Runs OCR in a pool of long-lived worker processes, each holding an InProcessEngine. When tesserocr is installed,
+    each worker loads the tesseract models once at startup and reuses them for every image, so there is no per-request
+    process spawn, temp file or TSV parsing. Otherwise the workers fall back to pytesseract.
+
+    Images are sent to the workers as raw 8-bit grayscale bytes through the pool's pipes. At most queue_depth images
+    can be submitted but not yet finished; further submissions block until a slot frees up.
+
+    Args:
+    - num_workers (int): Number of worker processes. Defaults to the number of cpus.
+    - queue_depth (int): Maximum number of in-flight images. Defaults to twice the number of workers.
+    - lang (str): Tesseract language.
+    """
+
+    def __init__(self, num_workers: int = None, queue_depth: int = None, lang: str = "eng"):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.queue_depth = queue_depth or 2 * self.num_workers
+        self.lang = lang
+
+        self.slots = threading.BoundedSemaphore(self.queue_depth)
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            initializer=_init_worker,
+            initargs=(lang,),
+        )
+        bt.logging.info(
+            f"Started OCR worker pool with {self.num_workers} workers, queue depth {self.queue_depth}, "
+            f"backend {'tesserocr' if tesserocr is not None else 'pytesseract'}"
+        )
+
+    def submit(self, image, psm: int = None) -> concurrent.futures.Future:
+        payload = _to_payload(image, psm)
+
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(_ocr_in_worker, payload)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def image_to_data_batch(self, images: List, psm: int = None) -> List[dict]:
+        """
+        Splits the batch into one chunk per worker and sends each chunk to a worker in a single call, which saves a
+        round trip through the pool per image while still using every worker.
+        """
+        if not images:
+            return []
+
+        payloads = [_to_payload(image, psm) for image in images]
+        size = -(-len(payloads) // self.num_workers)
+
+        futures = []
+        for start in range(0, len(payloads), size):
+            self.slots.acquire()
+            try:
+                future = self.executor.submit(_ocr_batch_in_worker, payloads[start:start + size])
+            except Exception:
+                self.slots.release()
+                raise
+            future.add_done_callback(lambda _: self.slots.release())
+            futures.append(future)
+
+        return [data for future in futures for data in future.result()]
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_engine(config: "bt.Config") -> OCREngine:
+    """Creates the OCR engine selected in the miner config."""
+    if config.neuron.ocr_engine == "pytesseract":
+        return PytesseractEngine(num_workers=config.neuron.ocr_workers)
+
+    if tesserocr is None:
+        bt.logging.warning(
+            "tesserocr is not installed, so the OCR worker pool falls back to spawning a tesseract process per image. "
+            "Install tesserocr (see requirements.txt) to load the models once per worker."
+        )
+
+    return WorkerPoolEngine(
+        num_workers=config.neuron.ocr_workers,
+        queue_depth=config.neuron.ocr_queue_depth,
+        lang=config.neuron.ocr_lang,
+    )
+
+
+def _psm_config(psm: int = None) -> str:
+    return f"--psm {psm}" if psm is not None else ""
+
+
+def _to_payload(image, psm: int = None) -> tuple:
+    """Converts a PIL image or uint8 array into (bytes, width, height, psm) of 8-bit grayscale pixels."""
+    if isinstance(image, np.ndarray):
+        array = image
+    else:
+        array = np.asarray(image if image.mode == "L" else image.convert("L"))
+
+    height, width = array.shape[:2]
+    return np.ascontiguousarray(array, dtype=np.uint8).tobytes(), width, height, psm
+
+
+# Engine owned by each worker process.
+_engine = None
+
+
+def _init_worker(lang: str):
+    global _engine
+    _engine = InProcessEngine(lang=lang)
+
+
+def _ocr_in_worker(payload: tuple) -> dict:
+    return _engine.run(payload)
+
+
+def _ocr_batch_in_worker(payloads: List[tuple]) -> List[dict]:
+    return [_engine.run(payload) for payload in payloads]
@@ -0,0 +1,198 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+from PIL import Image, ImageDraw
+
+from ocr_subnet.utils.image import deserialize, serialize
+from ocr_subnet.utils.metrics import timed
+from ocr_subnet.miner import tiling, preprocess
+from ocr_subnet.miner.result import OCRResult
+from ocr_subnet.miner.policy import OCRMode, MODES
+from ocr_subnet.miner.engine import OCREngine, InProcessEngine
+
+
+def extract(base64_image: str, engine: OCREngine = None, tile_height: int = 0, tile_overlap: int = 0, mode: OCRMode = None, steps: Sequence[str] = ()) -> Tuple[List[dict], Dict[str, float]]:
+    """
+    CPU stage of the miner forward: decodes the image, runs OCR and post-processes the result. This function blocks
+    and is meant to be run in an executor rather than on the axon's event loop.
+
+    Args:
+    - base64_image (str): Base64 encoded image from the synapse.
+    - engine (OCREngine): Engine used for OCR. Defaults to the engine of the current executor process.
+    - tile_height (int): When positive, the page is OCR'd as parallel horizontal bands of this height.
+    - tile_overlap (int): Number of rows shared by neighbouring bands.
+    - mode (OCRMode): Speed/accuracy settings. Defaults to the accurate mode.
+    - steps (Sequence[str]): Preprocessing steps applied before OCR, see ocr_subnet.miner.preprocess.
+
+    Returns:
+    - List[dict]: The extracted sections.
+    - Dict[str, float]: Time spent in each stage, in seconds.
+    """
+    mode = mode or MODES[-1]
+    timings = {}
+    image = _decode(base64_image, mode, timings)
+    image, transform = preprocess.apply(image, steps, timings)
+
+    with timed(timings, 'ocr'):
+        engine = engine or _engine
+        if tile_height > 0:
+            data = tiling.image_to_data(image, engine, tile_height=tile_height, overlap=tile_overlap, psm=mode.psm)
+        else:
+            data = engine.image_to_data(image, psm=mode.psm)
+
+    return _postprocess(data, mode, transform, timings), timings
+
+
+def extract_batch(base64_images: List[str], engine: OCREngine = None, tile_height: int = 0, tile_overlap: int = 0, mode: OCRMode = None, steps: Sequence[str] = ()) -> List[Union[Tuple[List[dict], Dict[str, float]], Exception]]:
+    """
+    Batched version of extract, which runs OCR on all images with a single engine call. The 'ocr' timing of each
+    result is the time of the whole batch. Tiled OCR already submits several bands at once, so with tiling enabled
+    the images are processed one at a time.
+
+    Images fail independently: an image which cannot be decoded or post-processed gets the exception in place of its
+    result, and if the batched engine call fails, the images are OCR'd one at a time so that only the image which
+    caused the failure gets its exception.
+
+    Args:
+    - base64_images (List[str]): Base64 encoded images.
+    - engine (OCREngine): Engine used for OCR. Defaults to the engine of the current executor process.
+    - tile_height (int): When positive, each page is OCR'd as parallel horizontal bands of this height.
+    - tile_overlap (int): Number of rows shared by neighbouring bands.
+    - mode (OCRMode): Speed/accuracy settings shared by the batch. Defaults to the accurate mode.
+    - steps (Sequence[str]): Preprocessing steps applied before OCR, see ocr_subnet.miner.preprocess.
+
+    Returns:
+    - List[Union[Tuple[List[dict], Dict[str, float]], Exception]]: The sections and stage timings of each image, or
+      the exception raised for it, in order.
+    """
+    engine = engine or _engine
+    if tile_height > 0:
+        return [_isolated(extract, base64_image, engine, tile_height, tile_overlap, mode, steps) for base64_image in base64_images]
+
+    mode = mode or MODES[-1]
+    timings = [{} for _ in base64_images]
+    results = [None] * len(base64_images)
+    indices, images, transforms = [], [], []
+    for i, (base64_image, image_timings) in enumerate(zip(base64_images, timings)):
+        try:
+            image, transform = preprocess.apply(_decode(base64_image, mode, image_timings), steps, image_timings)
+        except Exception as e:
+            results[i] = e
+            continue
+        indices.append(i)
+        images.append(image)
+        transforms.append(transform)
+
+    batch_timings = {}
+    with timed(batch_timings, 'ocr'):
+        try:
+            data = engine.image_to_data_batch(images, psm=mode.psm) if images else []
+        except Exception:
+            data = [_isolated(engine.image_to_data, image, psm=mode.psm) for image in images]
+
+    for i, image_data, transform in zip(indices, data, transforms):
+        timings[i]['ocr'] = batch_timings['ocr']
+        sections = image_data if isinstance(image_data, Exception) else _isolated(_postprocess, image_data, mode, transform, timings[i])
+        results[i] = sections if isinstance(sections, Exception) else (sections, timings[i])
+
+    return results
+
+
+def extract_stream(base64_image: str, engine: OCREngine = None, tile_height: int = 400, tile_overlap: int = 64, mode: OCRMode = None, steps: Sequence[str] = (), timings: Dict[str, float] = None) -> Iterator[List[dict]]:
+    """
+    Streaming version of extract, which OCRs the page as horizontal bands and yields the sections of each band from
+    top to bottom as soon as the band is done. Words are merged into sections within each band, and every word is
+    reported by exactly one band.
+
+    Args:
+    - base64_image (str): Base64 encoded image from the synapse.
+    - engine (OCREngine): Engine used for OCR. Defaults to the engine of the current executor process.
+    - tile_height (int): Height of each band in pixels, including the overlap.
+    - tile_overlap (int): Number of rows shared by neighbouring bands.
+    - mode (OCRMode): Speed/accuracy settings. Defaults to the accurate mode.
+    - steps (Sequence[str]): Preprocessing steps applied before OCR, see ocr_subnet.miner.preprocess.
+    - timings (Dict[str, float]): Dict which the time spent in each stage is added to, summed over bands.
+
+    Yields:
+    - List[dict]: The sections of each band.
+    """
+    mode = mode or MODES[-1]
+    timings = {} if timings is None else timings
+    image = _decode(base64_image, mode, timings)
+    image, transform = preprocess.apply(image, steps, timings)
+
+    bands = tiling.iter_bands(image, engine or _engine, tile_height=tile_height, overlap=tile_overlap, psm=mode.psm)
+    while True:
+        with timed(timings, 'ocr'):
+            data = next(bands, None)
+        if data is None:
+            return
+        yield _postprocess(data, mode, transform, timings)
+
+
+def _isolated(fn: Callable, *args, **kwargs):
+    """Calls fn, returning the exception it raises instead of raising it."""
+    try:
+        return fn(*args, **kwargs)
+    except Exception as e:
+        return e
+
+
+def _decode(base64_image: str, mode: OCRMode, timings: Dict[str, float]):
+    with timed(timings, 'decode'):
+        image = deserialize(base64_string=base64_image, scale=mode.scale, grayscale=mode.grayscale)
+        # Images are decoded lazily, so force it here to attribute the time to this stage
+        image.load()
+    return image
+
+
+def _postprocess(data: dict, mode: OCRMode, transform: preprocess.Transform, timings: Dict[str, float]) -> List[dict]:
+    with timed(timings, 'postprocess'):
+        # Filter out empty and tiny boxes, merge together words which are on the same line and close together, then sort
+        # sections so that they read left to right and top to bottom. Font information is not available from tesseract.
+        # Boxes are mapped back to the original image before merging, as the merge tolerances are in original pixels.
+        result = transform.restore(OCRResult.from_data(data)).rescale(1 / mode.scale).filter().merge().sort()
+
+    with timed(timings, 'response'):
+        return result.to_response()
+
+
+def synthetic_page(width: int = 1275, height: int = 1650, lines: int = 40) -> str:
+    """
+    Renders a page of text similar in size to a validator challenge, used to warm up the OCR engine before serving.
+
+    Returns:
+    - str: Base64 encoded JPEG of the page.
+    """
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    for i in range(lines):
+        draw.text((60, 40 + i * (height - 80) // lines), f'Invoice #{i:06} Web hosting 3 x $100.00 Total: ${300 * i:,.2f}', fill='black')
+    return serialize(image)
+
+
+# Engine owned by each executor process when the miner uses a process executor.
+_engine = None
+
+
+def init_process(lang: str):
+    """Initializer for process executors, which loads an OCR engine once per process."""
+    global _engine
+    _engine = InProcessEngine(lang=lang)
@@ -0,0 +1,125 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+from collections import deque
+from typing import List, NamedTuple, Optional
+
+from ocr_subnet.utils.metrics import snapshot
+
+
+class OCRMode(NamedTuple):
+    """
+    Settings which trade OCR accuracy for speed.
+
+    Attributes:
+    - name: Name used in logs and metrics.
+    - scale: Scale at which the image is decoded and OCR'd. Positions are mapped back to the original image.
+    - grayscale: Decode straight to grayscale.
+    - psm: Tesseract page segmentation mode, None for tesseract's default (3, fully automatic). Sparse text (11)
+      skips most of the layout analysis.
+    - cost: Latency relative to the accurate mode, used as a prior until the mode's latency has been measured.
+    """
+
+    name: str
+    scale: float = 1.0
+    grayscale: bool = False
+    psm: Optional[int] = None
+    cost: float = 1.0
+
+
+# Ordered from fastest to most accurate. The accurate mode is the miner's original behaviour.
+MODES = [
+    OCRMode("fast", scale=0.75, grayscale=True, psm=11, cost=0.4),
+    OCRMode("balanced", grayscale=True, psm=11, cost=0.7),
+    OCRMode("accurate"),
+]
+
+
+class OCRPolicy:
+    """
+    Picks an OCR mode for each request from the time it has left.
+
+    The latency of each mode is estimated from the median of its recent latencies, scaled by the current load on the
+    executor (requests running per worker). The most accurate mode whose estimate fits within `headroom` of the
+    remaining time budget is chosen, falling back to the fastest mode when none fits. Usage and latency of each mode
+    are recorded, so operators can see how the miner trades time reward for prediction reward.
+
+    Args:
+    - mode (str): Name of a mode to always use, or 'adaptive' to choose per request.
+    - modes (List[OCRMode]): Available modes, from fastest to most accurate.
+    - headroom (float): Fraction of the remaining budget the estimated latency may use.
+    - window (int): Number of recent latencies kept per mode.
+    """
+
+    def __init__(self, mode: str = "adaptive", modes: List[OCRMode] = MODES, headroom: float = 0.8, window: int = 50):
+        self.modes = modes
+        self.fixed = None if mode == "adaptive" else next(m for m in modes if m.name == mode)
+        self.headroom = headroom
+        self.latencies = {m.name: deque(maxlen=window) for m in modes}
+        self.counts = {m.name: 0 for m in modes}
+
+    def choices(self) -> List[OCRMode]:
+        """The modes the policy can choose, from fastest to most accurate."""
+        return [self.fixed] if self.fixed else list(self.modes)
+
+    def best(self) -> OCRMode:
+        """The most accurate mode the policy can choose."""
+        return self.fixed or self.modes[-1]
+
+    def fastest(self) -> OCRMode:
+        """The fastest mode the policy can choose."""
+        return self.fixed or self.modes[0]
+
+    def latency(self, mode: OCRMode) -> float:
+        """Estimated latency of the mode without load, in seconds."""
+        # The metrics server reads this from another thread
+        samples = sorted(snapshot(self.latencies[mode.name]))
+        if samples:
+            return samples[len(samples) // 2]
+
+        # Scale the estimate of a measured mode by the relative cost of the two
+        for other in reversed(self.modes):
+            samples = sorted(snapshot(self.latencies[other.name]))
+            if samples:
+                return samples[len(samples) // 2] * mode.cost / other.cost
+        return 0.0
+
+    def choose(self, remaining: float, load: float = 1.0) -> OCRMode:
+        """
+        Returns the mode to use for a request.
+
+        Args:
+        - remaining (float): Seconds left before the request's deadline.
+        - load (float): Requests running per executor worker. Values above 1 slow every request down.
+        """
+        mode = self.fixed
+        if mode is None:
+            mode = self.modes[0]
+            for candidate in reversed(self.modes):
+                if self.latency(candidate) * max(1.0, load) <= self.headroom * remaining:
+                    mode = candidate
+                    break
+
+        self.counts[mode.name] += 1
+        return mode
+
+    def record(self, mode: OCRMode, seconds: float):
+        self.latencies[mode.name].append(seconds)
+
+    def metrics(self) -> dict:
+        return {m.name: {"count": self.counts[m.name], "latency": self.latency(m)} for m in self.modes}
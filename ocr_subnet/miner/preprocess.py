@@ -0,0 +1,229 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import math
+import numpy as np
+
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+from PIL import Image
+
+from ocr_subnet.utils.metrics import timed
+from ocr_subnet.miner.result import OCRResult
+
+
+# Steps in the order they are applied
+STEPS = ["grayscale", "binarize", "despeckle", "deskew", "crop"]
+
+
+class Transform(NamedTuple):
+    """
+    Geometry of a preprocessed image relative to the image it was made from, so that OCR boxes can be mapped back.
+
+    Attributes:
+    - left, top: Offset of the cropped region within the deskewed image.
+    - angle: Counter-clockwise rotation in degrees applied by deskewing, about the center of the image.
+    - center: (x, y) center of the rotation.
+    """
+
+    left: int = 0
+    top: int = 0
+    angle: float = 0.0
+    center: Tuple[float, float] = (0.0, 0.0)
+
+    def restore(self, result: OCRResult) -> OCRResult:
+        """Maps boxes found in the preprocessed image back to the original image."""
+        left, top = result.left + self.left, result.top + self.top
+        right, bottom = result.right + self.left, result.bottom + self.top
+        if self.angle == 0.0 or len(result) == 0:
+            return OCRResult(left, top, right, bottom, result.text)
+
+        # Undo the rotation on the corners of each box and keep their bounding box. Rows grow downwards, so this is the
+        # clockwise rotation matrix in image coordinates.
+        theta = math.radians(self.angle)
+        cos, sin = math.cos(theta), math.sin(theta)
+        cx, cy = self.center
+        xs = np.stack([left, right, left, right]) - cx
+        ys = np.stack([top, top, bottom, bottom]) - cy
+        x = cx + xs * cos - ys * sin
+        y = cy + xs * sin + ys * cos
+        return OCRResult(
+            left=np.floor(x.min(axis=0)).astype(np.int64),
+            top=np.floor(y.min(axis=0)).astype(np.int64),
+            right=np.ceil(x.max(axis=0)).astype(np.int64),
+            bottom=np.ceil(y.max(axis=0)).astype(np.int64),
+            text=result.text,
+        )
+
+
+def box_sum(pixels: np.ndarray, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sum over the (2 * radius + 1) square window around each pixel, computed in constant time per pixel with
+    separable running sums. Windows are clipped at the edges of the image.
+
+    Returns:
+    - np.ndarray: Window sums.
+    - np.ndarray: Number of pixels in each window.
+    """
+    sums = pixels.astype(np.int32)
+    counts = []
+    for axis in (0, 1):
+        size = pixels.shape[axis]
+        cumulative = np.zeros_like(sums, shape=tuple(n + (i == axis) for i, n in enumerate(sums.shape)))
+        np.cumsum(sums, axis=axis, out=cumulative[1:] if axis == 0 else cumulative[:, 1:])
+        start = np.clip(np.arange(size) - radius, 0, size)
+        end = np.clip(np.arange(size) + radius + 1, 0, size)
+        sums = cumulative.take(end, axis=axis) - cumulative.take(start, axis=axis)
+        counts.append(end - start)
+
+    return sums, counts[0][:, None] * counts[1][None, :]
+
+
+def binarize(pixels: np.ndarray, radius: int = 15, offset: int = 25) -> np.ndarray:
+    """
+    Adaptive thresholding: a pixel is ink if it is darker than the mean of its neighbourhood by more than offset.
+    Unlike a global threshold, this is unaffected by the darkened borders and shadows of the validator's challenges.
+    """
+    sums, counts = box_sum(pixels, radius)
+    ink = pixels * counts < sums - offset * counts
+    return np.where(ink, 0, 255).astype(np.uint8)
+
+
+def despeckle(pixels: np.ndarray, threshold: int = 128, min_neighbours: int = 2) -> np.ndarray:
+    """Whitens dark pixels with fewer than min_neighbours dark pixels around them, which are noise rather than ink."""
+    ink = pixels < threshold
+    neighbours, _ = box_sum(ink.view(np.uint8), 1)
+    return np.where(ink & (neighbours - 1 < min_neighbours), 255, pixels).astype(np.uint8)
+
+
+def _profile_scores(ys: np.ndarray, xs: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    # For small angles a rotation is close to a vertical shear, which moves each pixel to row y + x * tan(angle)
+    rows = (ys[None, :] + xs[None, :] * np.tan(np.radians(angles))[:, None]).astype(np.int32)
+    rows -= rows.min()
+    span = int(rows.max()) + 1
+
+    # One bincount over all angles, with each angle's histogram in its own range of bins
+    rows += span * np.arange(len(angles), dtype=np.int32)[:, None]
+    histograms = np.bincount(rows.ravel(), minlength=span * len(angles)).reshape(len(angles), span)
+    return (histograms.astype(np.float64) ** 2).sum(axis=1)
+
+
+def estimate_skew(pixels: np.ndarray, max_angle: float = 2.0, step: float = 0.05, threshold: int = 128, samples: int = 50000) -> float:
+    """
+    Estimates the skew of the text lines in degrees by projection profile: when the lines are level, the row
+    histogram of ink pixels has sharp peaks and troughs, so the angle which maximises its sum of squares is chosen.
+    Candidate angles are evaluated together on a sample of the ink pixels, first coarsely and then around the best
+    coarse angle.
+
+    Returns:
+    - float: Counter-clockwise angle of the text lines, i.e. the clockwise rotation which levels them.
+    """
+    ys, xs = np.nonzero(pixels < threshold)
+    if len(ys) == 0:
+        return 0.0
+    if len(ys) > samples:
+        keep = np.random.default_rng(0).choice(len(ys), samples, replace=False)
+        ys, xs = ys[keep], xs[keep]
+
+    coarse = np.arange(-max_angle, max_angle + step, 5 * step)
+    best = coarse[np.argmax(_profile_scores(ys, xs, coarse))]
+    fine = best + np.arange(-5, 6) * step
+    return float(fine[np.argmax(_profile_scores(ys, xs, fine))])
+
+
+def deskew(pixels: np.ndarray, angle: float) -> np.ndarray:
+    """Rotates the image counter-clockwise by angle degrees about its center, filling the corners with white."""
+    image = Image.fromarray(pixels).rotate(angle, resample=Image.BILINEAR, fillcolor=255)
+    return np.asarray(image)
+
+
+def content_box(pixels: np.ndarray, threshold: int = 128, min_ink: float = 0.005, max_ink: float = 0.5, margin: int = 10) -> Tuple[int, int, int, int]:
+    """
+    Finds the region containing text. Rows and columns count as content when the fraction of ink in them is above
+    min_ink, which skips stray noise, and below max_ink, which skips dark borders and scanner edges.
+
+    Returns:
+    - Tuple[int, int, int, int]: (left, top, right, bottom) of the region, or the whole image if no text was found.
+    """
+    height, width = pixels.shape
+    ink = pixels < threshold
+    box = []
+    for axis, size in ((0, width), (1, height)):
+        fraction = ink.mean(axis=axis)
+        content = np.flatnonzero((fraction > min_ink) & (fraction < max_ink))
+        if len(content) == 0:
+            return 0, 0, width, height
+        box.append((max(0, content[0] - margin), min(size, content[-1] + 1 + margin)))
+
+    (left, right), (top, bottom) = box
+    return int(left), int(top), int(right), int(bottom)
+
+
+def apply(image: Image.Image, steps: Sequence[str], timings: Dict[str, float] = None) -> Tuple[Image.Image, Transform]:
+    """
+    Cleans up an image before OCR. The steps run in the order of STEPS regardless of the order given, and each one
+    is timed as a 'preprocess_<step>' stage.
+
+    - grayscale: converts to 8-bit grayscale. The other steps work on grayscale pixels, so they imply it.
+    - binarize: adaptive thresholding to black ink on a white background, removing shading and darkened borders.
+    - despeckle: removes isolated dark pixels left by noise.
+    - deskew: levels the text lines, as estimated from the projection profile.
+    - crop: crops to the region containing text.
+
+    Args:
+    - image (Image): Decoded image.
+    - steps (Sequence[str]): Names of the steps to run.
+    - timings (Dict[str, float]): Dict which the time spent in each step is added to.
+
+    Returns:
+    - Image: The preprocessed image.
+    - Transform: Maps positions in the preprocessed image back to the input image.
+    """
+    timings = {} if timings is None else timings
+    unknown = set(steps) - set(STEPS)
+    if unknown:
+        raise ValueError(f"Unknown preprocessing steps: {sorted(unknown)}")
+    if not steps:
+        return image, Transform()
+
+    with timed(timings, "preprocess_grayscale"):
+        pixels = np.asarray(image if image.mode == "L" else image.convert("L"))
+
+    if "binarize" in steps:
+        with timed(timings, "preprocess_binarize"):
+            pixels = binarize(pixels)
+
+    if "despeckle" in steps:
+        with timed(timings, "preprocess_despeckle"):
+            pixels = despeckle(pixels)
+
+    angle = 0.0
+    if "deskew" in steps:
+        with timed(timings, "preprocess_deskew"):
+            angle = -estimate_skew(pixels)
+            if angle != 0.0:
+                pixels = deskew(pixels, angle)
+
+    left, top = 0, 0
+    if "crop" in steps:
+        with timed(timings, "preprocess_crop"):
+            left, top, right, bottom = content_box(pixels)
+            pixels = pixels[top:bottom, left:right]
+
+    height, width = image.size[1], image.size[0]
+    return Image.fromarray(pixels), Transform(left=left, top=top, angle=angle, center=(width / 2, height / 2))
@@ -0,0 +1,116 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import numpy as np
+
+from typing import List
+
+from ocr_subnet.utils.process import merge_groups
+
+
+class OCRResult:
+    """
+    Columnar OCR output which flows through the miner's post-processing as arrays instead of one dict per word.
+    Coordinates are NumPy int arrays and text is a list of strings, all indexed by box. It is only materialized into
+    the protocol's list of dicts by to_response at the very end.
+    """
+
+    __slots__ = ("left", "top", "right", "bottom", "text")
+
+    def __init__(self, left: np.ndarray, top: np.ndarray, right: np.ndarray, bottom: np.ndarray, text: List[str]):
+        self.left = left
+        self.top = top
+        self.right = right
+        self.bottom = bottom
+        self.text = text
+
+    @classmethod
+    def from_data(cls, data: dict) -> "OCRResult":
+        """Creates a result from dict-of-lists OCR data, as returned by an OCREngine."""
+        left = np.asarray(data["left"], dtype=np.int64)
+        top = np.asarray(data["top"], dtype=np.int64)
+        return cls(
+            left=left,
+            top=top,
+            right=left + np.asarray(data["width"], dtype=np.int64),
+            bottom=top + np.asarray(data["height"], dtype=np.int64),
+            text=list(data["text"]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def take(self, indices: np.ndarray) -> "OCRResult":
+        """Returns the boxes at the given indices, in that order."""
+        return OCRResult(
+            left=self.left[indices],
+            top=self.top[indices],
+            right=self.right[indices],
+            bottom=self.bottom[indices],
+            text=[self.text[i] for i in indices.tolist()],
+        )
+
+    def rescale(self, factor: float) -> "OCRResult":
+        """Multiplies all coordinates by factor, e.g. to map boxes found in a downscaled image back to the original."""
+        if factor == 1.0:
+            return self
+        return OCRResult(
+            left=np.rint(self.left * factor).astype(np.int64),
+            top=np.rint(self.top * factor).astype(np.int64),
+            right=np.rint(self.right * factor).astype(np.int64),
+            bottom=np.rint(self.bottom * factor).astype(np.int64),
+            text=self.text,
+        )
+
+    def filter(self, min_area: int = 10) -> "OCRResult":
+        """Drops boxes without text and boxes smaller than min_area, which are likely noise."""
+        has_text = np.fromiter((text.strip() != "" for text in self.text), dtype=bool, count=len(self.text))
+        area = (self.right - self.left) * (self.bottom - self.top)
+        return self.take(np.flatnonzero(has_text & (area >= min_area)))
+
+    def merge(self, xtol: int = 25, ytol: int = 5) -> "OCRResult":
+        """Merges words into sections, with the same grouping as ocr_subnet.utils.process.group_and_merge_boxes."""
+        if len(self) == 0:
+            return self
+
+        groups = merge_groups(self.left.tolist(), self.top.tolist(), self.right.tolist(), xtol=xtol, ytol=ytol)
+
+        # Reduce each group's coordinates in a single pass over the boxes laid out group by group
+        flat = np.fromiter((i for group in groups for i in group), dtype=np.int64, count=len(self))
+        starts = np.cumsum([0] + [len(group) for group in groups[:-1]])
+        return OCRResult(
+            left=np.minimum.reduceat(self.left[flat], starts),
+            top=np.minimum.reduceat(self.top[flat], starts),
+            right=np.maximum.reduceat(self.right[flat], starts),
+            bottom=np.maximum.reduceat(self.bottom[flat], starts),
+            text=[self.text[group[0]] if len(group) == 1 else " ".join([self.text[i] for i in group]) for group in groups],
+        )
+
+    def sort(self) -> "OCRResult":
+        """Sorts boxes by y, then by x, so that they read left to right and top to bottom."""
+        # lexsort is stable and uses the last key as the primary one
+        return self.take(np.lexsort((self.left, self.top)))
+
+    def to_response(self) -> List[dict]:
+        """Materializes the result into the protocol's response format."""
+        return [
+            {"position": [x1, y1, x2, y2], "text": text}
+            for x1, y1, x2, y2, text in zip(
+                self.left.tolist(), self.top.tolist(), self.right.tolist(), self.bottom.tolist(), self.text
+            )
+        ]
@@ -0,0 +1,152 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+from typing import Iterator, List, Tuple
+
+from ocr_subnet.miner.engine import OCREngine
+
+
+def split(height: int, tile_height: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    Splits a page of the given height into overlapping horizontal bands.
+
+    Args:
+    - height (int): Height of the page in pixels.
+    - tile_height (int): Height of each band in pixels, including the overlap.
+    - overlap (int): Number of rows shared by neighbouring bands.
+
+    Returns:
+    - List[Tuple[int, int]]: (top, bottom) rows of each band.
+    """
+    stride = max(1, tile_height - overlap)
+    bands = []
+    top = 0
+    while True:
+        bottom = min(height, top + tile_height)
+        bands.append((top, bottom))
+        if bottom >= height:
+            return bands
+        top += stride
+
+
+def owned(bands: List[Tuple[int, int]], i: int, data: dict) -> dict:
+    """
+    Returns the words of band i which it owns, in page coordinates.
+
+    Words in the overlaps are found twice (or cut in half in one of the bands). Each band owns the rows between the
+    midpoints of its overlaps with its neighbours, and a word is only kept from the band which owns its vertical
+    center. As long as the overlap is taller than a line of text, this keeps the copy which is furthest from a cut.
+
+    Args:
+    - bands (List[Tuple[int, int]]): (top, bottom) rows of each band, as returned by split.
+    - i (int): Index of the band.
+    - data (dict): Dict-of-lists OCR data of the band, in band coordinates.
+
+    Returns:
+    - dict: Dict-of-lists OCR data of the owned words.
+    """
+    top, bottom = bands[i]
+    owned_top = 0 if i == 0 else (top + bands[i - 1][1]) / 2
+    owned_bottom = float('inf') if i == len(bands) - 1 else (bottom + bands[i + 1][0]) / 2
+
+    result = {'text': [], 'left': [], 'top': [], 'width': [], 'height': [], 'conf': []}
+    for j in range(len(data['text'])):
+        y = top + data['top'][j]
+        center = y + data['height'][j] / 2
+        if not owned_top <= center < owned_bottom:
+            continue
+
+        result['text'].append(data['text'][j])
+        result['left'].append(data['left'][j])
+        result['top'].append(y)
+        result['width'].append(data['width'][j])
+        result['height'].append(data['height'][j])
+        result['conf'].append(data['conf'][j] if 'conf' in data else -1)
+
+    return result
+
+
+def merge(bands: List[Tuple[int, int]], results: List[dict]) -> dict:
+    """
+    Merges the OCR data of each band into page coordinates, keeping each word from the band which owns it.
+
+    Args:
+    - bands (List[Tuple[int, int]]): (top, bottom) rows of each band, as returned by split.
+    - results (List[dict]): Dict-of-lists OCR data of each band, in band coordinates.
+
+    Returns:
+    - dict: Dict-of-lists OCR data of the page.
+    """
+    merged = {'text': [], 'left': [], 'top': [], 'width': [], 'height': [], 'conf': []}
+    for i, data in enumerate(results):
+        for key, values in owned(bands, i, data).items():
+            merged[key].extend(values)
+
+    return merged
+
+
+def image_to_data(image, engine: OCREngine, tile_height: int, overlap: int, psm: int = None) -> dict:
+    """
+    Runs OCR on overlapping horizontal bands of the image in parallel and merges the results. Bands are submitted to
+    the engine all at once, so they run concurrently on engines with several workers. An InProcessEngine runs them
+    one after another.
+
+    Args:
+    - image (PIL.Image): The page.
+    - engine (OCREngine): Engine used for OCR.
+    - tile_height (int): Height of each band in pixels, including the overlap.
+    - overlap (int): Number of rows shared by neighbouring bands.
+    - psm (int): Tesseract page segmentation mode.
+
+    Returns:
+    - dict: Dict-of-lists OCR data of the page.
+    """
+    width, height = image.size
+    bands = split(height, tile_height, overlap)
+    if len(bands) == 1:
+        return engine.image_to_data(image, psm=psm)
+
+    futures = [engine.submit(image.crop((0, top, width, bottom)), psm=psm) for top, bottom in bands]
+    return merge(bands, [future.result() for future in futures])
+
+
+def iter_bands(image, engine: OCREngine, tile_height: int, overlap: int, psm: int = None) -> Iterator[dict]:
+    """
+    Like image_to_data, but yields the words owned by each band, in page coordinates, from top to bottom as soon as
+    the band is done rather than waiting for the whole page.
+
+    Args:
+    - image (PIL.Image): The page.
+    - engine (OCREngine): Engine used for OCR.
+    - tile_height (int): Height of each band in pixels, including the overlap.
+    - overlap (int): Number of rows shared by neighbouring bands.
+    - psm (int): Tesseract page segmentation mode.
+
+    Yields:
+    - dict: Dict-of-lists OCR data of each band.
+    """
+    width, height = image.size
+    bands = split(height, tile_height, overlap)
+    futures = [engine.submit(image.crop((0, top, width, bottom)), psm=psm) for top, bottom in bands]
+    try:
+        for i, future in enumerate(futures):
+            yield owned(bands, i, future.result())
+    finally:
+        # Don't leave bands running if the consumer stops early, e.g. at its deadline
+        for future in futures:
+            future.cancel()
@@ -16,8 +16,9 @@
 # DEALINGS IN THE SOFTWARE.
 
 
+import json
 import bittensor as bt
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator
 
 class OCRSynapse(bt.Synapse):
     """
@@ -46,3 +47,90 @@ class OCRSynapse(bt.Synapse):
         - List[dict]: The deserialized response, which is a list of dictionaries containing the extracted data.
         """
         return self.response
+
+
+class OCRStreamingSynapse(bt.StreamingSynapse):
+    """
+    Streaming variant of OCRSynapse, in which the miner sends sections as soon as they are extracted instead of
+    answering once the whole page is done. The validator can score chunks as they arrive and stop reading at its
+    deadline while keeping the sections it already has.
+
+    The stream is newline delimited JSON: each line is a list of sections, e.g. the sections of one band of the page.
+
+    Attributes:
+    - base64_image: Base64 encoding of pdf image to be processed by the miner.
+    - response: List[dict] of all sections received so far.
+    """
+
+    # Required request input, filled by sending dendrite caller. It is a base64 encoded string.
+    base64_image: str
+
+    # Sections received so far, filled by the receiving validator as the stream is read.
+    response: Optional[List[dict]] = None
+
+    async def process_streaming_response(self, response) -> AsyncIterator[List[dict]]:
+        """
+        Reads the miner's stream and yields each chunk of sections as soon as it is complete, also appending it to
+        self.response.
+
+        Args:
+        - response (aiohttp.ClientResponse): The streaming HTTP response from the miner.
+
+        Yields:
+        - List[dict]: The sections in each chunk.
+        """
+        if self.response is None:
+            self.response = []
+
+        buffer = b""
+        async for data in response.content.iter_any():
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    sections = json.loads(line)
+                except json.JSONDecodeError:
+                    bt.logging.debug(f"Dropping malformed chunk of {len(line)} bytes")
+                    continue
+                if not isinstance(sections, list):
+                    continue
+                self.response.extend(sections)
+                yield sections
+
+    def extract_response_json(self, response) -> dict:
+        """
+        Builds the synapse fields from the headers of the streaming response, once the stream has been read.
+
+        Args:
+        - response (aiohttp.ClientResponse): The streaming HTTP response from the miner.
+
+        Returns:
+        - dict: Synapse fields, with the sections received so far as the response.
+        """
+        headers = {key.decode("utf-8"): value.decode("utf-8") for key, value in response.__dict__["_raw_headers"]}
+
+        def extract_info(prefix: str) -> dict:
+            return {key.split("_")[-1]: value for key, value in headers.items() if key.startswith(prefix)}
+
+        return {
+            "name": headers.get("name", ""),
+            "timeout": float(headers.get("timeout", 0)),
+            "total_size": int(headers.get("total_size", 0)),
+            "header_size": int(headers.get("header_size", 0)),
+            "dendrite": extract_info("bt_header_dendrite"),
+            "axon": extract_info("bt_header_axon"),
+            # The image is not echoed back by the miner
+            "base64_image": "",
+            "response": self.response,
+        }
+
+    def deserialize(self) -> List[dict]:
+        """
+        Deserialize the miner response.
+
+        Returns:
+        - List[dict]: The sections received so far.
+        """
+        return self.response
@@ -1,4 +1,15 @@
 from . import config
 from . import misc
-from . import uids
 from . import process
+from . import metrics
+from . import pipeline
+from . import metagraph
+
+
+def __getattr__(name):
+    # uids and sampling depend on torch and are only used by validators, so they are imported on first access.
+    if name in ("uids", "sampling"):
+        import importlib
+
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
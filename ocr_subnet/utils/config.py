@@ -17,7 +17,6 @@
 # DEALINGS IN THE SOFTWARE.
 
 import os
-import torch
 import argparse
 import bittensor as bt
 from loguru import logger
@@ -88,6 +87,20 @@ def add_args(cls, parser):
         default=100,
     )
 
+    parser.add_argument(
+        "--neuron.block_time",
+        type=float,
+        help="Seconds per block, used to extrapolate the current block between reads from the chain.",
+        default=12.0,
+    )
+
+    parser.add_argument(
+        "--neuron.block_clock_interval",
+        type=float,
+        help="Longest time in seconds between reads of the current block from the chain. Shortened when the extrapolated block drifts.",
+        default=300.0,
+    )
+
     parser.add_argument(
         "--neuron.events_retention_size",
         type=str,
@@ -117,6 +130,175 @@ def add_args(cls, parser):
             default=10,
         )
 
+        parser.add_argument(
+            "--neuron.timeout",
+            type=float,
+            help="Seconds the validator waits for miner responses. Also the time scale of the time reward.",
+            default=10.0,
+        )
+
+        parser.add_argument(
+            "--neuron.alpha_prediction",
+            type=float,
+            help="Weight of the prediction reward in a miner's total reward.",
+            default=0.9,
+        )
+
+        parser.add_argument(
+            "--neuron.alpha_time",
+            type=float,
+            help="Weight of the time reward in a miner's total reward.",
+            default=0.1,
+        )
+
+        parser.add_argument(
+            "--neuron.alpha_position",
+            type=float,
+            help="Weight of the position reward of each section.",
+            default=1.0,
+        )
+
+        parser.add_argument(
+            "--neuron.alpha_text",
+            type=float,
+            help="Weight of the text reward of each section.",
+            default=1.0,
+        )
+
+        parser.add_argument(
+            "--neuron.alpha_font",
+            type=float,
+            help="Weight of the font reward of each section.",
+            default=1.0,
+        )
+
+        parser.add_argument(
+            "--neuron.query_mode",
+            type=str,
+            choices=["full", "quorum", "adaptive"],
+            help="When to stop waiting for responses: full waits up to the timeout, quorum stops once --neuron.quorum "
+            "of the miners answered, adaptive stops at a deadline per miner from its latency history. Miners cut off "
+            "are scored as timeouts. See ocr_subnet.validator.cutoff.QueryCutoff.",
+            default="full",
+        )
+
+        parser.add_argument(
+            "--neuron.quorum",
+            type=float,
+            help="Share of the queried miners which must answer before a quorum query is cut off.",
+            default=0.8,
+        )
+
+        parser.add_argument(
+            "--neuron.quorum_grace",
+            type=float,
+            help="Seconds to keep waiting for the remaining miners once the quorum has answered. Miners which have not "
+            "answered by then score zero, so without a grace period the slowest share of the miners always does.",
+            default=0.5,
+        )
+
+        parser.add_argument(
+            "--neuron.deadline_quantile",
+            type=float,
+            help="Percentile of a miner's latencies used for its adaptive deadline.",
+            default=90,
+        )
+
+        parser.add_argument(
+            "--neuron.deadline_multiplier",
+            type=float,
+            help="Adaptive deadlines are this multiple of the latency percentile.",
+            default=1.5,
+        )
+
+        parser.add_argument(
+            "--neuron.min_deadline",
+            type=float,
+            help="Shortest adaptive deadline in seconds.",
+            default=1.0,
+        )
+
+        parser.add_argument(
+            "--neuron.stream",
+            action="store_true",
+            help="Query miners with the streaming protocol, scoring sections as they arrive and giving partial credit "
+            "for the sections received before the timeout.",
+            default=False,
+        )
+
+        parser.add_argument(
+            "--neuron.disable_pipeline",
+            action="store_true",
+            help="Run forwards one round at a time instead of pipelining challenge generation, querying, scoring "
+            "and score updates.",
+            default=False,
+        )
+
+        parser.add_argument(
+            "--neuron.generate_concurrency",
+            type=int,
+            help="Number of challenges generated concurrently by the pipeline.",
+            default=1,
+        )
+
+        parser.add_argument(
+            "--neuron.query_concurrency",
+            type=int,
+            help="Number of challenges whose miners are queried concurrently by the pipeline.",
+            default=2,
+        )
+
+        parser.add_argument(
+            "--neuron.score_concurrency",
+            type=int,
+            help="Number of challenges scored concurrently by the pipeline.",
+            default=1,
+        )
+
+        parser.add_argument(
+            "--neuron.pipeline_queue_size",
+            type=int,
+            help="Number of challenges which may wait between two pipeline stages.",
+            default=2,
+        )
+
+        parser.add_argument(
+            "--neuron.pipeline_log_interval",
+            type=float,
+            help="Seconds between logs of pipeline stage utilization.",
+            default=60,
+        )
+
+        parser.add_argument(
+            "--neuron.disable_background_sync",
+            action="store_true",
+            help="Sync with the chain (registration, metagraph, weights, state) inline after each step instead of in a "
+            "background thread.",
+            default=False,
+        )
+
+        parser.add_argument(
+            "--neuron.sync_interval",
+            type=float,
+            help="Seconds between background chain syncs.",
+            default=60,
+        )
+
+        parser.add_argument(
+            "--neuron.sampling_strategy",
+            type=str,
+            choices=["uniform", "staleness", "uncertainty", "new_first"],
+            help="How miners are picked each step. See ocr_subnet.utils.sampling.SamplingScheduler.",
+            default="uniform",
+        )
+
+        parser.add_argument(
+            "--neuron.history_size",
+            type=int,
+            help="Number of queries of each miner kept in the validator's history. See ocr_subnet.validator.history.History.",
+            default=64,
+        )
+
         parser.add_argument(
             "--neuron.disable_set_weights",
             action="store_true",
@@ -163,6 +345,140 @@ def add_args(cls, parser):
             default=False,
         )
 
+        parser.add_argument(
+            "--neuron.ocr_engine",
+            type=str,
+            choices=["pool", "pytesseract"],
+            help="OCR engine. 'pool' runs OCR in long-lived worker processes which load the models once (requires "
+            "tesserocr, otherwise each worker spawns tesseract per image), 'pytesseract' spawns tesseract per request.",
+            default="pool",
+        )
+
+        parser.add_argument(
+            "--neuron.ocr_workers",
+            type=int,
+            help="Number of OCR worker processes. Defaults to the number of cpus.",
+            default=None,
+        )
+
+        parser.add_argument(
+            "--neuron.ocr_queue_depth",
+            type=int,
+            help="Maximum number of images queued or running in the OCR worker pool. Defaults to twice the number of workers.",
+            default=None,
+        )
+
+        parser.add_argument(
+            "--neuron.ocr_lang",
+            type=str,
+            help="Tesseract language used by the OCR workers.",
+            default="eng",
+        )
+
+        parser.add_argument(
+            "--neuron.executor",
+            type=str,
+            choices=["thread", "process"],
+            help="Executor for the CPU bound part of forward (decode, OCR and post-processing).",
+            default="thread",
+        )
+
+        parser.add_argument(
+            "--neuron.executor_workers",
+            type=int,
+            help="Number of executor threads or processes. Defaults to the number of cpus.",
+            default=None,
+        )
+
+        parser.add_argument(
+            "--neuron.max_pending",
+            type=int,
+            help="Maximum number of requests handed to the executor at once, further requests wait. Defaults to twice the number of executor workers.",
+            default=None,
+        )
+
+        parser.add_argument(
+            "--neuron.deadline_margin",
+            type=float,
+            help="Seconds reserved for network transfer when computing a request's deadline from its timeout.",
+            default=0.5,
+        )
+
+        parser.add_argument(
+            "--neuron.cache_size",
+            type=int,
+            help="Number of OCR results to cache by image content hash. Set to 0 to disable the cache.",
+            default=256,
+        )
+
+        parser.add_argument(
+            "--neuron.cache_ttl",
+            type=float,
+            help="Time-to-live of cached OCR results, in seconds.",
+            default=600,
+        )
+
+        parser.add_argument(
+            "--neuron.tile_height",
+            type=int,
+            help="If positive, pages are split into horizontal bands of this many pixels which are OCR'd in parallel. "
+            "With --neuron.executor process, the bands of a page run one after another in its executor process.",
+            default=0,
+        )
+
+        parser.add_argument(
+            "--neuron.tile_overlap",
+            type=int,
+            help="Number of pixel rows shared by neighbouring bands. Should be taller than a line of text.",
+            default=64,
+        )
+
+        parser.add_argument(
+            "--neuron.ocr_mode",
+            type=str,
+            choices=["adaptive", "fast", "balanced", "accurate"],
+            help="OCR speed/accuracy mode. 'adaptive' picks the most accurate mode expected to finish within each "
+            "request's time budget.",
+            default="adaptive",
+        )
+
+        parser.add_argument(
+            "--neuron.preprocess",
+            type=str,
+            nargs="*",
+            choices=["grayscale", "binarize", "despeckle", "deskew", "crop"],
+            help="Image preprocessing steps to run before OCR, e.g. --neuron.preprocess binarize deskew crop.",
+            default=[],
+        )
+
+        parser.add_argument(
+            "--neuron.batch_window",
+            type=float,
+            help="If positive, requests arriving within this many milliseconds are OCR'd together as one batch.",
+            default=0,
+        )
+
+        parser.add_argument(
+            "--neuron.max_batch_size",
+            type=int,
+            help="Maximum number of requests in a batch.",
+            default=8,
+        )
+
+        parser.add_argument(
+            "--neuron.metrics_port",
+            type=int,
+            help="If set, serves stage latencies and other miner metrics as JSON on http://127.0.0.1:<port>/metrics.",
+            default=None,
+        )
+
+        parser.add_argument(
+            "--neuron.metrics_log_interval",
+            type=float,
+            help="How often to log a summary of the miner metrics, in seconds.",
+            default=60,
+        )
+
 
 def config(cls):
     """
@@ -0,0 +1,57 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+from typing import List, NamedTuple, Sequence
+
+
+class HotkeyDiff(NamedTuple):
+    """
+    Uids whose hotkey changed between two metagraph syncs.
+
+    Attributes:
+    - replaced: Uids which now belong to a different hotkey.
+    - added: Uids which did not exist before.
+    - removed: Uids which no longer exist.
+    """
+
+    replaced: List[int]
+    added: List[int]
+    removed: List[int]
+
+    def __bool__(self) -> bool:
+        return bool(self.replaced or self.added or self.removed)
+
+
+def hotkeys_fingerprint(hotkeys: Sequence[str]) -> int:
+    """Hash of the hotkey of every uid, which changes whenever a uid changes hands or the metagraph changes size."""
+    return hash(tuple(hotkeys))
+
+
+def axons_fingerprint(axons: Sequence) -> int:
+    """Hash of the hotkey and endpoint of every axon, which changes whenever a miner moves or is replaced."""
+    return hash(tuple((axon.hotkey, axon.ip, axon.port, axon.ip_type, axon.version) for axon in axons))
+
+
+def diff_hotkeys(old: Sequence[str], new: Sequence[str]) -> HotkeyDiff:
+    """Compares the hotkeys of each uid before and after a sync."""
+    common = min(len(old), len(new))
+    return HotkeyDiff(
+        replaced=[uid for uid in range(common) if old[uid] != new[uid]],
+        added=list(range(len(old), len(new))),
+        removed=list(range(len(new), len(old))),
+    )
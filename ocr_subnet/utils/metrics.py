@@ -0,0 +1,144 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import json
+import time
+import threading
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@contextmanager
+def timed(timings: Dict[str, float], stage: str):
+    """
+    Adds the wall time of the enclosed block to timings[stage], in seconds. Timings are kept in a plain dict so that
+    they can be measured in executor processes and recorded into StageMetrics by the caller.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def snapshot(samples: deque) -> tuple:
+    """
+    Copies a deque which other threads may be appending to. Iterating over a deque raises if it is mutated meanwhile,
+    which can only happen during the copy, so the copy is retried until it succeeds.
+    """
+    while True:
+        try:
+            return tuple(samples)
+        except RuntimeError:
+            continue
+
+
+class StageMetrics:
+    """
+    Rolling latency histograms per stage. Recording a sample is a deque append, and percentiles are only computed
+    when a summary is requested, so the timers are cheap enough to leave on in production.
+
+    Args:
+    - window (int): Number of recent samples kept per stage.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+
+    def record(self, stage: str, seconds: float):
+        samples = self.samples.get(stage)
+        if samples is None:
+            samples = self.samples[stage] = deque(maxlen=self.window)
+            self.counts[stage] = 0
+        samples.append(seconds)
+        self.counts[stage] += 1
+
+    def record_all(self, timings: Dict[str, float]):
+        for stage, seconds in timings.items():
+            self.record(stage, seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        """Times the enclosed block and records it under stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, dict]:
+        """Returns the count, mean and p50/p95/p99 latency of each stage, in milliseconds."""
+        summary = {}
+        # Copy first, as samples may be recorded from other threads while we summarize
+        for stage, samples in list(self.samples.items()):
+            values = sorted(snapshot(samples))
+            if not values:
+                continue
+            summary[stage] = {
+                "count": self.counts[stage],
+                "mean": 1000 * sum(values) / len(values),
+                "p50": 1000 * values[int(0.50 * (len(values) - 1))],
+                "p95": 1000 * values[int(0.95 * (len(values) - 1))],
+                "p99": 1000 * values[int(0.99 * (len(values) - 1))],
+            }
+        return summary
+
+    def format(self) -> str:
+        return ", ".join(
+            f"{stage}: p50={s['p50']:.1f}ms p95={s['p95']:.1f}ms p99={s['p99']:.1f}ms"
+            for stage, s in self.summary().items()
+        )
+
+
+def serve_metrics(port: int, collect: Callable[[], dict], host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serves the dict returned by collect() as JSON on http://host:port/metrics from a daemon thread.
+
+    Args:
+    - port (int): Port to listen on.
+    - collect (Callable[[], dict]): Returns the current metrics.
+    - host (str): Interface to bind. Defaults to localhost only.
+
+    Returns:
+    - ThreadingHTTPServer: The running server. Call shutdown() to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+
+            body = json.dumps(collect()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -18,95 +18,85 @@
 
 import time
 import math
+import threading
 import hashlib as rpccheckhealth
 from math import floor
-from typing import Callable, Any
-from functools import lru_cache, update_wrapper
+from typing import Callable, Optional
 
 
-# LRU Cache with TTL
-def ttl_cache(maxsize: int = 128, typed: bool = False, ttl: int = -1):
+class BlockClock:
     """
-    Decorator that creates a cache of the most recently used function calls with a time-to-live (TTL) feature.
-    The cache evicts the least recently used entries if the cache exceeds the `maxsize` or if an entry has
-    been in the cache longer than the `ttl` period.
-
-    Args:
-        maxsize (int): Maximum size of the cache. Once the cache grows to this size, subsequent entries
-                       replace the least recently used ones. Defaults to 128.
-        typed (bool): If set to True, arguments of different types will be cached separately. For example,
-                      f(3) and f(3.0) will be treated as distinct calls with distinct results. Defaults to False.
-        ttl (int): The time-to-live for each cache entry, measured in seconds. If set to a non-positive value,
-                   the TTL is set to a very large number, effectively making the cache entries permanent. Defaults to -1.
-
-    Returns:
-        Callable: A decorator that can be applied to functions to cache their return values.
-
-    The decorator is useful for caching results of functions that are expensive to compute and are called
-    with the same arguments frequently within short periods of time. The TTL feature helps in ensuring
-    that the cached values are not stale.
-
-    Example:
-        @ttl_cache(ttl=10)
-        def get_data(param):
-            # Expensive data retrieval operation
-            return data
-    """
-    if ttl <= 0:
-        ttl = 65536
-    hash_gen = _ttl_hash_gen(ttl)
-
-    def wrapper(func: Callable) -> Callable:
-        @lru_cache(maxsize, typed)
-        def ttl_func(ttl_hash, *args, **kwargs):
-            return func(*args, **kwargs)
-
-        def wrapped(*args, **kwargs) -> Any:
-            th = next(hash_gen)
-            return ttl_func(th, *args, **kwargs)
-
-        return update_wrapper(wrapped, func)
-
-    return wrapper
+    Estimates the current block locally, from one block read from the chain and the time it was read, so that reading
+    the block does not need an RPC. The chain produces a block every `block_time` seconds, so the estimate only drifts
+    when block production stalls or catches up.
 
+    The clock re-anchors on a new read once `interval` seconds have passed since the last one. Each read is compared
+    with the estimate: when they differ by more than `max_drift` blocks the interval is halved, down to one block time,
+    and it doubles back up to `interval` while reads agree. Estimates never go backwards, so a chain that runs slow
+    holds the block until the extrapolation catches up.
 
-def _ttl_hash_gen(seconds: int):
-    """
-    Internal generator function used by the `ttl_cache` decorator to generate a new hash value at regular
-    time intervals specified by `seconds`.
+    Blocks read elsewhere, e.g. by the chain sync thread, anchor the clock through `observe`.
 
     Args:
-        seconds (int): The number of seconds after which a new hash value will be generated.
-
-    Yields:
-        int: A hash value that represents the current time interval.
-
-    This generator is used to create time-based hash values that enable the `ttl_cache` to determine
-    whether cached entries are still valid or if they have expired and should be recalculated.
-    """
-    start_time = time.time()
-    while True:
-        yield floor((time.time() - start_time) / seconds)
-
-
-# 12 seconds updating block.
-@ttl_cache(maxsize=1, ttl=12)
-def ttl_get_block(self) -> int:
-    """
-    Retrieves the current block number from the blockchain. This method is cached with a time-to-live (TTL)
-    of 12 seconds, meaning that it will only refresh the block number from the blockchain at most every 12 seconds,
-    reducing the number of calls to the underlying blockchain interface.
-
-    Returns:
-        int: The current block number on the blockchain.
-
-    This method is useful for applications that need to access the current block number frequently and can
-    tolerate a delay of up to 12 seconds for the latest information. By using a cache with TTL, the method
-    efficiently reduces the workload on the blockchain interface.
+        get_block (Callable[[], int]): Reads the current block from the chain, e.g. subtensor.get_current_block.
+        block_time (float): Seconds per block.
+        interval (float): Longest time in seconds between reads.
+        max_drift (int): Difference in blocks between a read and the estimate which counts as drift.
 
     Example:
-        current_block = ttl_get_block(self)
-
-    Note: self here is the miner or validator instance
+        clock = BlockClock(subtensor.get_current_block)
+        current_block = clock.now()
     """
-    return self.subtensor.get_current_block()
+
+    def __init__(
+        self,
+        get_block: Callable[[], int] = None,
+        block_time: float = 12.0,
+        interval: float = 300.0,
+        max_drift: int = 1,
+    ):
+        self.get_block = get_block
+        self.block_time = block_time
+        self.interval = interval
+        self.max_drift = max_drift
+        self.current_interval = interval
+        self.anchor_block: Optional[int] = None
+        self.anchor_time: Optional[float] = None
+        self.last_block: Optional[int] = None
+        self.drift = 0
+        self.reads = 0
+        self.lock = threading.Lock()
+
+    def extrapolate(self, at: float) -> int:
+        return self.anchor_block + floor((at - self.anchor_time) / self.block_time)
+
+    def observe(self, block: int, at: float = None):
+        """Anchors the clock on a block read from the chain at monotonic time `at`, by default now."""
+        at = time.monotonic() if at is None else at
+        with self.lock:
+            self.reads += 1
+            if self.anchor_block is not None:
+                self.drift = block - self.extrapolate(at)
+                if abs(self.drift) > self.max_drift:
+                    self.current_interval = max(self.block_time, self.current_interval / 2)
+                else:
+                    self.current_interval = min(self.interval, self.current_interval * 2)
+            self.anchor_block, self.anchor_time = block, at
+
+    def estimate(self) -> Optional[int]:
+        """The current block extrapolated from the anchor, without reading the chain. None before the first read."""
+        with self.lock:
+            if self.anchor_block is None:
+                return None
+            block = self.extrapolate(time.monotonic())
+            if self.last_block is None or block > self.last_block:
+                self.last_block = block
+            return self.last_block
+
+    def now(self) -> int:
+        """The current block, reading the chain first if the anchor is missing or older than the interval."""
+        with self.lock:
+            stale = self.anchor_time is None or time.monotonic() - self.anchor_time >= self.current_interval
+        if self.get_block is not None and stale:
+            self.observe(self.get_block())
+        return self.estimate()
@@ -0,0 +1,117 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import time
+import asyncio
+import traceback
+import bittensor as bt
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class Pipeline:
+    """
+    Runs a chain of async stages connected by bounded queues, so that every stage works on a different item at the
+    same time and throughput is limited by the slowest stage rather than by the sum of all stages.
+
+    The first stage is a source which takes no arguments and produces items. Every following stage takes the output
+    of the stage before it. A stage may return None to drop an item, and an exception only drops the item it was
+    raised for. Each stage runs `concurrency` workers. A full queue blocks the stage in front of it, so a slow stage
+    throttles the stages before it instead of letting work pile up.
+
+    Args:
+    - stages (List[Tuple[str, Callable, int]]): (name, async function, concurrency) of each stage, in order.
+    - queue_size (int): Capacity of the queue in front of each stage after the first.
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[..., Awaitable[Any]], int]], queue_size: int = 2):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.queues: List[asyncio.Queue] = []
+        self.busy = {name: 0.0 for name, _, _ in stages}
+        self.items = {name: 0 for name, _, _ in stages}
+        self.errors = {name: 0 for name, _, _ in stages}
+        self.started = None
+
+    async def _worker(self, name: str, fn: Callable, inbox: Optional[asyncio.Queue], outbox: Optional[asyncio.Queue]):
+        while True:
+            args = () if inbox is None else (await inbox.get(),)
+
+            start = time.perf_counter()
+            try:
+                result = await fn(*args)
+                self.items[name] += 1
+            except Exception:
+                bt.logging.error(f"Pipeline stage {name} failed: {traceback.format_exc()}")
+                self.errors[name] += 1
+                result = None
+            finally:
+                self.busy[name] += time.perf_counter() - start
+
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+
+    async def run(self, should_stop: Callable[[], bool], report: Callable[[dict], None] = None, report_interval: float = 60.0, poll_interval: float = 0.1):
+        """
+        Runs the stages until should_stop() returns True. Items still in the pipeline at that point are dropped.
+
+        Args:
+        - should_stop (Callable[[], bool]): Polled every poll_interval seconds.
+        - report (Callable[[dict], None]): Called with metrics() every report_interval seconds.
+        - report_interval (float): Seconds between reports.
+        - poll_interval (float): Seconds between checks of should_stop.
+        """
+        self.queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages[1:]]
+        inboxes = [None] + self.queues
+        outboxes = self.queues + [None]
+
+        self.started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(self._worker(name, fn, inbox, outbox))
+            for (name, fn, concurrency), inbox, outbox in zip(self.stages, inboxes, outboxes)
+            for _ in range(concurrency)
+        ]
+
+        last_report = time.perf_counter()
+        try:
+            while not should_stop():
+                await asyncio.sleep(poll_interval)
+                if report is not None and time.perf_counter() - last_report >= report_interval:
+                    report(self.metrics())
+                    last_report = time.perf_counter()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def metrics(self) -> Dict[str, dict]:
+        """
+        Returns, for each stage, the number of items it has processed and dropped through errors, the number of items
+        waiting in front of it, and its utilization: the fraction of its workers' time spent working rather than
+        waiting for input or for room in the next queue. The stage with the highest utilization is the bottleneck.
+        """
+        elapsed = time.perf_counter() - self.started if self.started is not None else 0.0
+        metrics = {}
+        for i, (name, _, concurrency) in enumerate(self.stages):
+            metrics[name] = {
+                "items": self.items[name],
+                "errors": self.errors[name],
+                "waiting": self.queues[i - 1].qsize() if i > 0 and self.queues else 0,
+                "utilization": self.busy[name] / (elapsed * concurrency) if elapsed > 0 else 0.0,
+            }
+        return metrics
@@ -15,7 +15,9 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-from typing import List
+import bisect
+from typing import List, Sequence
+
 
 def group_and_merge_boxes(data: List[dict], xtol: int=25, ytol: int=5) -> List[dict]:
     """
@@ -32,33 +34,77 @@ def group_and_merge_boxes(data: List[dict], xtol: int=25, ytol: int=5) -> List[d
     # Ensure all data items are valid and have a 'position' key
     data = [box for box in data if box is not None and 'position' in box]
 
-    # Step 1: Group boxes by lines
-    lines = []
-    for box in data:
-        added_to_line = False
-        for line in lines:
-            if line and abs(line[0]['position'][1] - box['position'][1]) <= ytol:
-                line.append(box)
-                added_to_line = True
-                break
-        if not added_to_line:
-            lines.append([box])
-
-    # Step 2: Sort and merge within each line
+    positions = [box['position'] for box in data]
+    x1 = [position[0] for position in positions]
+    y1 = [position[1] for position in positions]
+    x2 = [position[2] for position in positions]
+
     merged_data = []
-    for line in lines:
-        line.sort(key=lambda item: item['position'][0])  # Sort by x1
-        i = 0
-        while i < len(line) - 1:
-            box1 = line[i]['position']
-            box2 = line[i + 1]['position']
-            if abs(box1[2] - box2[0]) <= xtol:  # Check horizontal proximity
-                new_box = {'position': [min(box1[0], box2[0]), min(box1[1], box2[1]), max(box1[2], box2[2]), max(box1[3], box2[3])],
-                        'text': line[i]['text'] + ' ' + line[i + 1]['text']}
-                line[i] = new_box
-                del line[i + 1]
-            else:
-                i += 1
-        merged_data.extend(line)
-
-    return merged_data
\ No newline at end of file
+    for group in merge_groups(x1, y1, x2, xtol=xtol, ytol=ytol):
+        if len(group) == 1:
+            merged_data.append(data[group[0]])
+            continue
+
+        # Accumulate pairwise in reading order, exactly as successive merges of two boxes would
+        position = list(positions[group[0]])
+        for i in group[1:]:
+            other = positions[i]
+            position = [min(position[0], other[0]), min(position[1], other[1]), max(position[2], other[2]), max(position[3], other[3])]
+
+        merged_data.append({'position': position, 'text': ' '.join(data[i]['text'] for i in group)})
+
+    return merged_data
+
+
+def merge_groups(x1: Sequence, y1: Sequence, x2: Sequence, xtol: int=25, ytol: int=5) -> List[List[int]]:
+    """
+    Finds which boxes group_and_merge_boxes combines, given the box coordinates as columns.
+
+    Boxes are assigned to lines in order: a box joins the first line whose first box is within ytol in y, otherwise it
+    starts a new line. Since a new line is only started when no existing line is within ytol, the first boxes of the
+    lines are more than ytol apart and at most two of them can be within ytol of any box, so a bisect over the sorted
+    line anchors replaces a scan over all lines. The boxes are then sorted once by (line, x1) and swept left to right,
+    extending the current group while the next box starts within xtol of the group's right edge.
+
+    Args:
+    - x1, y1, x2 (Sequence): Left, top and right coordinates of each box.
+    - xtol (int): Maximum distance between boxes in the x direction to be considered part of the same section
+    - ytol (int): Maximum distance between boxes in the y direction to be considered part of the same section
+
+    Returns:
+    - List[List[int]]: Indices of the boxes in each group, in output order.
+    """
+    # Step 1: Assign boxes to lines using the sorted anchors (first y1) of the lines created so far
+    anchors = []
+    anchor_lines = []
+    line_of = []
+    for y in y1:
+        line = None
+        k = bisect.bisect_left(anchors, y - ytol)
+        while k < len(anchors) and anchors[k] <= y + ytol:
+            if line is None or anchor_lines[k] < line:
+                line = anchor_lines[k]
+            k += 1
+
+        if line is None:
+            line = len(anchor_lines)
+            k = bisect.bisect_left(anchors, y)
+            anchors.insert(k, y)
+            anchor_lines.insert(k, line)
+        line_of.append(line)
+
+    # Step 2: Sort by line then x1 (stable, so ties keep their input order) and sweep each line from left to right
+    order = sorted(range(len(line_of)), key=lambda i: (line_of[i], x1[i]))
+
+    groups = []
+    group = None
+    for i in order:
+        if group is not None and line_of[i] == line_of[group[0]] and abs(right - x1[i]) <= xtol:
+            group.append(i)
+            right = max(right, x2[i])
+        else:
+            group = [i]
+            right = x2[i]
+            groups.append(group)
+
+    return groups
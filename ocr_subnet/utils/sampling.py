@@ -0,0 +1,153 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import torch
+
+from typing import List
+
+
+STRATEGIES = ["uniform", "staleness", "uncertainty", "new_first"]
+
+
+class SamplingScheduler:
+    """
+    Chooses which available miners to query each step, spending the validator's query budget where scores are least
+    settled instead of re-querying well known miners. Keeps per-uid query counts, the step each uid was last queried
+    and a running mean and variance of its rewards.
+
+    Strategies:
+    - uniform: every available uid is equally likely, as in get_random_uids.
+    - staleness: uids are drawn with probability proportional to the number of steps since they were last queried.
+    - uncertainty: uids are drawn with probability proportional to the standard error of their mean reward, so
+      miners with few or noisy rewards are queried more.
+    - new_first: uids queried fewer than min_queries times (e.g. newly registered miners) are always picked first,
+      the rest uniformly.
+
+    Args:
+    - strategy (str): One of STRATEGIES.
+    - n (int): Number of uids in the metagraph.
+    - min_queries (int): Queries before a uid stops counting as new.
+    - prior_variance (float): Reward variance assumed for uids with fewer than two rewards. Rewards are in [0, 1], so
+      0.25 is the largest possible variance.
+    """
+
+    def __init__(self, strategy: str = "uniform", n: int = 0, min_queries: int = 3, prior_variance: float = 0.25):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown sampling strategy {strategy!r}, expected one of {STRATEGIES}")
+        self.strategy = strategy
+        self.min_queries = min_queries
+        self.prior_variance = prior_variance
+        self.counts = torch.zeros(0, dtype=torch.long)
+        self.last_step = torch.zeros(0, dtype=torch.long)
+        self.mean = torch.zeros(0)
+        self.m2 = torch.zeros(0)
+        self.resize(n)
+
+    def resize(self, n: int):
+        """Grows the per-uid statistics when the metagraph grows. New uids start as never queried."""
+        grow = n - len(self.counts)
+        if grow <= 0:
+            return
+        self.counts = torch.cat([self.counts, torch.zeros(grow, dtype=torch.long)])
+        self.last_step = torch.cat([self.last_step, torch.full((grow,), -1, dtype=torch.long)])
+        self.mean = torch.cat([self.mean, torch.zeros(grow)])
+        self.m2 = torch.cat([self.m2, torch.zeros(grow)])
+
+    def reset(self, uids: List[int]):
+        """Forgets the statistics of uids whose hotkey has been replaced by a new miner."""
+        uids = torch.as_tensor(uids, dtype=torch.long)
+        self.counts[uids] = 0
+        self.last_step[uids] = -1
+        self.mean[uids] = 0
+        self.m2[uids] = 0
+
+    def seed(self, counts, last_step, mean, m2):
+        """Restores the statistics of every uid, e.g. from the validator's query history after a restart."""
+        n = len(counts)
+        self.resize(n)
+        self.counts[:n] = torch.as_tensor(counts, dtype=torch.long)
+        self.last_step[:n] = torch.as_tensor(last_step, dtype=torch.long)
+        self.mean[:n] = torch.as_tensor(mean, dtype=torch.float32)
+        self.m2[:n] = torch.as_tensor(m2, dtype=torch.float32)
+
+    def state_dict(self) -> dict:
+        """The statistics of every uid, which restore the scheduler with seed(**state)."""
+        return {"counts": self.counts.clone(), "last_step": self.last_step.clone(), "mean": self.mean.clone(), "m2": self.m2.clone()}
+
+    def record(self, uids: torch.LongTensor, rewards: torch.FloatTensor, step: int):
+        """Updates the statistics of the queried uids with their rewards. Uids must be unique."""
+        uids = torch.as_tensor(uids, dtype=torch.long)
+        rewards = torch.as_tensor(rewards, dtype=torch.float32).cpu()
+        self.resize(int(uids.max()) + 1 if len(uids) else 0)
+
+        # Welford's online update of the mean and sum of squared deviations
+        self.counts[uids] += 1
+        delta = rewards - self.mean[uids]
+        self.mean[uids] += delta / self.counts[uids]
+        self.m2[uids] += delta * (rewards - self.mean[uids])
+        self.last_step[uids] = step
+
+    def weights(self, uids: torch.LongTensor, step: int) -> torch.FloatTensor:
+        """Relative probability of sampling each of the uids under the current strategy."""
+        if self.strategy == "staleness":
+            # Never queried uids have last_step -1, which makes them the stalest
+            return (step - self.last_step[uids]).clamp(min=1).float()
+
+        if self.strategy == "uncertainty":
+            counts = self.counts[uids]
+            variance = torch.where(counts > 1, self.m2[uids] / (counts - 1).clamp(min=1), torch.tensor(self.prior_variance))
+            return (variance / (counts + 1)).sqrt().clamp(min=1e-6)
+
+        return torch.ones(len(uids))
+
+    def sample(self, available: torch.LongTensor, k: int, step: int, exclude: List[int] = None) -> torch.LongTensor:
+        """
+        Returns k distinct uids drawn from the available ones.
+
+        Args:
+        - available (torch.LongTensor): Uids which may be queried, e.g. from ocr_subnet.utils.uids.available_uids.
+        - k (int): Number of uids to return, capped at the number of available uids.
+        - step (int): Current validator step.
+        - exclude (List[int]): Uids to avoid, only used when there are not enough others.
+        """
+        self.resize(int(available.max()) + 1 if len(available) else 0)
+        k = min(k, len(available))
+
+        if exclude:
+            is_excluded = torch.isin(available, torch.tensor(sorted(set(exclude)), dtype=available.dtype))
+            candidates = available[~is_excluded]
+            if len(candidates) < k:
+                # Not enough other uids, so keep them all and fill up with excluded ones
+                fill = self.draw(available[is_excluded], k - len(candidates), step)
+                return torch.cat([candidates, fill])
+            return self.draw(candidates, k, step)
+
+        return self.draw(available, k, step)
+
+    def draw(self, candidates: torch.LongTensor, k: int, step: int) -> torch.LongTensor:
+        """Draws k distinct uids from the candidates under the current strategy."""
+        if self.strategy == "new_first":
+            is_new = self.counts[candidates] < self.min_queries
+            new, old = candidates[is_new], candidates[~is_new]
+            order = torch.cat([new[torch.randperm(len(new))], old[torch.randperm(len(old))]])
+            return order[:k]
+
+        if k == 0:
+            return candidates[:0]
+        weights = self.weights(candidates, step)
+        return candidates[torch.multinomial(weights, k, replacement=False)]
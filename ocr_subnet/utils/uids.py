@@ -1,5 +1,4 @@
 import torch
-import random
 import bittensor as bt
 from typing import List
 
@@ -26,6 +25,34 @@ def check_uid_availability(
     return True
 
 
+def available_uids(
+    metagraph: "bt.metagraph.Metagraph", vpermit_tao_limit: int
+) -> torch.LongTensor:
+    """Returns the available uids, as in check_uid_availability, computed for all uids at once.
+    Args:
+        metagraph (:obj: bt.metagraph.Metagraph): Metagraph object
+        vpermit_tao_limit (int): Validator permit tao limit
+    Returns:
+        uids (torch.LongTensor): Available uids, in increasing order.
+    """
+    serving = torch.tensor([axon.is_serving for axon in metagraph.axons], dtype=torch.bool)
+    # Filter validator permit > vpermit_tao_limit stake.
+    over_limit = metagraph.validator_permit.bool() & (metagraph.S > vpermit_tao_limit)
+    return torch.nonzero(serving & ~over_limit).flatten()
+
+
+def cached_available_uids(self) -> torch.LongTensor:
+    """Returns available_uids for self.metagraph, recomputing them only when a new metagraph has been synced.
+    Resyncs swap in a new metagraph object, so the cache is keyed on the metagraph's identity.
+    """
+    limit = self.config.neuron.vpermit_tao_limit
+    cache = getattr(self, "_available_uids", None)
+    if cache is None or cache[0] is not self.metagraph or cache[1] != limit:
+        cache = (self.metagraph, limit, available_uids(self.metagraph, limit))
+        self._available_uids = cache
+    return cache[2]
+
+
 def get_random_uids(
     self, k: int, exclude: List[int] = None
 ) -> torch.LongTensor:
@@ -37,27 +64,20 @@ def get_random_uids(
         uids (torch.LongTensor): Randomly sampled available uids.
     Notes:
         If `k` is larger than the number of available `uids`, set `k` to the number of available `uids`.
+        Excluded uids are only sampled when there are not enough other available uids.
     """
-    candidate_uids = []
-    avail_uids = []
-
-    for uid in range(self.metagraph.n.item()):
-        uid_is_available = check_uid_availability(
-            self.metagraph, uid, self.config.neuron.vpermit_tao_limit
-        )
-        uid_is_not_excluded = exclude is None or uid not in exclude
+    avail_uids = cached_available_uids(self)
+    k = min(k, len(avail_uids))
 
-        if uid_is_available:
-            avail_uids.append(uid)
-            if uid_is_not_excluded:
-                candidate_uids.append(uid)
+    candidate_uids = avail_uids
+    if exclude:
+        is_excluded = torch.isin(avail_uids, torch.tensor(sorted(set(exclude)), dtype=avail_uids.dtype))
+        candidate_uids = avail_uids[~is_excluded]
 
     # Check if candidate_uids contain enough for querying, if not grab all avaliable uids
-    available_uids = candidate_uids
     if len(candidate_uids) < k:
-        available_uids += random.sample(
-            [uid for uid in avail_uids if uid not in candidate_uids],
-            k - len(candidate_uids),
-        )
-    uids = torch.tensor(random.sample(available_uids, k))
-    return uids
+        excluded_uids = avail_uids[is_excluded]
+        fill = excluded_uids[torch.randperm(len(excluded_uids))[: k - len(candidate_uids)]]
+        return torch.cat([candidate_uids, fill])[torch.randperm(k)]
+
+    return candidate_uids[torch.randperm(len(candidate_uids))[:k]]
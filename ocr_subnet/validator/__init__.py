@@ -1,3 +1,4 @@
 # from .forward import forward
 from .reward import get_rewards
 from .generate import invoice
+from .stream import read_stream
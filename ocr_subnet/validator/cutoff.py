@@ -0,0 +1,189 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import math
+import time
+import asyncio
+import warnings
+import numpy as np
+import bittensor as bt
+
+from typing import Awaitable, Callable, List
+
+from ocr_subnet.validator.history import History
+
+
+MODES = ["full", "quorum", "adaptive"]
+
+
+class QueryCutoff:
+    """
+    Stops collecting a step's responses before the timeout, so the step does not wait on its slowest miners.
+
+    Modes:
+    - full: wait for every miner, up to the timeout.
+    - quorum: stop `grace` seconds after `quorum` of the miners have answered successfully.
+    - adaptive: stop waiting for each miner at its own deadline, `multiplier` times the `quantile` of its latencies in
+      the validator's history, between `min_deadline` and the timeout. Miners with fewer than `min_records` records
+      get the full timeout.
+
+    Miners cut off are left None in the results, for the caller to score as timeouts. Their latency is unknown when
+    the step is scored, so it should not be recorded as the timeout. Their queries keep running in the background until
+    the timeout, only to measure how much step latency the cutoff saved and how many of them answered late.
+
+    Args:
+    - mode (str): One of MODES.
+    - timeout (float): Seconds after which the queries time out anyway.
+    - quorum (float): Share of the miners which must answer in quorum mode.
+    - grace (float): Seconds to keep waiting for the other miners once the quorum has answered.
+    - quantile (float): Latency percentile, between 0 and 100, used for the adaptive deadlines.
+    - multiplier (float): Slack on the latency percentile.
+    - min_deadline (float): Shortest adaptive deadline in seconds.
+    - min_records (int): Latency records needed before a miner gets an adaptive deadline.
+    """
+
+    def __init__(
+        self,
+        mode: str = "full",
+        timeout: float = 10.0,
+        quorum: float = 0.8,
+        grace: float = 0.5,
+        quantile: float = 90,
+        multiplier: float = 1.5,
+        min_deadline: float = 1.0,
+        min_records: int = 5,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown query mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.timeout = timeout
+        self.quorum = quorum
+        self.grace = grace
+        self.quantile = quantile
+        self.multiplier = multiplier
+        self.min_deadline = min_deadline
+        self.min_records = min_records
+
+        self.steps = 0
+        self.cutoffs = 0
+        self.dropped = 0
+        self.late = 0
+        self.saved = 0.0
+        self.background = set()
+
+    def deadlines(self, history: History, uids: List[int]) -> List[float]:
+        """Seconds to wait for each of the uids."""
+        if self.mode != "adaptive":
+            return [self.timeout] * len(uids)
+
+        latency = history.column("latency", uids)
+        records = (~np.isnan(latency)).sum(axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            percentile = np.nanpercentile(latency, self.quantile, axis=1)
+        deadlines = np.clip(self.multiplier * percentile, self.min_deadline, self.timeout)
+        return np.where(records >= self.min_records, deadlines, self.timeout).tolist()
+
+    async def gather(
+        self,
+        queries: List[Awaitable],
+        deadlines: List[float],
+        is_answer: Callable = lambda result: True,
+    ) -> list:
+        """
+        Runs the queries concurrently and returns their results once all are done, cut off at their deadlines or, in
+        quorum mode, after the grace period once enough of them are answers.
+
+        Args:
+        - queries (List[Awaitable]): One query per miner, which must time out by itself after the timeout.
+        - deadlines (List[float]): Seconds to wait for each query, from `deadlines`.
+        - is_answer (Callable): Whether a result counts towards the quorum.
+
+        Returns:
+        - list: The result of each query, None if it was cut off or raised.
+        """
+        start = time.monotonic()
+        tasks = [asyncio.ensure_future(query) for query in queries]
+        index = {task: i for i, task in enumerate(tasks)}
+        results = [None] * len(tasks)
+        quorum = math.ceil(self.quorum * len(tasks)) if self.mode == "quorum" else len(tasks) + 1
+        answers = 0
+        # End of the grace period, once the quorum has answered
+        until = None
+
+        pending = set(tasks)
+        while pending:
+            now = time.monotonic() - start
+            if until is not None and now >= until:
+                break
+            pending = {task for task in pending if deadlines[index[task]] > now}
+            if not pending:
+                break
+            wait = min(deadlines[index[task]] for task in pending) - now
+            if until is not None:
+                wait = min(wait, until - now)
+            done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    results[index[task]] = task.result()
+                    answers += is_answer(task.result())
+            if until is None and answers >= quorum:
+                until = time.monotonic() - start + self.grace
+
+        cutoff = time.monotonic() - start
+        stragglers = [task for task in tasks if not task.done()]
+        self.steps += 1
+        if stragglers:
+            self.cutoffs += 1
+            self.dropped += len(stragglers)
+            # Measure the stragglers in the background, keeping a reference so the task is not garbage collected
+            accounting = asyncio.ensure_future(self.account(stragglers, start, cutoff, is_answer))
+            self.background.add(accounting)
+            accounting.add_done_callback(self.background.discard)
+        return results
+
+    async def account(self, stragglers: List[asyncio.Future], start: float, cutoff: float, is_answer: Callable):
+        """Waits for the stragglers of a step to finish, and adds the latency saved and the late answers."""
+        finished = []
+
+        async def finish(task):
+            try:
+                result = await task
+                self.late += bool(is_answer(result))
+            except Exception:
+                pass
+            finished.append(min(time.monotonic() - start, self.timeout))
+
+        await asyncio.gather(*[finish(task) for task in stragglers])
+        saved = max(finished) - cutoff
+        self.saved += saved
+        bt.logging.debug(f"Query cutoff saved {saved:.2f}s and dropped {len(stragglers)} responses")
+
+    def metrics(self) -> dict:
+        """
+        Returns:
+        - dict: The number of 'steps' queried, the 'cutoffs' (steps with stragglers), the responses 'dropped', the
+          'late' answers among them and the total step latency 'saved' in seconds.
+        """
+        return {
+            "steps": self.steps,
+            "cutoffs": self.cutoffs,
+            "dropped": self.dropped,
+            "late": self.late,
+            "saved": self.saved,
+        }
@@ -0,0 +1,173 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import warnings
+import numpy as np
+
+from typing import Dict, List
+
+
+FIELDS = ["step", "reward", "prediction", "time", "latency", "size"]
+
+
+class History:
+    """
+    Memory-bounded history of the last queries of every uid, so that a miner's trend, variance, latency distribution
+    and failure rate can be queried from the validator instead of scraped from logs. The records of each uid are kept
+    in a fixed-size numpy ring buffer, so memory is n * size * len(FIELDS) floats however long the validator runs.
+
+    Each record holds the step of the query, the total reward and its prediction and time components, the latency in
+    seconds and the number of sections in the response. Fields which were not recorded, and empty slots, are NaN.
+
+    Args:
+    - n (int): Number of uids in the metagraph.
+    - size (int): Number of records kept per uid.
+    """
+
+    def __init__(self, n: int = 0, size: int = 64):
+        self.size = size
+        self.data = np.full((0, size, len(FIELDS)), np.nan, dtype=np.float32)
+        # Number of records ever written for each uid, the next slot being count % size
+        self.count = np.zeros(0, dtype=np.int64)
+        self.resize(n)
+
+    def resize(self, n: int):
+        """Grows the buffers when the metagraph grows. New uids start without records."""
+        grow = n - len(self.count)
+        if grow <= 0:
+            return
+        self.data = np.concatenate([self.data, np.full((grow, self.size, len(FIELDS)), np.nan, dtype=np.float32)])
+        self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+
+    def reset(self, uids: List[int]):
+        """Forgets the records of uids whose hotkey has been replaced by a new miner."""
+        uids = np.asarray(uids, dtype=np.int64)
+        self.data[uids] = np.nan
+        self.count[uids] = 0
+
+    def record(self, uids: List[int], step: int, **columns):
+        """
+        Appends a record for each of the queried uids, which must be unique.
+
+        Args:
+        - uids (List[int]): The queried uids.
+        - step (int): The validator step of the query.
+        - columns: A value per uid for any of the other FIELDS, e.g. reward=rewards.
+        """
+        uids = np.asarray(_array(uids), dtype=np.int64)
+        if not len(uids):
+            return
+        self.resize(int(uids.max()) + 1)
+
+        rows = np.full((len(uids), len(FIELDS)), np.nan, dtype=np.float32)
+        rows[:, 0] = step
+        for name, values in columns.items():
+            if name not in FIELDS:
+                raise KeyError(f"Unknown history field {name!r}, expected one of {FIELDS}")
+            rows[:, FIELDS.index(name)] = _array(values)
+
+        self.data[uids, self.count[uids] % self.size] = rows
+        self.count[uids] += 1
+
+    def records(self, uid: int) -> np.ndarray:
+        """The records of a uid, oldest first, as an array of shape (records, len(FIELDS))."""
+        count = self.count[uid]
+        if count <= self.size:
+            return self.data[uid, :count].copy()
+        return np.roll(self.data[uid], -(count % self.size), axis=0)
+
+    def column(self, name: str, uids: List[int] = None) -> np.ndarray:
+        """One field of the records of each uid, as an array of shape (uids, size) in slot order, NaN when empty."""
+        data = self.data if uids is None else self.data[np.asarray(_array(uids), dtype=np.int64)]
+        return data[:, :, FIELDS.index(name)]
+
+    def summary(self, uids: List[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Statistics of the records of each uid, NaN for uids without records.
+
+        Returns:
+        - dict: Arrays with the number of 'records', the 'reward_mean' and 'reward_std', the 'reward_trend' (least
+          squares slope of the reward per step), the 'latency_p50' and 'latency_p90' and the 'failure_rate' (share of
+          responses without any sections).
+        """
+        step = self.column("step", uids).astype(np.float64)
+        reward = self.column("reward", uids).astype(np.float64)
+        size = self.column("size", uids)
+        recorded = ~np.isnan(step)
+        records = recorded.sum(axis=1)
+
+        with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+            warnings.simplefilter("ignore", RuntimeWarning)
+            step_mean = np.nanmean(step, axis=1, keepdims=True)
+            reward_mean = np.nanmean(reward, axis=1, keepdims=True)
+            dx, dy = step - step_mean, reward - reward_mean
+            trend = np.nansum(dx * dy, axis=1) / np.nansum(np.where(np.isnan(dy), np.nan, dx) ** 2, axis=1)
+            latency_p50, latency_p90 = np.nanpercentile(self.column("latency", uids), [50, 90], axis=1)
+            return {
+                "records": records,
+                "reward_mean": reward_mean[:, 0],
+                "reward_std": np.nanstd(reward, axis=1),
+                "reward_trend": trend,
+                "latency_p50": latency_p50,
+                "latency_p90": latency_p90,
+                "failure_rate": np.sum(size == 0, axis=1) / np.where(records > 0, records, np.nan),
+            }
+
+    def moments(self):
+        """
+        The query count, last step, reward mean and sum of squared deviations of each uid over its records, which
+        restore the statistics of the sampling scheduler.
+        """
+        step = self.column("step")
+        reward = self.column("reward").astype(np.float64)
+        counts = (~np.isnan(reward)).sum(axis=1)
+        with warnings.catch_warnings(), np.errstate(invalid="ignore"):
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean = np.nan_to_num(np.nanmean(reward, axis=1))
+        m2 = np.nansum((reward - mean[:, None]) ** 2, axis=1)
+        last_step = np.where(np.isnan(step), -1, step).max(axis=1, initial=-1).astype(np.int64)
+        return counts, last_step, mean, m2
+
+    def state_dict(self) -> dict:
+        return {"data": self.data.copy(), "count": self.count.copy()}
+
+    @classmethod
+    def from_state_dict(cls, state: dict, size: int = None) -> "History":
+        """
+        Restores a history from state_dict. If size differs from the size it was saved with, only the last size
+        records of each uid are kept.
+        """
+        data, count = np.asarray(state["data"], dtype=np.float32), np.asarray(state["count"], dtype=np.int64)
+        history = cls(size=data.shape[1])
+        history.data, history.count = data, count
+        if size is None or size == history.size:
+            return history
+
+        resized = cls(n=len(count), size=size)
+        for uid in range(len(count)):
+            records = history.records(uid)[-size:]
+            resized.data[uid, :len(records)] = records
+            resized.count[uid] = len(records)
+        return resized
+
+
+def _array(values) -> np.ndarray:
+    # Accepts lists, numpy arrays and tensors on any device
+    if hasattr(values, "cpu"):
+        values = values.cpu().numpy()
+    return np.asarray(values)
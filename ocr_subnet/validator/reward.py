@@ -115,13 +115,14 @@ def section_reward(label: dict, pred: dict, alpha_p=1.0, alpha_f=1.0, alpha_t=1.
 
     return reward
 
-def sort_predictions(labels: List[dict], predictions: List[dict], draw=False) -> List[dict]:
+def sort_predictions(labels: List[dict], predictions: List[dict], draw=False, alpha_p=1.0, alpha_f=1.0, alpha_t=1.0) -> List[dict]:
     """
     Sort the predictions to match the order of the ground truth data using the Hungarian algorithm.
 
     Args:
     - labels (list): The ground truth data for the image.
     - predictions (list): The predicted data for the image.
+    - alpha_p, alpha_f, alpha_t (float): Weights of the position, font and text rewards of each section.
 
     Returns:
     - list: The sorted predictions.
@@ -132,7 +133,7 @@ def sort_predictions(labels: List[dict], predictions: List[dict], draw=False) ->
     r = torch.zeros((len(labels), len(predictions)))
     for i in range(r.shape[0]):
         for j in range(r.shape[1]):
-            r[i,j] = section_reward(labels[i], predictions[j])['total']
+            r[i,j] = section_reward(labels[i], predictions[j], alpha_p=alpha_p, alpha_f=alpha_f, alpha_t=alpha_t)['total']
 
     # Use the Hungarian algorithm to find the best assignment
     row_indices, col_indices = linear_sum_assignment(r, maximize=True)
@@ -151,20 +152,34 @@ def reward(self, labels: List[dict], response: OCRSynapse) -> float:
     - labels (List[dict]): The true data underlying the image sent to the miner.
     - response (OCRSynapse): Response from the miner.
 
+    Returns:
+    - float: The reward value for the miner.
+    """
+    return reward_components(self, labels, response)['total']
+
+
+def reward_components(self, labels: List[dict], response: OCRSynapse) -> dict:
+    """
+    Reward the miner response to the OCR request, returning the components of the reward along with the total.
+
+    Args:
+    - labels (List[dict]): The true data underlying the image sent to the miner.
+    - response (OCRSynapse): Response from the miner.
+
     The expected fields in each section of the response are:
     - position (List[int]): The bounding box of the section e.g. [x0, y0, x1, y1]
     - font (dict): The font of the section e.g. {'family': 'Times New Roman', 'size':12}
     - text (str): The text of the section e.g. 'Hello World!'
 
     Returns:
-    - float: The reward value for the miner.
+    - dict: The 'total' reward, its 'prediction' and 'time' components, the 'latency' of the response in seconds and
+      its 'size' in sections.
     """
+    latency = response.dendrite.process_time or self.config.neuron.timeout
     predictions = response.response
     if predictions is None:
-        return 0.0
-
-    # Sort the predictions to match the order of the ground truth data as best as possible
-    predictions = sort_predictions(labels, predictions)
+        return {'total': 0.0, 'prediction': 0.0, 'time': 0.0, 'latency': latency, 'size': 0}
+    size = len(predictions)
 
     alpha_p = self.config.neuron.alpha_position
     alpha_t = self.config.neuron.alpha_text
@@ -172,6 +187,9 @@ def reward(self, labels: List[dict], response: OCRSynapse) -> float:
     alpha_prediction = self.config.neuron.alpha_prediction
     alpha_time = self.config.neuron.alpha_time
 
+    # Sort the predictions to match the order of the ground truth data as best as possible
+    predictions = sort_predictions(labels, predictions, alpha_p=alpha_p, alpha_f=alpha_f, alpha_t=alpha_t)
+
     # Take mean score over all sections in document (note that we don't penalize extra sections)
     section_rewards = [
         section_reward(label, pred, verbose=True, alpha_f=alpha_f, alpha_p=alpha_p, alpha_t=alpha_t)
@@ -179,16 +197,131 @@ def reward(self, labels: List[dict], response: OCRSynapse) -> float:
     ]
     prediction_reward = torch.mean(torch.FloatTensor([reward['total'] for reward in section_rewards]))
 
-    time_reward = max(1 - response.time_elapsed / self.config.neuron.timeout, 0)
+    time_reward = max(1 - latency / self.config.neuron.timeout, 0)
     total_reward = (alpha_prediction * prediction_reward + alpha_time * time_reward) / (alpha_prediction + alpha_time)
 
     bt.logging.info(f"prediction_reward: {prediction_reward:.3f}, time_reward: {time_reward:.3f}, total_reward: {total_reward:.3f}")
-    return total_reward
+    return {
+        'total': float(total_reward),
+        'prediction': float(prediction_reward),
+        'time': time_reward,
+        'latency': latency,
+        'size': size,
+    }
+
+class IncrementalScorer:
+    """
+    Scores a streamed response chunk by chunk. Scoring each section against every label is the expensive part of the
+    reward, so it is done as soon as the section arrives, overlapping with the miner's work on the rest of the page.
+    The assignment of sections to labels is only solved when the reward is requested, over all sections received
+    so far, which gives the same prediction reward as `reward` for the same sections.
+
+    Args:
+    - labels (List[dict]): The true data underlying the image sent to the miner.
+    - alpha_p, alpha_f, alpha_t (float): Weights of the position, font and text rewards of each section.
+    """
+
+    def __init__(self, labels: List[dict], alpha_p=1.0, alpha_f=1.0, alpha_t=1.0):
+        self.labels = labels
+        self.alphas = dict(alpha_p=alpha_p, alpha_f=alpha_f, alpha_t=alpha_t)
+        # Reward of each received section against each label
+        self.columns = []
+
+    def add(self, sections: List[dict]):
+        """Scores a chunk of sections against all labels."""
+        for pred in sections:
+            if not isinstance(pred, dict):
+                continue
+            self.columns.append([section_reward(label, pred, **self.alphas)['total'] for label in self.labels])
+
+    def prediction_reward(self) -> float:
+        """Mean reward of the best assignment of the sections received so far to the labels."""
+        if not self.labels:
+            return 0.0
+
+        # Missing sections score zero, as in sort_predictions
+        r = torch.zeros((len(self.labels), max(len(self.labels), len(self.columns))))
+        if self.columns:
+            r[:, :len(self.columns)] = torch.FloatTensor(self.columns).T
+
+        row_indices, col_indices = linear_sum_assignment(r, maximize=True)
+        return r[row_indices, col_indices].sum().item() / len(self.labels)
+
+
+def stream_reward(self, scorer: IncrementalScorer, time_elapsed: float) -> float:
+    """
+    Reward the miner's streamed response, combining the prediction reward of the sections received before the
+    deadline with the time reward, as in `reward`.
+
+    Args:
+    - scorer (IncrementalScorer): Scorer which the miner's chunks were added to.
+    - time_elapsed (float): Seconds until the stream ended, or the timeout if it was cut off.
+
+    Returns:
+    - float: The reward value for the miner.
+    """
+    return stream_reward_components(self, scorer, time_elapsed)['total']
+
+
+def stream_reward_components(self, scorer: IncrementalScorer, time_elapsed: float) -> dict:
+    """
+    Reward the miner's streamed response, returning the components of the reward as in `reward_components`.
+    """
+    alpha_prediction = self.config.neuron.alpha_prediction
+    alpha_time = self.config.neuron.alpha_time
+
+    prediction_reward = scorer.prediction_reward()
+    time_reward = max(1 - time_elapsed / self.config.neuron.timeout, 0)
+    total_reward = (alpha_prediction * prediction_reward + alpha_time * time_reward) / (alpha_prediction + alpha_time)
+
+    bt.logging.info(f"sections: {len(scorer.columns)}, prediction_reward: {prediction_reward:.3f}, time_reward: {time_reward:.3f}, total_reward: {total_reward:.3f}")
+    return {
+        'total': total_reward,
+        'prediction': prediction_reward,
+        'time': time_reward,
+        'latency': time_elapsed,
+        'size': len(scorer.columns),
+    }
+
+
+def stack_components(self, components: List[dict], return_components: bool):
+    """Stacks the components of each miner's reward into tensors, returning the totals and the other components."""
+    rewards = torch.FloatTensor([c['total'] for c in components]).to(self.device)
+    if not return_components:
+        return rewards
+    names = ['prediction', 'time', 'latency', 'size']
+    return rewards, {name: torch.FloatTensor([c[name] for c in components]) for name in names}
+
+
+def get_stream_rewards(
+    self,
+    scorers: List[IncrementalScorer],
+    times_elapsed: List[float],
+    components: bool = False,
+) -> torch.FloatTensor:
+    """
+    Returns a tensor of rewards for streamed responses.
+
+    Args:
+    - scorers (List[IncrementalScorer]): The scorer of each miner.
+    - times_elapsed (List[float]): Seconds until each miner's stream ended or was cut off.
+    - components (bool): Also return the components of the rewards, as in `get_rewards`.
+
+    Returns:
+    - torch.FloatTensor: A tensor of rewards for the given responses.
+    """
+    return stack_components(
+        self,
+        [stream_reward_components(self, scorer, time_elapsed) for scorer, time_elapsed in zip(scorers, times_elapsed)],
+        components,
+    )
+
 
 def get_rewards(
     self,
     labels: List[dict],
     responses: List[OCRSynapse],
+    components: bool = False,
 ) -> torch.FloatTensor:
     """
     Returns a tensor of rewards for the given image and responses.
@@ -196,11 +329,13 @@ def get_rewards(
     Args:
     - image (List[dict]): The true data underlying the image sent to the miner.
     - responses (List[OCRSynapse]): A list of responses from the miner.
+    - components (bool): Also return a dict with tensors of the 'prediction' and 'time' components of the rewards and
+      the 'latency' and 'size' of the responses, e.g. for the validator's history.
 
     Returns:
     - torch.FloatTensor: A tensor of rewards for the given image and responses.
     """
-    # Get all the reward results by iteratively calling your reward() function.
-    return torch.FloatTensor(
-        [reward(self, labels, response) for response in responses]
-    ).to(self.device)
+    # Get all the reward results by iteratively calling your reward_components() function.
+    return stack_components(
+        self, [reward_components(self, labels, response) for response in responses], components
+    )
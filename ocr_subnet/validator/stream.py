@@ -0,0 +1,55 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import time
+import asyncio
+import bittensor as bt
+from typing import AsyncIterator
+
+from ocr_subnet.validator.reward import IncrementalScorer
+
+
+async def read_stream(stream: AsyncIterator, scorer: IncrementalScorer, deadline: float) -> float:
+    """
+    Reads a miner's stream, adding each chunk of sections to the scorer as it arrives. Reading stops at the deadline
+    and the stream is closed, keeping the sections which have already arrived.
+
+    Args:
+    - stream (AsyncIterator): Stream returned by the dendrite for an OCRStreamingSynapse. It yields lists of sections
+      and finally the synapse itself.
+    - scorer (IncrementalScorer): Scorer which the chunks are added to.
+    - deadline (float): time.monotonic() timestamp at which to stop reading.
+
+    Returns:
+    - float: Seconds until the stream ended, or until the deadline if it was cut off.
+    """
+    start = time.monotonic()
+    try:
+        while True:
+            chunk = await asyncio.wait_for(stream.__anext__(), timeout=max(0.0, deadline - time.monotonic()))
+            if isinstance(chunk, list):
+                scorer.add(chunk)
+    except StopAsyncIteration:
+        pass
+    except asyncio.TimeoutError:
+        bt.logging.debug(f"Stream cut off at the deadline after {len(scorer.columns)} sections")
+        await stream.aclose()
+    except Exception as e:
+        bt.logging.debug(f"Stream failed after {len(scorer.columns)} sections: {e}")
+
+    return min(time.monotonic(), deadline) - start
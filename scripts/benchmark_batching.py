@@ -0,0 +1,82 @@
+"""
+Compares throughput and tail latency of micro-batched OCR against the unbatched path under concurrent requests.
+
+Usage:
+    python scripts/benchmark_batching.py --engine pytesseract --requests 64 --concurrency 16 --window 20 --max-batch-size 8
+"""
+import time
+import asyncio
+import argparse
+import functools
+import concurrent.futures
+
+from ocr_subnet.utils.image import load, serialize
+from ocr_subnet.miner.batching import MicroBatcher
+from ocr_subnet.miner.ocr import extract, extract_batch
+from ocr_subnet.miner.engine import PytesseractEngine, WorkerPoolEngine
+
+
+async def run(submit, base64_image: str, n_requests: int, concurrency: int) -> dict:
+    """Sends n_requests through submit with at most `concurrency` in flight, and reports latency and throughput."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def request():
+        async with semaphore:
+            start = time.perf_counter()
+            await submit(base64_image)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[request() for _ in range(n_requests)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'throughput': n_requests / elapsed,
+        'p50': latencies[len(latencies) // 2],
+        'p99': latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))],
+    }
+
+
+async def main(args):
+    image = load(args.pdf, zoom_x=1.5, zoom_y=1.5)
+    base64_image = serialize(image)
+
+    engine = PytesseractEngine() if args.engine == 'pytesseract' else WorkerPoolEngine(num_workers=args.workers)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=args.concurrency)
+    # Warm up so that worker start-up is not included in the measurements
+    extract(base64_image, engine)
+
+    async def unbatched(item):
+        return await asyncio.get_running_loop().run_in_executor(executor, extract, item, engine)
+
+    batcher = MicroBatcher(
+        functools.partial(extract_batch, engine=engine),
+        executor=executor,
+        window=args.window / 1000,
+        max_batch_size=args.max_batch_size,
+    )
+
+    for name, submit in [('unbatched', unbatched), ('batched', batcher.submit)]:
+        stats = await run(submit, base64_image, args.requests, args.concurrency)
+        print(
+            f"{name:<10} throughput={stats['throughput']:6.2f} req/s "
+            f"p50={stats['p50']*1000:8.1f} ms p99={stats['p99']*1000:8.1f} ms"
+        )
+    print(f"batching: {batcher.metrics()}")
+
+    executor.shutdown()
+    engine.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pdf', type=str, default='scripts/sample_invoice.pdf')
+    parser.add_argument('--engine', type=str, choices=['pytesseract', 'pool'], default='pytesseract')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--window', type=float, default=20, help='Batch window in milliseconds.')
+    parser.add_argument('--max-batch-size', type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
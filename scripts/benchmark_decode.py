@@ -0,0 +1,56 @@
+"""
+Benchmarks the decode modes of ocr_subnet.utils.image.deserialize.
+
+Usage:
+    python scripts/benchmark_decode.py --pdf scripts/sample_invoice.pdf --zoom 1.5 --repeats 50
+"""
+import time
+import argparse
+
+from ocr_subnet.utils.image import load, serialize, deserialize
+
+
+MODES = {
+    'full': {},
+    'grayscale': {'grayscale': True},
+    'array': {'grayscale': True, 'as_array': True},
+    'scale_0.5': {'scale': 0.5},
+    'scale_0.5_grayscale': {'scale': 0.5, 'grayscale': True},
+    'scale_0.25_grayscale': {'scale': 0.25, 'grayscale': True},
+    'roi_top_half': {'box': 'top_half'},
+}
+
+
+def benchmark(base64_image: str, size: tuple, repeats: int) -> dict:
+    """Returns the mean decode time in milliseconds for each mode."""
+    width, height = size
+    results = {}
+    for name, kwargs in MODES.items():
+        if kwargs.get('box') == 'top_half':
+            kwargs = {**kwargs, 'box': (0, 0, width, height // 2)}
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            image = deserialize(base64_image, **kwargs)
+            # Images are lazily decoded, so force the pixels to be loaded
+            if hasattr(image, 'load'):
+                image.load()
+        results[name] = 1000 * (time.perf_counter() - start) / repeats
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pdf', type=str, default='scripts/sample_invoice.pdf')
+    parser.add_argument('--zoom', type=float, default=1.5)
+    parser.add_argument('--repeats', type=int, default=50)
+    parser.add_argument('--format', type=str, default='JPEG')
+    args = parser.parse_args()
+
+    image = load(args.pdf, zoom_x=args.zoom, zoom_y=args.zoom)
+    base64_image = serialize(image, format=args.format)
+    print(f'image size: {image.size}, format: {args.format}, payload: {len(base64_image)/1e3:.1f} kB')
+
+    for name, ms in benchmark(base64_image, image.size, args.repeats).items():
+        print(f'{name:>24}: {ms:8.2f} ms')
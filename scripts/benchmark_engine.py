@@ -0,0 +1,61 @@
+"""
+Compares the per-request pytesseract engine with the persistent OCR worker pool at several levels of concurrency.
+
+Usage:
+    python scripts/benchmark_engine.py --pdf scripts/sample_invoice.pdf --requests 64 --concurrency 1 8 32
+"""
+import time
+import argparse
+import concurrent.futures
+
+from ocr_subnet.utils.image import load
+from ocr_subnet.miner.engine import PytesseractEngine, WorkerPoolEngine
+
+
+def run(engine, image, n_requests: int, concurrency: int) -> dict:
+    """Sends n_requests images to the engine from `concurrency` client threads and reports latency and throughput."""
+
+    def request(_):
+        start = time.perf_counter()
+        engine.image_to_data(image)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as clients:
+        latencies = sorted(clients.map(request, range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'throughput': n_requests / elapsed,
+        'p50': latencies[len(latencies) // 2],
+        'p95': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pdf', type=str, default='scripts/sample_invoice.pdf')
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    image = load(args.pdf, zoom_x=1.5, zoom_y=1.5)
+
+    engines = {
+        'pytesseract': PytesseractEngine(),
+        'pool': WorkerPoolEngine(num_workers=args.workers),
+    }
+    # Warm up the pool so that worker start-up is not included in the measurements
+    engines['pool'].image_to_data(image)
+
+    for concurrency in args.concurrency:
+        for name, engine in engines.items():
+            stats = run(engine, image, args.requests, concurrency)
+            print(
+                f"concurrency={concurrency:<3} engine={name:<12} throughput={stats['throughput']:6.2f} req/s "
+                f"p50={stats['p50']*1000:8.1f} ms p95={stats['p95']*1000:8.1f} ms"
+            )
+
+    for engine in engines.values():
+        engine.close()
@@ -0,0 +1,139 @@
+"""
+Measures validator wall time per step against num_concurrent_forwards, by running the real Validator.forward against
+local stand-in axons which answer after a fixed latency. Wallets for the axons and the dendrite are created in a
+temporary directory, and nothing touches the chain. With --stragglers, some miners answer after a longer latency,
+which shows the step latency saved by the --neuron.query_mode cutoffs.
+
+Usage:
+    python scripts/benchmark_forward.py --miners 16 --latency 2.0 --rounds 3 --concurrency 1 2 4 8
+    python scripts/benchmark_forward.py --stragglers 2 --neuron.query_mode quorum --neuron.quorum 0.8
+"""
+import os
+import time
+import torch
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+import bittensor as bt
+
+from types import SimpleNamespace
+
+from ocr_subnet.protocol import OCRSynapse
+from ocr_subnet.base.checkpoint import Checkpoint
+from ocr_subnet.utils.sampling import SamplingScheduler
+from ocr_subnet.validator.generate import invoice
+from ocr_subnet.validator.history import History
+from ocr_subnet.validator.cutoff import QueryCutoff
+from neurons.validator import Validator
+
+
+class StandInMiner:
+    """Axon on localhost which answers every OCRSynapse with a canned response after `latency` seconds."""
+
+    def __init__(self, wallet: "bt.wallet", port: int, response: list, latency: float):
+        self.response = response
+        self.latency = latency
+        self.axon = bt.axon(wallet=wallet, port=port, ip="127.0.0.1", external_ip="127.0.0.1")
+        self.axon.attach(forward_fn=self.forward)
+
+    async def forward(self, synapse: OCRSynapse) -> OCRSynapse:
+        await asyncio.sleep(self.latency * random.uniform(0.8, 1.2))
+        synapse.response = self.response
+        return synapse
+
+
+class StandInValidator(Validator):
+    """Validator which skips the chain setup of BaseValidatorNeuron and queries the stand-in miners."""
+
+    def __init__(self, config, axons: list, dendrite: "bt.dendrite", image_dir: str):
+        self.config = config
+        self.device = "cpu"
+        self.step = 0
+        self.dendrite = dendrite
+        self.image_dir = image_dir
+        self.metagraph = SimpleNamespace(
+            n=torch.tensor(len(axons)),
+            axons=axons,
+            validator_permit=torch.zeros(len(axons), dtype=torch.bool),
+            S=torch.zeros(len(axons)),
+        )
+        self.scores = torch.zeros(len(axons))
+        self.scores_lock = threading.Lock()
+        self.sampler = SamplingScheduler(config.neuron.sampling_strategy, n=len(axons))
+        self.history = History(n=len(axons), size=config.neuron.history_size)
+        self.cutoff = QueryCutoff(
+            config.neuron.query_mode,
+            timeout=config.neuron.timeout,
+            quorum=config.neuron.quorum,
+            grace=config.neuron.quorum_grace,
+            quantile=config.neuron.deadline_quantile,
+            multiplier=config.neuron.deadline_multiplier,
+            min_deadline=config.neuron.min_deadline,
+        )
+        self.checkpoint = Checkpoint(os.path.join(image_dir, "state.pt"))
+
+
+def create_wallet(path: str, name: str) -> "bt.wallet":
+    wallet = bt.wallet(name=name, hotkey="default", path=path)
+    wallet.create_if_non_existent(coldkey_use_password=False, hotkey_use_password=False)
+    return wallet
+
+
+async def main(config):
+    with tempfile.TemporaryDirectory() as tmp:
+        labels = invoice(path=os.path.join(tmp, "sample.pdf"), corrupt=True)["labels"]
+
+        miners = [
+            StandInMiner(
+                create_wallet(tmp, f"miner{i}"),
+                config.port + i,
+                labels,
+                config.straggler_latency if i < config.stragglers else config.latency,
+            )
+            for i in range(config.miners)
+        ]
+        for miner in miners:
+            miner.axon.start()
+
+        config.neuron.sample_size = config.miners
+        config.neuron.timeout = max(config.neuron.timeout, 3 * config.latency, 1.5 * config.straggler_latency)
+        dendrite = bt.dendrite(wallet=create_wallet(tmp, "validator"))
+        validator = StandInValidator(config, [miner.axon.info() for miner in miners], dendrite, tmp)
+
+        try:
+            for concurrency in config.concurrency:
+                validator.config.neuron.num_concurrent_forwards = concurrency
+                start = time.perf_counter()
+                for _ in range(config.rounds):
+                    await validator.concurrent_forward()
+                elapsed = time.perf_counter() - start
+
+                steps = config.rounds * concurrency
+                print(
+                    f"concurrency={concurrency:<3} steps={steps:<4} wall={elapsed:7.2f} s "
+                    f"per_step={elapsed / steps:6.2f} s throughput={steps / elapsed:5.2f} steps/s"
+                )
+
+            if validator.cutoff.mode != "full":
+                # Let the cut off queries finish, to account for the latency they saved
+                await asyncio.sleep(config.neuron.timeout)
+                print(f"query cutoff ({validator.cutoff.mode}): {validator.cutoff.metrics()}")
+        finally:
+            validator.checkpoint.stop()
+            for miner in miners:
+                miner.axon.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--miners", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=2.0, help="Seconds each stand-in miner takes to answer.")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--stragglers", type=int, default=0, help="Number of stand-in miners which answer late.")
+    parser.add_argument("--straggler-latency", type=float, default=5.0, help="Seconds the stragglers take to answer.")
+    parser.add_argument("--port", type=int, default=18091, help="Port of the first stand-in axon.")
+    Validator.add_args(parser)
+    asyncio.run(main(bt.config(parser)))
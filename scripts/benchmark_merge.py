@@ -0,0 +1,39 @@
+"""
+Benchmarks group_and_merge_boxes on synthetic dense pages.
+
+Usage:
+    python scripts/benchmark_merge.py --sizes 100 1000 10000 --repeats 5
+"""
+import time
+import random
+import argparse
+
+from ocr_subnet.utils.process import group_and_merge_boxes
+
+
+def dense_page(n: int, seed: int = 0) -> list:
+    """Words laid out on lines like a dense page of text, in the order tesseract reports them."""
+    rng = random.Random(seed)
+    words_per_line = 12
+    boxes = []
+    for i in range(n):
+        line, column = divmod(i, words_per_line)
+        x1 = 30 + 80 * column + rng.randint(0, 20)
+        y1 = 20 * line + rng.randint(-2, 2)
+        boxes.append({'position': [x1, y1, x1 + rng.randint(20, 70), y1 + 12], 'text': f'word{i}'})
+    return boxes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        data = dense_page(n)
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            merged = group_and_merge_boxes(data)
+        elapsed = (time.perf_counter() - start) / args.repeats
+        print(f'boxes={n:<6} sections={len(merged):<6} time={1000*elapsed:8.2f} ms')
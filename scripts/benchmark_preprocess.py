@@ -0,0 +1,57 @@
+"""
+Measures the effect of each image preprocessing step on OCR latency and reward, on generated corrupted invoices.
+
+Usage:
+    python scripts/benchmark_preprocess.py --invoices 5
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import torch
+
+from ocr_subnet.miner.ocr import extract
+from ocr_subnet.miner.engine import PytesseractEngine
+from ocr_subnet.miner.preprocess import STEPS
+from ocr_subnet.validator.generate import invoice
+from ocr_subnet.validator.reward import sort_predictions, section_reward
+
+
+def rewards(labels, predictions) -> dict:
+    """Mean text, position and total section rewards of the predictions, matched to the labels as in the validator."""
+    predictions = sort_predictions(labels, list(predictions))
+    section_rewards = [section_reward(label, pred) for label, pred in zip(labels, predictions)]
+    return {
+        key: torch.mean(torch.FloatTensor([reward[key] for reward in section_rewards])).item()
+        for key in ('text', 'position', 'total')
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--invoices', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        invoices = [invoice(path=os.path.join(tmp, f'{i}.pdf'), corrupt=True) for i in range(args.invoices)]
+
+    engine = PytesseractEngine()
+    configs = [[]] + [[step] for step in STEPS] + [STEPS]
+    for steps in configs:
+        latencies, preprocessing, scores = [], [], []
+        for data in invoices:
+            start = time.perf_counter()
+            predictions, timings = extract(data['base64_image'], engine, steps=steps)
+            latencies.append(time.perf_counter() - start)
+            preprocessing.append(sum(seconds for stage, seconds in timings.items() if stage.startswith('preprocess_')))
+            scores.append(rewards(data['labels'], predictions))
+
+        name = '+'.join(steps) or 'none'
+        print(
+            f"steps={name:<40} latency={1000*sum(latencies)/len(latencies):8.1f} ms "
+            f"(preprocess={1000*sum(preprocessing)/len(preprocessing):6.1f} ms) "
+            + " ".join(f"{key}_reward={sum(s[key] for s in scores)/len(scores):.3f}" for key in ('text', 'position', 'total'))
+        )
+
+    engine.close()
@@ -0,0 +1,58 @@
+"""
+Measures the latency of tiled OCR against the number of OCR workers, and its impact on accuracy, on generated invoices.
+
+Usage:
+    python scripts/benchmark_tiling.py --invoices 5 --workers 1 2 4 8 --tile-height 400 --tile-overlap 64
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import torch
+
+from ocr_subnet.miner.ocr import extract
+from ocr_subnet.miner.engine import WorkerPoolEngine
+from ocr_subnet.validator.generate import invoice
+from ocr_subnet.validator.reward import sort_predictions, section_reward
+
+
+def accuracy(labels, predictions) -> float:
+    """Mean text reward of the predicted sections, matched to the labels as in the validator."""
+    predictions = sort_predictions(labels, list(predictions))
+    return torch.mean(torch.FloatTensor([
+        section_reward(label, pred)['text'] for label, pred in zip(labels, predictions)
+    ])).item()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--invoices', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--tile-height', type=int, default=400)
+    parser.add_argument('--tile-overlap', type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        invoices = [invoice(path=os.path.join(tmp, f'{i}.pdf'), corrupt=True) for i in range(args.invoices)]
+
+    for workers in args.workers:
+        engine = WorkerPoolEngine(num_workers=workers)
+        # Warm up so that worker start-up is not included in the measurements
+        extract(invoices[0]['base64_image'], engine)
+
+        for tile_height in [0, args.tile_height]:
+            latencies, scores = [], []
+            for data in invoices:
+                start = time.perf_counter()
+                predictions, _ = extract(data['base64_image'], engine, tile_height=tile_height, tile_overlap=args.tile_overlap)
+                latencies.append(time.perf_counter() - start)
+                scores.append(accuracy(data['labels'], predictions))
+
+            mode = f'tiled({tile_height})' if tile_height else 'full page'
+            print(
+                f"workers={workers:<3} mode={mode:<12} latency={1000*sum(latencies)/len(latencies):8.1f} ms "
+                f"text_reward={sum(scores)/len(scores):.3f}"
+            )
+
+        engine.close()
@@ -0,0 +1,38 @@
+"""
+Prints the per-miner statistics of the query history saved with a validator's state, without touching the chain.
+
+Usage:
+    python scripts/inspect_history.py ~/.bittensor/miners/<wallet>/<hotkey>/netuid<netuid>/validator/state.pt --top 20
+"""
+import argparse
+
+import numpy as np
+
+from ocr_subnet.base.checkpoint import Checkpoint
+from ocr_subnet.validator.history import History
+
+
+def main(args):
+    state = Checkpoint(args.path).load()
+    if state is None or "history" not in state:
+        raise SystemExit(f"No query history in {args.path}")
+
+    history = History.from_state_dict({name: t.numpy() for name, t in state["history"].items()})
+    summary = history.summary()
+    uids = np.flatnonzero(summary["records"] > 0)
+    uids = uids[np.argsort(-summary[args.sort][uids])][: args.top]
+
+    print(f"step {state['step']}, {len(np.flatnonzero(summary['records'] > 0))} miners with records")
+    print(f"{'uid':>5} {'hotkey':<12} {'score':>6} " + " ".join(f"{name:>13}" for name in summary))
+    for uid in uids:
+        hotkey = state["hotkeys"][uid][:10] if uid < len(state["hotkeys"]) else ""
+        score = state["scores"][uid].item() if uid < len(state["scores"]) else float("nan")
+        print(f"{uid:>5} {hotkey:<12} {score:6.3f} " + " ".join(f"{values[uid]:13.4f}" for values in summary.values()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="Path of the validator's state.pt.")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--sort", default="reward_mean", help="Summary statistic to sort the miners by.")
+    main(parser.parse_args())
@@ -0,0 +1,70 @@
+"""
+Offline simulation of the validator's miner sampling strategies. Miners have a hidden true reward and noise level,
+the validator keeps its moving average scores as in BaseValidatorNeuron.update_scores, and a fraction of the miners is
+replaced by new ones at regular intervals. For each strategy, reports the number of queries until the mean absolute
+error between scores and true rewards first drops below the target, and the mean error over the last part of the run.
+
+Usage:
+    python scripts/simulate_sampling.py --miners 256 --sample-size 16 --steps 3000 --target 0.05
+"""
+import argparse
+
+import torch
+
+from ocr_subnet.utils.sampling import STRATEGIES, SamplingScheduler
+
+
+def simulate(strategy: str, args) -> dict:
+    generator = torch.Generator().manual_seed(args.seed)
+    torch.manual_seed(args.seed)
+
+    def new_miners(n):
+        return torch.rand(n, generator=generator), 0.05 + 0.25 * torch.rand(n, generator=generator)
+
+    true_reward, noise = new_miners(args.miners)
+    scores = torch.zeros(args.miners)
+    sampler = SamplingScheduler(strategy, n=args.miners)
+    available = torch.arange(args.miners)
+
+    errors = []
+    queries_to_target = None
+    for step in range(args.steps):
+        # Deregister some miners and register new ones in their uids
+        if step > 0 and step % args.churn_interval == 0:
+            replaced = torch.randperm(args.miners, generator=generator)[: int(args.churn * args.miners)]
+            true_reward[replaced], noise[replaced] = new_miners(len(replaced))
+            scores[replaced] = 0
+            sampler.reset(replaced)
+
+        uids = sampler.sample(available, args.sample_size, step)
+        rewards = (true_reward[uids] + noise[uids] * torch.randn(len(uids), generator=generator)).clamp(0, 1)
+
+        scattered = scores.scatter(0, uids, rewards)
+        scores = args.alpha * scattered + (1 - args.alpha) * scores
+        sampler.record(uids, rewards, step)
+
+        error = (scores - true_reward).abs().mean().item()
+        errors.append(error)
+        if queries_to_target is None and error < args.target:
+            queries_to_target = (step + 1) * args.sample_size
+
+    tail = errors[-len(errors) // 4:]
+    return {'queries_to_target': queries_to_target, 'final_error': sum(tail) / len(tail)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--miners', type=int, default=256)
+    parser.add_argument('--sample-size', type=int, default=16)
+    parser.add_argument('--steps', type=int, default=3000)
+    parser.add_argument('--alpha', type=float, default=0.05, help='Moving average alpha, as --neuron.moving_average_alpha.')
+    parser.add_argument('--target', type=float, default=0.05, help='Target mean absolute score error.')
+    parser.add_argument('--churn', type=float, default=0.05, help='Fraction of miners replaced at each churn interval.')
+    parser.add_argument('--churn-interval', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for strategy in STRATEGIES:
+        result = simulate(strategy, args)
+        queries = result['queries_to_target'] if result['queries_to_target'] is not None else 'not reached'
+        print(f"strategy={strategy:<12} queries_to_target={queries!s:<12} final_error={result['final_error']:.4f}")
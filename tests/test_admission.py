@@ -0,0 +1,103 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import asyncio
+import time
+import unittest
+
+from ocr_subnet.miner.admission import AdmissionController
+from ocr_subnet.miner.policy import MODES
+
+
+class AdmissionControllerTestCase(unittest.TestCase):
+    """
+    Tests that the admission controller queues requests by stake and then deadline, and sheds requests which cannot
+    finish before their deadline.
+    """
+
+    def test_queue_is_ordered_by_stake_then_deadline(self):
+        controller = AdmissionController(capacity=1)
+        order = []
+
+        async def request(name, priority, deadline):
+            if await controller.acquire(priority, time.monotonic() + deadline):
+                order.append(name)
+                await asyncio.sleep(0)
+                controller.release(0.0)
+
+        async def run():
+            # Occupy the only slot so that the other requests are queued
+            await controller.acquire(0, time.monotonic() + 60)
+            tasks = [
+                asyncio.ensure_future(request("low", 1, 10)),
+                asyncio.ensure_future(request("high late", 5, 20)),
+                asyncio.ensure_future(request("high early", 5, 10)),
+            ]
+            await asyncio.sleep(0)
+            controller.release(0.0)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        self.assertEqual(order, ["high early", "high late", "low"])
+        self.assertEqual(controller.metrics()["shed"], 0)
+
+    def test_request_that_cannot_finish_is_shed(self):
+        controller = AdmissionController(capacity=1)
+        controller.latencies.extend([1.0, 1.0, 1.0])
+
+        async def run():
+            late = await controller.acquire(0, time.monotonic() + 0.5)
+            in_time = await controller.acquire(0, time.monotonic() + 2.0)
+            # Queued behind the running request, so it needs a second latency to finish
+            queued = await controller.acquire(0, time.monotonic() + 1.5)
+            return late, in_time, queued
+
+        self.assertEqual(asyncio.run(run()), (False, True, False))
+        self.assertEqual(controller.metrics()["shed"], 2)
+
+    def test_queued_request_is_shed_when_its_deadline_passes(self):
+        controller = AdmissionController(capacity=1)
+        controller.latencies.append(0.01)
+
+        async def run():
+            await controller.acquire(0, time.monotonic() + 60)
+            waiter = asyncio.ensure_future(controller.acquire(0, time.monotonic() + 0.05))
+            await asyncio.sleep(0.1)
+            controller.release(0.01)
+            return await waiter
+
+        self.assertFalse(asyncio.run(run()))
+        self.assertEqual(controller.metrics()["shed"], 1)
+        self.assertEqual(controller.running, 0)
+
+    def test_latency_is_relative_to_the_accurate_mode(self):
+        fast = MODES[0]
+        controller = AdmissionController(capacity=1, min_cost=fast.cost)
+
+        async def run():
+            await controller.acquire(0, time.monotonic() + 60)
+            controller.release(fast.cost, fast.cost)
+            # Too short for the accurate mode, but the request can still run in the fast mode
+            return await controller.acquire(0, time.monotonic() + 0.5)
+
+        self.assertTrue(asyncio.run(run()))
+        self.assertAlmostEqual(controller.latency(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import asyncio
+import unittest
+import concurrent.futures
+
+from PIL import Image
+
+from ocr_subnet.miner.batching import MicroBatcher
+from ocr_subnet.miner.engine import OCREngine
+from ocr_subnet.miner.ocr import extract_batch
+from ocr_subnet.utils.image import serialize
+
+
+class FakeEngine(OCREngine):
+    """Finds one word in every image, and fails on images which are 13 pixels wide."""
+
+    def submit(self, image, psm: int = None) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        if image.width == 13:
+            future.set_exception(ValueError("ocr failed"))
+        else:
+            future.set_result({'text': ['word'], 'left': [10], 'top': [10], 'width': [40], 'height': [20], 'conf': [90]})
+        return future
+
+
+class MicroBatcherTestCase(unittest.TestCase):
+    """
+    Tests that the micro batcher runs a batch when it is full or its window ends, and that failures only reach the
+    callers they belong to.
+    """
+
+    def setUp(self):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        self.batches = []
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def run_batch(self, items):
+        self.batches.append(list(items))
+        return [ValueError(item) if item == "bad" else item.upper() for item in items]
+
+    def test_full_batch_is_run_without_waiting(self):
+        batcher = MicroBatcher(self.run_batch, self.executor, window=60, max_batch_size=3)
+
+        async def run():
+            return await asyncio.wait_for(asyncio.gather(*[batcher.submit(item) for item in "abc"]), timeout=5)
+
+        self.assertEqual(asyncio.run(run()), ["A", "B", "C"])
+        self.assertEqual(self.batches, [["a", "b", "c"]])
+
+    def test_partial_batch_is_run_after_window(self):
+        batcher = MicroBatcher(self.run_batch, self.executor, window=0.01, max_batch_size=10)
+
+        async def run():
+            return await asyncio.gather(*[batcher.submit(item) for item in "ab"])
+
+        self.assertEqual(asyncio.run(run()), ["A", "B"])
+        self.assertEqual(self.batches, [["a", "b"]])
+        self.assertEqual(batcher.metrics(), {"batches": 1, "mean_batch_size": 2.0})
+        self.assertEqual(len(batcher.tasks), 0)
+
+    def test_item_failure_only_reaches_its_caller(self):
+        batcher = MicroBatcher(self.run_batch, self.executor, window=0.01, max_batch_size=10)
+
+        async def run():
+            return await asyncio.gather(*[batcher.submit(item) for item in ["a", "bad", "c"]], return_exceptions=True)
+
+        first, bad, last = asyncio.run(run())
+        self.assertEqual((first, last), ("A", "C"))
+        self.assertIsInstance(bad, ValueError)
+
+    def test_batch_failure_reaches_every_caller(self):
+        def fail(items):
+            raise RuntimeError("batch failed")
+
+        batcher = MicroBatcher(fail, self.executor, window=0.01, max_batch_size=10)
+
+        async def run():
+            return await asyncio.gather(*[batcher.submit(item) for item in "ab"], return_exceptions=True)
+
+        for result in asyncio.run(run()):
+            self.assertIsInstance(result, RuntimeError)
+
+
+class ExtractBatchTestCase(unittest.TestCase):
+    """
+    Tests that an image which fails to decode or OCR does not fail the rest of its batch.
+    """
+
+    def test_failures_are_isolated(self):
+        good = serialize(Image.new('RGB', (200, 100), 'white'))
+        unreadable = serialize(Image.new('RGB', (13, 100), 'white'))
+
+        results = extract_batch([good, "not an image", unreadable, good], FakeEngine())
+
+        self.assertIsInstance(results[1], Exception)
+        self.assertIsInstance(results[2], ValueError)
+        for sections, timings in [results[0], results[3]]:
+            self.assertEqual([section['text'] for section in sections], ['word'])
+            self.assertIn('ocr', timings)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import asyncio
+import unittest
+
+import numpy as np
+
+from types import SimpleNamespace
+
+from neurons.miner import Miner
+
+
+class FakeMetagraph:
+    def __init__(self, hotkeys, stakes, validator_permits):
+        self.hotkeys = hotkeys
+        self.S = np.array(stakes, dtype=np.float32)
+        self.validator_permit = np.array(validator_permits)
+        self.next = None
+
+    def sync(self, subtensor=None):
+        self.hotkeys, self.S, self.validator_permit = self.next
+
+
+def request(hotkey):
+    return SimpleNamespace(dendrite=SimpleNamespace(hotkey=hotkey))
+
+
+class BlacklistTestCase(unittest.TestCase):
+    """
+    Tests that the miner gates and prioritizes requests using the hotkey index, and that the index follows the
+    metagraph.
+    """
+
+    def setUp(self):
+        # Bypass the constructor, which connects to the chain and starts the OCR engine
+        self.miner = Miner.__new__(Miner)
+        self.miner.subtensor = None
+        self.miner.metagraph = FakeMetagraph(["validator", "miner"], [1000.0, 5.0], [True, False])
+        self.miner.config = SimpleNamespace(
+            blacklist=SimpleNamespace(allow_non_registered=False, force_validator_permit=True)
+        )
+        self.miner.build_hotkey_index()
+
+    def blacklist(self, hotkey):
+        return asyncio.run(self.miner.blacklist(request(hotkey)))[0]
+
+    def priority(self, hotkey):
+        return asyncio.run(self.miner.priority(request(hotkey)))
+
+    def test_index_maps_hotkeys_to_uid_stake_and_permit(self):
+        self.assertEqual(self.miner.hotkey_index, {"validator": (0, 1000.0, True), "miner": (1, 5.0, False)})
+
+    def test_unregistered_hotkey(self):
+        self.assertTrue(self.blacklist("stranger"))
+        self.assertEqual(self.priority("stranger"), 0.0)
+
+        self.miner.config.blacklist.allow_non_registered = True
+        self.assertFalse(self.blacklist("stranger"))
+
+    def test_force_validator_permit(self):
+        self.assertFalse(self.blacklist("validator"))
+        self.assertTrue(self.blacklist("miner"))
+
+        self.miner.config.blacklist.force_validator_permit = False
+        self.assertFalse(self.blacklist("miner"))
+
+    def test_priority_is_stake(self):
+        self.assertEqual(self.priority("validator"), 1000.0)
+        self.assertEqual(self.priority("miner"), 5.0)
+
+    def test_index_is_rebuilt_after_resync(self):
+        self.miner.metagraph.next = (
+            ["validator", "newcomer"],
+            np.array([2000.0, 50.0], dtype=np.float32),
+            np.array([True, True]),
+        )
+        self.miner.resync_metagraph()
+
+        self.assertTrue(self.blacklist("miner"))
+        self.assertFalse(self.blacklist("newcomer"))
+        self.assertEqual(self.priority("validator"), 2000.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import time
+import unittest
+
+from ocr_subnet.utils.misc import BlockClock
+
+
+class FakeChain:
+    """Chain producing a block every block_time seconds of monotonic time."""
+
+    def __init__(self, block_time: float, start: int = 1000):
+        self.block_time = block_time
+        self.start = start
+        self.t0 = time.monotonic()
+        self.reads = 0
+
+    def get_current_block(self) -> int:
+        self.reads += 1
+        return self.start + int((time.monotonic() - self.t0) / self.block_time)
+
+
+class BlockClockTestCase(unittest.TestCase):
+    def test_extrapolates_between_reads(self):
+        chain = FakeChain(block_time=0.02)
+        clock = BlockClock(chain.get_current_block, block_time=0.02, interval=10)
+        blocks = []
+        for _ in range(10):
+            blocks.append(clock.now())
+            time.sleep(0.03)
+
+        self.assertEqual(chain.reads, 1)
+        self.assertEqual(blocks, sorted(blocks))
+        self.assertGreaterEqual(blocks[-1] - blocks[0], 9)
+        self.assertLessEqual(abs(clock.now() - chain.get_current_block()), 1)
+
+    def test_drift_shortens_interval(self):
+        clock = BlockClock(block_time=12, interval=300)
+        clock.observe(100, at=0)
+        clock.observe(110, at=12)
+        self.assertEqual(clock.drift, 9)
+        self.assertEqual(clock.current_interval, 150)
+
+        clock.observe(111, at=24)
+        self.assertEqual(clock.current_interval, 300)
+
+    def test_never_goes_backwards(self):
+        clock = BlockClock(block_time=12)
+        clock.observe(100, at=time.monotonic() - 60)
+        self.assertEqual(clock.estimate(), 105)
+        clock.observe(101)
+        self.assertEqual(clock.estimate(), 105)
+        self.assertIsNone(BlockClock().estimate())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import asyncio
+import unittest
+
+from ocr_subnet.miner.cache import ResultCache
+from ocr_subnet.miner.policy import MODES
+
+
+class ResultCacheTestCase(unittest.TestCase):
+    """
+    Tests that the miner result cache serves repeated images, expires and evicts entries, and coalesces concurrent
+    identical requests into a single computation.
+    """
+
+    def setUp(self):
+        self.calls = 0
+
+    async def compute(self, result="result", delay=0.0):
+        self.calls += 1
+        await asyncio.sleep(delay)
+        return result
+
+    def test_repeat_is_served_from_cache(self):
+        cache = ResultCache(maxsize=2, ttl=60)
+
+        async def run():
+            first = await cache.get_or_compute("a", self.compute)
+            second = await cache.get_or_compute("a", self.compute)
+            return first, second
+
+        self.assertEqual(asyncio.run(run()), ("result", "result"))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache.metrics()["hits"], 1)
+
+    def test_expired_entry_is_recomputed(self):
+        cache = ResultCache(maxsize=2, ttl=-1)
+
+        async def run():
+            await cache.get_or_compute("a", self.compute)
+            await cache.get_or_compute("a", self.compute)
+
+        asyncio.run(run())
+        self.assertEqual(self.calls, 2)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ResultCache(maxsize=2, ttl=60)
+
+        async def run():
+            for key in ["a", "b", "a", "c"]:
+                await cache.get_or_compute(key, self.compute)
+
+        asyncio.run(run())
+        self.assertEqual(list(cache.entries), ["a", "c"])
+
+    def test_concurrent_requests_are_coalesced(self):
+        cache = ResultCache(maxsize=0)
+
+        async def run():
+            return await asyncio.gather(
+                *[cache.get_or_compute("a", lambda: self.compute(delay=0.01)) for _ in range(5)]
+            )
+
+        self.assertEqual(asyncio.run(run()), ["result"] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache.metrics()["coalesced"], 4)
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_failures_are_not_cached(self):
+        cache = ResultCache(maxsize=2, ttl=60)
+
+        async def fail():
+            raise ValueError("ocr failed")
+
+        async def run():
+            with self.assertRaises(ValueError):
+                await cache.get_or_compute("a", fail)
+            await cache.get_or_compute("b", lambda: self.compute(result=None))
+
+        asyncio.run(run())
+        self.assertEqual(len(cache.entries), 0)
+        self.assertEqual(len(cache.inflight), 0)
+
+    def test_waiters_compute_when_owner_is_shed(self):
+        cache = ResultCache(maxsize=2, ttl=60)
+        results = iter([None, "result"])
+
+        async def compute():
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            return next(results)
+
+        async def run():
+            return await asyncio.gather(*[cache.get_or_compute("a", compute) for _ in range(3)])
+
+        # The owner is shed, the first waiter computes again and the other waiter shares its result
+        self.assertEqual(asyncio.run(run()), [None, "result", "result"])
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(cache.metrics()["coalesced"], 1)
+
+    def test_waiters_compute_when_owner_is_cancelled(self):
+        cache = ResultCache(maxsize=2, ttl=60)
+
+        async def run():
+            owner = asyncio.ensure_future(cache.get_or_compute("a", lambda: self.compute(delay=1.0)))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(cache.get_or_compute("a", lambda: self.compute(delay=0.01)))
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            return await waiter, owner.cancelled()
+
+        self.assertEqual(asyncio.run(run()), ("result", True))
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(len(cache.inflight), 0)
+
+    def test_degraded_results_are_not_cached(self):
+        cache = ResultCache(maxsize=2, ttl=60)
+        fast, accurate = MODES[0], MODES[-1]
+
+        def is_accurate(result):
+            return result[1] == accurate
+
+        async def run():
+            first = await cache.get_or_compute("a", lambda: self.compute(result=("fast", fast)), is_accurate)
+            second = await cache.get_or_compute("a", lambda: self.compute(result=("accurate", accurate)), is_accurate)
+            third = await cache.get_or_compute("a", lambda: self.compute(result=("fast", fast)), is_accurate)
+            return first[0], second[0], third[0]
+
+        # The accurate request is not served the fast result, and the accurate result is then served to everyone
+        self.assertEqual(asyncio.run(run()), ("fast", "accurate", "accurate"))
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
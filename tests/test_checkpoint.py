@@ -0,0 +1,85 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import tempfile
+import unittest
+
+import torch
+
+from ocr_subnet.base.checkpoint import Checkpoint
+
+
+class CheckpointTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "state.pt")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def state(self, step=0):
+        return {"step": step, "scores": torch.zeros(4), "hotkeys": ["a", "b", "c", "d"]}
+
+    def test_missing(self):
+        self.assertIsNone(Checkpoint(self.path).load())
+
+    def test_corrupt(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a checkpoint")
+        self.assertIsNone(Checkpoint(self.path).load())
+
+    def test_replays_deltas(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint.snapshot(self.state())
+        checkpoint.delta(0, [1, 2], [0.5, 0.25])
+        checkpoint.delta(1, [2], [0.75])
+        checkpoint.stop()
+
+        state = Checkpoint(self.path).load()
+        self.assertEqual(state["step"], 2)
+        self.assertEqual(state["scores"].tolist(), [0, 0.5, 0.75, 0])
+
+    def test_snapshot_truncates_deltas(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint.snapshot(self.state())
+        checkpoint.delta(0, [1], [0.5])
+        state = self.state(step=1)
+        state["scores"][1] = 0.5
+        checkpoint.snapshot(state)
+        checkpoint.delta(1, [3], [1.0])
+        checkpoint.stop()
+
+        state = Checkpoint(self.path).load()
+        self.assertEqual(state["step"], 2)
+        self.assertEqual(state["scores"].tolist(), [0, 0.5, 0, 1.0])
+
+    def test_truncated_delta(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint.snapshot(self.state())
+        checkpoint.delta(0, [1], [0.5])
+        checkpoint.stop()
+        with open(checkpoint.deltas_path, "ab") as f:
+            f.write(b"\x80\x04\x95")
+
+        state = Checkpoint(self.path).load()
+        self.assertEqual(state["scores"].tolist(), [0, 0.5, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
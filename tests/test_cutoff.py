@@ -0,0 +1,102 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import asyncio
+import time
+import unittest
+
+from ocr_subnet.validator.cutoff import QueryCutoff
+from ocr_subnet.validator.history import History
+
+
+async def answer(value, latency):
+    await asyncio.sleep(latency)
+    return value
+
+
+class QueryCutoffTestCase(unittest.TestCase):
+    def run_gather(self, cutoff, latencies, deadlines):
+        async def main():
+            start = time.monotonic()
+            results = await cutoff.gather([answer(i, latency) for i, latency in enumerate(latencies)], deadlines)
+            elapsed = time.monotonic() - start
+            await asyncio.gather(*cutoff.background)
+            return results, elapsed
+
+        return asyncio.run(main())
+
+    def test_full(self):
+        cutoff = QueryCutoff("full", timeout=1.0)
+        results, _ = self.run_gather(cutoff, [0.01, 0.05], [1.0, 1.0])
+        self.assertEqual(results, [0, 1])
+        self.assertEqual(cutoff.metrics()["dropped"], 0)
+
+    def test_quorum(self):
+        cutoff = QueryCutoff("quorum", timeout=1.0, quorum=0.75, grace=0.0)
+        results, elapsed = self.run_gather(cutoff, [0.01, 0.02, 0.03, 0.5], [1.0] * 4)
+        self.assertEqual(results, [0, 1, 2, None])
+        self.assertLess(elapsed, 0.3)
+
+        metrics = cutoff.metrics()
+        self.assertEqual((metrics["cutoffs"], metrics["dropped"], metrics["late"]), (1, 1, 1))
+        self.assertGreater(metrics["saved"], 0.3)
+
+    def test_quorum_grace(self):
+        cutoff = QueryCutoff("quorum", timeout=1.0, quorum=0.5, grace=0.1)
+        results, elapsed = self.run_gather(cutoff, [0.01, 0.05, 0.5], [1.0] * 3)
+        self.assertEqual(results, [0, 1, None])
+        self.assertLess(elapsed, 0.3)
+
+    def test_late_and_saved_accounting(self):
+        async def fail(latency):
+            await asyncio.sleep(latency)
+            raise ConnectionError("miner unreachable")
+
+        async def main():
+            # Like the dendrite, the last query times out by itself
+            queries = [answer(0, 0.01), answer(1, 0.3), fail(0.2), asyncio.wait_for(answer(3, 2.0), 0.5)]
+            results = await cutoff.gather(queries, [0.1, 0.1, 0.1, 0.1])
+            await asyncio.gather(*cutoff.background)
+            return results
+
+        cutoff = QueryCutoff("adaptive", timeout=0.5)
+        self.assertEqual(asyncio.run(main()), [0, None, None, None])
+
+        # Failed and timed out queries are not late answers, and the step would have waited until the timeout
+        metrics = cutoff.metrics()
+        self.assertEqual((metrics["cutoffs"], metrics["dropped"], metrics["late"]), (1, 3, 1))
+        self.assertAlmostEqual(metrics["saved"], 0.4, delta=0.05)
+
+    def test_adaptive_deadlines(self):
+        history = History(n=3, size=8)
+        for step in range(5):
+            history.record([0, 1], step, latency=[0.1, 4.0])
+        history.record([2], 0, latency=[0.1])
+
+        cutoff = QueryCutoff("adaptive", timeout=5.0, multiplier=2.0, min_deadline=0.5)
+        self.assertEqual(cutoff.deadlines(history, [0, 1, 2]), [0.5, 5.0, 5.0])
+
+        results, elapsed = self.run_gather(cutoff, [0.01, 0.3], [0.1, 1.0])
+        self.assertEqual(results, [0, 1])
+        results, elapsed = self.run_gather(cutoff, [0.3, 0.01], [0.1, 1.0])
+        self.assertEqual(results, [None, 1])
+        self.assertLess(elapsed, 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import shutil
+import unittest
+
+from ocr_subnet.miner.engine import PytesseractEngine, WorkerPoolEngine
+from ocr_subnet.miner.ocr import extract, extract_batch, synthetic_page
+
+
+@unittest.skipUnless(shutil.which("tesseract"), "tesseract is not installed")
+class EngineTestCase(unittest.TestCase):
+    """
+    Tests that the worker pool engine returns the same sections as the reference pytesseract engine.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.page = synthetic_page(lines=10)
+        cls.reference = PytesseractEngine(num_workers=1)
+        cls.expected, _ = extract(cls.page, cls.reference)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.reference.close()
+
+    def assertSameSections(self, sections):
+        self.assertEqual([s["text"] for s in sections], [s["text"] for s in self.expected])
+        for section, expected in zip(sections, self.expected):
+            for a, b in zip(section["position"], expected["position"]):
+                self.assertAlmostEqual(a, b, delta=2)
+
+    def test_pool_matches_pytesseract(self):
+        pool = WorkerPoolEngine(num_workers=2)
+        try:
+            sections, _ = extract(self.page, pool)
+        finally:
+            pool.close()
+        self.assertTrue(self.expected)
+        self.assertSameSections(sections)
+
+    def test_pool_batch_matches_pytesseract(self):
+        pool = WorkerPoolEngine(num_workers=2)
+        try:
+            results = extract_batch([self.page] * 3, pool)
+        finally:
+            pool.close()
+        self.assertEqual(len(results), 3)
+        for sections, _ in results:
+            self.assertSameSections(sections)
+
+if __name__ == "__main__":
+    unittest.main()
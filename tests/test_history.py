@@ -0,0 +1,86 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import unittest
+
+import numpy as np
+
+from ocr_subnet.validator.history import History
+
+
+class HistoryTestCase(unittest.TestCase):
+    def test_ring_buffer(self):
+        history = History(n=2, size=3)
+        for step in range(5):
+            history.record([0], step, reward=[step / 10], latency=[1.0], size=[4])
+        self.assertEqual(history.records(0)[:, 0].tolist(), [2, 3, 4])
+        self.assertEqual(len(history.records(1)), 0)
+        self.assertEqual(history.data.shape, (2, 3, 6))
+
+    def test_resize_and_reset(self):
+        history = History(n=1, size=2)
+        history.record([3], 0, reward=[1.0])
+        self.assertEqual(len(history.count), 4)
+        history.reset([3])
+        self.assertEqual(len(history.records(3)), 0)
+
+    def test_summary(self):
+        history = History(n=2, size=8)
+        for step in range(4):
+            history.record([0, 1], step, reward=[step / 4, 0.5], latency=[step, 2.0], size=[3, 0])
+        summary = history.summary()
+        self.assertEqual(summary["records"].tolist(), [4, 4])
+        self.assertAlmostEqual(summary["reward_trend"][0], 0.25)
+        self.assertAlmostEqual(summary["reward_trend"][1], 0.0)
+        self.assertEqual(summary["failure_rate"].tolist(), [0.0, 1.0])
+        self.assertAlmostEqual(summary["latency_p50"][1], 2.0)
+
+        empty = History(n=1).summary()
+        self.assertEqual(empty["records"].tolist(), [0])
+        self.assertTrue(np.isnan(empty["reward_mean"][0]))
+
+    def test_state_dict(self):
+        history = History(n=2, size=4)
+        history.record([1], 7, reward=[0.5])
+        restored = History.from_state_dict(history.state_dict())
+        np.testing.assert_array_equal(restored.records(1), history.records(1))
+        counts, last_step, mean, m2 = restored.moments()
+        self.assertEqual(counts.tolist(), [0, 1])
+        self.assertEqual(last_step.tolist(), [-1, 7])
+        self.assertEqual(mean.tolist(), [0.0, 0.5])
+
+    def test_state_dict_resized(self):
+        history = History(n=2, size=4)
+        for step in range(6):
+            history.record([0], step, reward=[step / 10])
+        history.record([1], 9, reward=[0.5])
+        state = history.state_dict()
+
+        smaller = History.from_state_dict(state, size=2)
+        self.assertEqual(smaller.data.shape, (2, 2, 6))
+        self.assertEqual(smaller.records(0)[:, 0].tolist(), [4, 5])
+        self.assertEqual(smaller.records(1)[:, 0].tolist(), [9])
+
+        larger = History.from_state_dict(state, size=8)
+        self.assertEqual(larger.records(0)[:, 0].tolist(), [2, 3, 4, 5])
+        larger.record([0], 6, reward=[0.6])
+        self.assertEqual(larger.records(0)[:, 0].tolist(), [2, 3, 4, 5, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import io
+import base64
+import unittest
+
+import numpy as np
+
+from PIL import Image, ImageDraw
+
+from ocr_subnet.utils.image import deserialize, serialize
+
+
+def page(width: int = 640, height: int = 480) -> Image.Image:
+    """A smooth colour gradient with some text, so that differently decoded copies can be compared pixel by pixel."""
+    x, y = np.meshgrid(np.linspace(0, 255, width), np.linspace(0, 255, height))
+    image = Image.fromarray(np.stack([x, y, 255 - x], axis=-1).astype(np.uint8))
+    ImageDraw.Draw(image).text((100, 200), "Invoice #000123 Total: $300.00", fill="black")
+    return image
+
+
+class DeserializeTestCase(unittest.TestCase):
+    """
+    Tests that the reduced decodes (draft, grayscale, crop and resize) have the requested size and mode and match a
+    plain full decode processed the same way.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.jpeg = serialize(page())
+        cls.png = serialize(page(), format="PNG")
+
+    def plain(self, base64_string):
+        return Image.open(io.BytesIO(base64.b64decode(base64_string))).convert("RGB")
+
+    def assertClose(self, image, expected, tolerance=6):
+        self.assertEqual(image.size, expected.size)
+        self.assertEqual(image.mode, expected.mode)
+        difference = np.abs(np.asarray(image, dtype=float) - np.asarray(expected, dtype=float))
+        self.assertLess(difference.mean(), tolerance)
+
+    def test_default_is_plain_decode(self):
+        image = deserialize(self.jpeg)
+        self.assertEqual(image.size, (640, 480))
+        np.testing.assert_array_equal(np.asarray(image), np.asarray(self.plain(self.jpeg)))
+
+    def test_grayscale(self):
+        image = deserialize(self.jpeg, grayscale=True)
+        self.assertClose(image, self.plain(self.jpeg).convert("L"))
+
+    def test_draft_scale(self):
+        for scale in [0.5, 0.25, 0.3]:
+            with self.subTest(scale=scale):
+                image = deserialize(self.jpeg, scale=scale)
+                size = (round(640 * scale), round(480 * scale))
+                self.assertClose(image, self.plain(self.jpeg).resize(size, resample=Image.BILINEAR))
+
+    def test_scale_without_draft(self):
+        image = deserialize(self.png, scale=0.5, grayscale=True)
+        self.assertClose(image, self.plain(self.png).convert("L").resize((320, 240), resample=Image.BILINEAR))
+
+    def test_crop(self):
+        box = (100, 150, 420, 390)
+        image = deserialize(self.jpeg, box=box)
+        self.assertClose(image, self.plain(self.jpeg).crop(box))
+
+    def test_crop_and_scale(self):
+        box = (100, 150, 420, 390)
+        image = deserialize(self.jpeg, scale=0.5, grayscale=True, box=box)
+        expected = self.plain(self.jpeg).convert("L").crop(box).resize((160, 120), resample=Image.BILINEAR)
+        self.assertClose(image, expected)
+
+    def test_as_array(self):
+        array = deserialize(self.jpeg, scale=0.5, as_array=True)
+        self.assertIsInstance(array, np.ndarray)
+        self.assertEqual((array.shape, array.dtype), ((240, 320, 3), np.uint8))
+
+        array = deserialize(self.jpeg, grayscale=True, as_array=True)
+        self.assertEqual(array.shape, (480, 640))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import unittest
+from types import SimpleNamespace
+
+from ocr_subnet.utils.metagraph import axons_fingerprint, diff_hotkeys, hotkeys_fingerprint
+
+
+class MetagraphDiffTestCase(unittest.TestCase):
+    def test_unchanged(self):
+        hotkeys = ["a", "b", "c"]
+        self.assertEqual(hotkeys_fingerprint(hotkeys), hotkeys_fingerprint(list(hotkeys)))
+        self.assertFalse(diff_hotkeys(hotkeys, list(hotkeys)))
+
+    def test_replaced_and_added(self):
+        diff = diff_hotkeys(["a", "b", "c"], ["a", "x", "c", "d", "e"])
+        self.assertEqual(diff.replaced, [1])
+        self.assertEqual(diff.added, [3, 4])
+        self.assertEqual(diff.removed, [])
+
+    def test_removed(self):
+        diff = diff_hotkeys(["a", "b", "c"], ["y"])
+        self.assertEqual(diff.replaced, [0])
+        self.assertEqual(diff.removed, [1, 2])
+
+    def test_axon_moved(self):
+        axon = SimpleNamespace(hotkey="a", ip="1.2.3.4", port=8091, ip_type=4, version=1)
+        moved = SimpleNamespace(hotkey="a", ip="1.2.3.4", port=8092, ip_type=4, version=1)
+        self.assertNotEqual(axons_fingerprint([axon]), axons_fingerprint([moved]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import threading
+import unittest
+
+from collections import deque
+
+from ocr_subnet.miner.admission import AdmissionController
+from ocr_subnet.miner.policy import MODES, OCRPolicy
+from ocr_subnet.utils.metrics import StageMetrics, snapshot
+
+
+class FlakyDeque(deque):
+    """Deque whose first iteration fails as if another thread had appended to it meanwhile."""
+
+    failures = 1
+
+    def __iter__(self):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("deque mutated during iteration")
+        return super().__iter__()
+
+
+class MetricsTestCase(unittest.TestCase):
+    """
+    Tests that latency summaries can be read while samples are recorded from another thread.
+    """
+
+    def test_snapshot_retries_when_mutated(self):
+        self.assertEqual(snapshot(FlakyDeque([1, 2, 3])), (1, 2, 3))
+
+    def test_concurrent_read_and_record(self):
+        metrics = StageMetrics(window=100)
+        admission = AdmissionController(capacity=1, window=100)
+        policy = OCRPolicy(window=100)
+        stop = threading.Event()
+
+        def record():
+            i = 0
+            while not stop.is_set():
+                metrics.record("ocr", i)
+                admission.latencies.append(i)
+                policy.record(MODES[-1], i)
+                i += 1
+
+        writer = threading.Thread(target=record)
+        writer.start()
+        try:
+            for _ in range(2000):
+                metrics.summary()
+                admission.latency()
+                policy.latency(MODES[0])
+        finally:
+            stop.set()
+            writer.join()
+
+        self.assertGreater(metrics.summary()["ocr"]["count"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import time
+import asyncio
+import unittest
+
+from ocr_subnet.utils.pipeline import Pipeline
+
+
+def run_for(pipeline: Pipeline, seconds: float):
+    deadline = time.monotonic() + seconds
+    asyncio.run(pipeline.run(lambda: time.monotonic() >= deadline, poll_interval=0.01))
+
+
+class PipelineTestCase(unittest.TestCase):
+    """
+    Tests that stages overlap, and that dropped and failed items don't stop the pipeline.
+    """
+
+    def test_throughput_is_limited_by_slowest_stage(self):
+        counter = iter(range(1000))
+        done = []
+
+        async def generate():
+            await asyncio.sleep(0.02)
+            return next(counter)
+
+        async def query(item):
+            await asyncio.sleep(0.04)
+            return item
+
+        async def update(item):
+            await asyncio.sleep(0.02)
+            done.append(item)
+
+        pipeline = Pipeline([("generate", generate, 1), ("query", query, 1), ("update", update, 1)])
+        run_for(pipeline, 1.0)
+
+        # Sequentially a step takes 80 ms, pipelined it takes as long as the 40 ms query stage
+        self.assertGreater(len(done), 16)
+        self.assertEqual(done, sorted(done))
+        metrics = pipeline.metrics()
+        self.assertGreater(metrics["query"]["utilization"], 0.8)
+        self.assertLess(metrics["update"]["utilization"], 0.7)
+
+    def test_drops_failed_and_empty_items(self):
+        counter = iter(range(1000))
+        done = []
+
+        async def generate():
+            await asyncio.sleep(0.01)
+            return next(counter)
+
+        async def check(item):
+            if item % 3 == 0:
+                raise ValueError(item)
+            return item if item % 3 == 1 else None
+
+        async def update(item):
+            done.append(item)
+
+        pipeline = Pipeline([("generate", generate, 1), ("check", check, 2), ("update", update, 1)])
+        run_for(pipeline, 0.3)
+
+        self.assertTrue(done)
+        self.assertTrue(all(item % 3 == 1 for item in done))
+        self.assertGreater(pipeline.metrics()["check"]["errors"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
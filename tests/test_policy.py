@@ -0,0 +1,60 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import unittest
+
+from ocr_subnet.miner.policy import MODES, OCRPolicy
+
+
+class OCRPolicyTestCase(unittest.TestCase):
+    """
+    Tests that the policy picks the most accurate mode which fits the time budget.
+    """
+
+    def setUp(self):
+        self.fast, self.balanced, self.accurate = MODES
+        self.policy = OCRPolicy(headroom=1.0)
+        self.policy.record(self.accurate, 2.0)
+
+    def test_unmeasured_modes_use_relative_cost(self):
+        self.assertAlmostEqual(self.policy.latency(self.fast), 2.0 * self.fast.cost)
+        self.assertAlmostEqual(self.policy.latency(self.balanced), 2.0 * self.balanced.cost)
+
+    def test_chooses_most_accurate_mode_within_budget(self):
+        self.assertEqual(self.policy.choose(10.0), self.accurate)
+        self.assertEqual(self.policy.choose(1.5), self.balanced)
+        self.assertEqual(self.policy.choose(1.0), self.fast)
+
+    def test_falls_back_to_fastest_mode(self):
+        self.assertEqual(self.policy.choose(0.1), self.fast)
+
+    def test_load_scales_estimates(self):
+        self.assertEqual(self.policy.choose(3.0, load=1.0), self.accurate)
+        self.assertEqual(self.policy.choose(3.0, load=2.0), self.balanced)
+
+    def test_fixed_mode(self):
+        policy = OCRPolicy(mode="accurate")
+        self.assertEqual(policy.choose(0.0), self.accurate)
+        self.assertEqual(policy.metrics()["accurate"]["count"], 1)
+
+    def test_choices(self):
+        self.assertEqual(self.policy.choices(), [self.fast, self.balanced, self.accurate])
+        self.assertEqual(OCRPolicy(mode="fast").choices(), [self.fast])
+
+
+if __name__ == "__main__":
+    unittest.main()
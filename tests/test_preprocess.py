@@ -0,0 +1,82 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import unittest
+
+import numpy as np
+
+from PIL import Image, ImageDraw
+
+from ocr_subnet.miner import preprocess
+from ocr_subnet.miner.result import OCRResult
+
+
+def page(angle: float = 0.0) -> Image.Image:
+    """A white page with rows of black bars, rotated counter-clockwise by angle degrees."""
+    image = Image.new("L", (800, 600), 255)
+    draw = ImageDraw.Draw(image)
+    for y in range(100, 500, 30):
+        draw.rectangle((100, y, 700, y + 10), fill=0)
+    return image.rotate(angle, fillcolor=255)
+
+
+class PreprocessTestCase(unittest.TestCase):
+    """
+    Tests the preprocessing steps and that positions are mapped back to the original image.
+    """
+
+    def test_box_sum(self):
+        pixels = np.random.default_rng(0).integers(0, 256, (37, 53)).astype(np.uint8)
+        sums, counts = preprocess.box_sum(pixels, 3)
+        for y, x in [(0, 0), (5, 7), (36, 52), (20, 1)]:
+            window = pixels[max(0, y - 3) : y + 4, max(0, x - 3) : x + 4]
+            self.assertEqual(sums[y, x], window.sum())
+            self.assertEqual(counts[y, x], window.size)
+
+    def test_despeckle(self):
+        pixels = np.full((20, 20), 255, dtype=np.uint8)
+        pixels[5, 5] = 0
+        pixels[10:13, 10:13] = 0
+        cleaned = preprocess.despeckle(pixels)
+        self.assertEqual(cleaned[5, 5], 255)
+        self.assertTrue((cleaned[10:13, 10:13] == 0).all())
+
+    def test_estimate_skew(self):
+        for angle in [0.0, 0.5, -1.2]:
+            self.assertAlmostEqual(preprocess.estimate_skew(np.asarray(page(angle))), angle, delta=0.1)
+
+    def test_restore(self):
+        image = Image.new("L", (800, 600), 255)
+        ImageDraw.Draw(image).rectangle((600, 100, 650, 120), fill=0)
+
+        # Deskew by 1.5 degrees and crop, as apply would
+        transform = preprocess.Transform(left=20, top=10, angle=1.5, center=(400, 300))
+        processed = np.asarray(image.rotate(transform.angle, fillcolor=255))[10:, 20:]
+
+        ys, xs = np.nonzero(processed < 128)
+        found = OCRResult(np.array([xs.min()]), np.array([ys.min()]), np.array([xs.max()]), np.array([ys.max()]), ["a"])
+        restored = transform.restore(found)
+        for value, expected in zip([restored.left, restored.top, restored.right, restored.bottom], [600, 100, 650, 120]):
+            self.assertAlmostEqual(int(value[0]), expected, delta=3)
+
+    def test_unknown_step(self):
+        with self.assertRaises(ValueError):
+            preprocess.apply(page(), ["sharpen"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import random
+import unittest
+
+from ocr_subnet.utils.process import group_and_merge_boxes
+
+
+def reference_group_and_merge_boxes(data, xtol=25, ytol=5):
+    """The original line-scanning implementation, used as an oracle."""
+    data = [box for box in data if box is not None and 'position' in box]
+
+    lines = []
+    for box in data:
+        added_to_line = False
+        for line in lines:
+            if line and abs(line[0]['position'][1] - box['position'][1]) <= ytol:
+                line.append(box)
+                added_to_line = True
+                break
+        if not added_to_line:
+            lines.append([box])
+
+    merged_data = []
+    for line in lines:
+        line.sort(key=lambda item: item['position'][0])
+        i = 0
+        while i < len(line) - 1:
+            box1 = line[i]['position']
+            box2 = line[i + 1]['position']
+            if abs(box1[2] - box2[0]) <= xtol:
+                new_box = {'position': [min(box1[0], box2[0]), min(box1[1], box2[1]), max(box1[2], box2[2]), max(box1[3], box2[3])],
+                        'text': line[i]['text'] + ' ' + line[i + 1]['text']}
+                line[i] = new_box
+                del line[i + 1]
+            else:
+                i += 1
+        merged_data.extend(line)
+
+    return merged_data
+
+
+def random_boxes(rng, n, width=1000, height=1000):
+    boxes = []
+    for i in range(n):
+        x1 = rng.randint(0, width)
+        y1 = rng.randint(0, height)
+        boxes.append({
+            'position': [x1, y1, x1 + rng.randint(0, 120), y1 + rng.randint(5, 30)],
+            'text': f'word{i}',
+            'font': {'family': 'Helvetica', 'size': 12},
+        })
+    return boxes
+
+
+class GroupAndMergeBoxesTestCase(unittest.TestCase):
+    """
+    Property tests checking that group_and_merge_boxes produces exactly the same output as the original implementation.
+    """
+
+    def assertSameAsReference(self, data, **kwargs):
+        self.assertEqual(group_and_merge_boxes(data, **kwargs), reference_group_and_merge_boxes(data, **kwargs))
+
+    def test_empty(self):
+        self.assertEqual(group_and_merge_boxes([]), [])
+
+    def test_invalid_boxes_are_dropped(self):
+        data = [None, {'text': 'no position'}, {'position': [0, 0, 10, 10], 'text': 'a'}]
+        self.assertSameAsReference(data)
+
+    def test_words_on_a_line_are_merged(self):
+        data = [
+            {'position': [40, 101, 60, 110], 'text': 'world'},
+            {'position': [0, 100, 30, 110], 'text': 'hello'},
+            {'position': [200, 99, 230, 110], 'text': 'far'},
+        ]
+        self.assertEqual(group_and_merge_boxes(data), [
+            {'position': [0, 100, 60, 110], 'text': 'hello world'},
+            {'position': [200, 99, 230, 110], 'text': 'far'},
+        ])
+
+    def test_random_pages(self):
+        rng = random.Random(0)
+        for trial in range(200):
+            n = rng.choice([0, 1, 2, 5, 20, 100, 300])
+            data = random_boxes(rng, n, height=rng.choice([50, 200, 1000]))
+            xtol = rng.choice([0, 5, 25, 100])
+            ytol = rng.choice([0, 1, 5, 20])
+            self.assertSameAsReference(data, xtol=xtol, ytol=ytol)
+
+    def test_ties_and_float_positions(self):
+        rng = random.Random(1)
+        for trial in range(100):
+            data = [
+                {'position': [x, y, x + w, y + 10], 'text': str(i)}
+                for i, (x, y, w) in enumerate(
+                    (rng.choice([0, 10, 10.0, 20.5]), rng.choice([0, 2.5, 5, 7.5, 10]), rng.choice([0, 5, 12.5]))
+                    for _ in range(rng.randint(0, 40))
+                )
+            ]
+            self.assertSameAsReference(data, xtol=rng.choice([0, 5, 10]), ytol=rng.choice([0, 2.5, 5]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import random
+import unittest
+
+from ocr_subnet.miner.result import OCRResult
+from ocr_subnet.utils.process import group_and_merge_boxes
+
+
+def dict_pipeline(data, min_area=10):
+    """The per-word dict post-processing which OCRResult replaces, used as an oracle."""
+    response = []
+    for i in range(len(data['text'])):
+        if data['text'][i].strip() != '':
+            x1, y1, width, height = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
+            if width * height < min_area:
+                continue
+            response.append({'position': [x1, y1, x1 + width, y1 + height], 'text': data['text'][i]})
+
+    response = group_and_merge_boxes(response)
+    return sorted(response, key=lambda item: (item['position'][1], item['position'][0]))
+
+
+def random_data(rng, n):
+    return {
+        'text': [rng.choice(['', ' ', 'a', 'word', f'w{i}']) for i in range(n)],
+        'left': [rng.randint(0, 800) for _ in range(n)],
+        'top': [rng.randint(0, 300) for _ in range(n)],
+        'width': [rng.randint(0, 60) for _ in range(n)],
+        'height': [rng.randint(0, 20) for _ in range(n)],
+    }
+
+
+class OCRResultTestCase(unittest.TestCase):
+    """
+    Tests that the columnar post-processing produces the same response as the per-word dict pipeline.
+    """
+
+    def test_empty(self):
+        data = {'text': [], 'left': [], 'top': [], 'width': [], 'height': []}
+        self.assertEqual(OCRResult.from_data(data).filter().merge().sort().to_response(), [])
+
+    def test_rescale(self):
+        data = {'text': ['a'], 'left': [10], 'top': [20], 'width': [30], 'height': [15]}
+        result = OCRResult.from_data(data).rescale(1 / 0.75)
+        self.assertEqual(result.to_response(), [{'position': [13, 27, 53, 47], 'text': 'a'}])
+
+    def test_matches_dict_pipeline(self):
+        rng = random.Random(0)
+        for trial in range(200):
+            data = random_data(rng, rng.choice([1, 5, 50, 300]))
+            result = OCRResult.from_data(data).filter().merge().sort().to_response()
+            self.assertEqual(result, dict_pipeline(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
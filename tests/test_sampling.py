@@ -0,0 +1,87 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import unittest
+
+import torch
+
+from ocr_subnet.utils.sampling import STRATEGIES, SamplingScheduler
+
+
+class SamplingSchedulerTestCase(unittest.TestCase):
+    """
+    Tests that every strategy samples distinct available uids, and that the statistics drive the weights.
+    """
+
+    def test_samples_distinct_available_uids(self):
+        available = torch.tensor([1, 3, 4, 7, 8, 9, 12])
+        for strategy in STRATEGIES:
+            sampler = SamplingScheduler(strategy, n=13)
+            uids = sampler.sample(available, 5, step=0, exclude=[3, 4]).tolist()
+            self.assertEqual(len(set(uids)), 5)
+            self.assertTrue(set(uids) <= {1, 7, 8, 9, 12})
+
+            uids = sampler.sample(available, 10, step=0, exclude=[3, 4]).tolist()
+            self.assertEqual(sorted(uids), available.tolist())
+
+    def test_record_tracks_mean_and_variance(self):
+        sampler = SamplingScheduler("uncertainty", n=2)
+        for step, reward in enumerate([0.2, 0.4, 0.9]):
+            sampler.record(torch.tensor([0]), torch.tensor([reward]), step)
+
+        self.assertEqual(sampler.counts[0].item(), 3)
+        self.assertEqual(sampler.last_step[0].item(), 2)
+        self.assertAlmostEqual(sampler.mean[0].item(), 0.5, places=5)
+        self.assertAlmostEqual((sampler.m2[0] / 2).item(), torch.tensor([0.2, 0.4, 0.9]).var().item(), places=5)
+
+    def test_weights(self):
+        sampler = SamplingScheduler("staleness", n=3)
+        sampler.record(torch.tensor([0, 1]), torch.tensor([0.5, 0.5]), step=8)
+        sampler.record(torch.tensor([1]), torch.tensor([0.5]), step=9)
+        self.assertEqual(sampler.weights(torch.arange(3), step=10).tolist(), [2.0, 1.0, 11.0])
+
+        sampler.strategy = "uncertainty"
+        weights = sampler.weights(torch.arange(3), step=10)
+        self.assertLess(weights[1], weights[2])
+
+    def test_new_first(self):
+        sampler = SamplingScheduler("new_first", n=10, min_queries=1)
+        sampler.record(torch.arange(8), torch.full((8,), 0.5), step=0)
+        uids = sampler.sample(torch.arange(10), 2, step=1).tolist()
+        self.assertEqual(sorted(uids), [8, 9])
+
+    def test_reset_and_resize(self):
+        sampler = SamplingScheduler("uniform", n=2)
+        sampler.record(torch.tensor([0, 1]), torch.tensor([0.1, 0.2]), step=0)
+        sampler.reset([1])
+        sampler.resize(4)
+        self.assertEqual(sampler.counts.tolist(), [1, 0, 0, 0])
+        self.assertEqual(sampler.last_step.tolist(), [0, -1, -1, -1])
+
+    def test_state_dict(self):
+        sampler = SamplingScheduler("uncertainty", n=2)
+        for step, reward in enumerate([0.2, 0.4, 0.9]):
+            sampler.record(torch.tensor([1]), torch.tensor([reward]), step)
+
+        restored = SamplingScheduler("uncertainty")
+        restored.seed(**sampler.state_dict())
+        for name, value in sampler.state_dict().items():
+            self.assertTrue(torch.equal(getattr(restored, name), value))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import time
+import random
+import asyncio
+import unittest
+
+import torch
+
+from types import SimpleNamespace
+
+from ocr_subnet.validator.reward import IncrementalScorer, reward_components, section_reward, sort_predictions
+from ocr_subnet.validator.stream import read_stream
+
+
+def random_section(rng):
+    x, y = rng.randint(0, 500), rng.randint(0, 700)
+    return {
+        'position': [x, y, x + rng.randint(10, 200), y + rng.randint(5, 20)],
+        'text': rng.choice(['Invoice', 'Total', '12.50', 'Due date', 'Acme Ltd']),
+        'font': {'family': rng.choice(['Times', 'Helvetica']), 'size': rng.randint(8, 14)},
+    }
+
+
+class IncrementalScorerTestCase(unittest.TestCase):
+    """
+    Tests that scoring a stream chunk by chunk matches scoring the whole response at once.
+    """
+
+    def test_matches_batch_reward(self):
+        rng = random.Random(0)
+        for n_labels, n_predictions in [(5, 5), (6, 3), (3, 7), (4, 0)]:
+            labels = [random_section(rng) for _ in range(n_labels)]
+            predictions = [random_section(rng) for _ in range(n_predictions)]
+
+            scorer = IncrementalScorer(labels)
+            for i in range(0, n_predictions, 2):
+                scorer.add(predictions[i : i + 2])
+
+            sorted_predictions = sort_predictions(labels, list(predictions))
+            expected = torch.mean(torch.FloatTensor([
+                section_reward(label, pred)['total'] for label, pred in zip(labels, sorted_predictions)
+            ])).item()
+            self.assertAlmostEqual(scorer.prediction_reward(), expected, places=5)
+
+    def test_matches_batch_reward_with_configured_alphas(self):
+        rng = random.Random(2)
+        config = SimpleNamespace(neuron=SimpleNamespace(
+            alpha_position=5.0, alpha_font=0.1, alpha_text=2.0, alpha_prediction=1.0, alpha_time=1.0, timeout=10.0
+        ))
+        validator = SimpleNamespace(config=config)
+
+        for _ in range(10):
+            labels = [random_section(rng) for _ in range(5)]
+            predictions = [random_section(rng) for _ in range(6)]
+            response = SimpleNamespace(response=list(predictions), dendrite=SimpleNamespace(process_time=2.0))
+
+            scorer = IncrementalScorer(labels, alpha_p=5.0, alpha_f=0.1, alpha_t=2.0)
+            scorer.add(predictions)
+
+            components = reward_components(validator, labels, response)
+            self.assertAlmostEqual(scorer.prediction_reward(), components['prediction'], places=5)
+            # The time reward is computed from the measured latency
+            self.assertAlmostEqual(components['time'], 0.8)
+            self.assertEqual(components['latency'], 2.0)
+
+    def test_read_stream_keeps_chunks_before_deadline(self):
+        labels = [random_section(random.Random(1)) for _ in range(3)]
+
+        async def stream():
+            yield labels[:1]
+            yield labels[1:2]
+            await asyncio.sleep(10)
+            yield labels[2:]
+
+        scorer = IncrementalScorer(labels)
+        elapsed = asyncio.run(read_stream(stream(), scorer, time.monotonic() + 0.2))
+
+        self.assertEqual(len(scorer.columns), 2)
+        self.assertAlmostEqual(elapsed, 0.2, delta=0.1)
+        self.assertAlmostEqual(scorer.prediction_reward(), 2 / 3, places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
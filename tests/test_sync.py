@@ -0,0 +1,85 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import sys
+import time
+import unittest
+
+from ocr_subnet.base.sync import ChainSync
+
+
+class FakeSubtensor:
+    def __init__(self):
+        self.block = 100
+
+    def get_current_block(self):
+        self.block += 1
+        return self.block
+
+
+class FakeNeuron:
+    def __init__(self, failures: int = 0):
+        self.subtensor = FakeSubtensor()
+        self.failures = failures
+        self.syncs = 0
+        self.should_exit = False
+
+    def sync(self):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("RPC failed")
+        self.syncs += 1
+
+
+class ChainSyncTestCase(unittest.TestCase):
+    """
+    Tests that the background sync publishes blocks and retries failed syncs.
+    """
+
+    def test_syncs_and_publishes_block(self):
+        neuron = FakeNeuron()
+        chain_sync = ChainSync(neuron, interval=0.01)
+        chain_sync.start()
+        time.sleep(0.2)
+        chain_sync.stop()
+
+        self.assertFalse(chain_sync.is_alive())
+        self.assertGreater(neuron.syncs, 1)
+        self.assertEqual(chain_sync.block, neuron.subtensor.block)
+
+    def test_retries_with_backoff(self):
+        neuron = FakeNeuron(failures=3)
+        chain_sync = ChainSync(neuron, interval=10, backoff=0.01)
+        chain_sync.start()
+        time.sleep(0.3)
+        chain_sync.stop()
+
+        self.assertEqual(neuron.syncs, 1)
+        self.assertEqual(chain_sync.failures, 0)
+
+    def test_stops_neuron_when_deregistered(self):
+        neuron = FakeNeuron()
+        neuron.sync = sys.exit
+        chain_sync = ChainSync(neuron, interval=0.01)
+        chain_sync.start()
+        chain_sync.thread.join(1)
+
+        self.assertTrue(neuron.should_exit)
+
+
+if __name__ == "__main__":
+    unittest.main()
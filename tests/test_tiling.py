@@ -0,0 +1,80 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import unittest
+
+from ocr_subnet.miner import tiling
+
+
+def words(*rows):
+    """Dict-of-lists OCR data of words given as (text, top, height), in band coordinates."""
+    return {
+        'text': [text for text, _, _ in rows],
+        'left': [10] * len(rows),
+        'top': [top for _, top, _ in rows],
+        'width': [50] * len(rows),
+        'height': [height for _, _, height in rows],
+        'conf': [90] * len(rows),
+    }
+
+
+class TilingTestCase(unittest.TestCase):
+    """
+    Tests that pages are split into overlapping bands and that words found by several bands are reported once, in page
+    coordinates.
+    """
+
+    def test_split_covers_the_page_with_overlapping_bands(self):
+        bands = tiling.split(1000, tile_height=400, overlap=64)
+
+        self.assertEqual(bands, [(0, 400), (336, 736), (672, 1000)])
+        for (_, bottom), (top, _) in zip(bands, bands[1:]):
+            self.assertEqual(bottom - top, 64)
+
+    def test_split_short_page_is_one_band(self):
+        self.assertEqual(tiling.split(300, tile_height=400, overlap=64), [(0, 300)])
+
+    def test_owned_keeps_words_centered_in_the_band(self):
+        bands = tiling.split(1000, tile_height=400, overlap=64)
+        # Band 1 owns rows 368 to 704 of the page
+        data = words(('above', 10, 20), ('inside', 100, 20), ('below', 370, 20))
+
+        result = tiling.owned(bands, 1, data)
+
+        self.assertEqual(result['text'], ['inside'])
+        self.assertEqual(result['top'], [436])
+
+    def test_merge_reports_straddling_word_once(self):
+        bands = tiling.split(1000, tile_height=400, overlap=64)
+        results = [
+            # 'whole' is at row 350 of the page and found by both bands, 'cut' is at row 390 and cut in half by band 0
+            words(('first', 100, 20), ('whole', 350, 20), ('cut', 390, 10)),
+            words(('whole', 14, 20), ('cut', 54, 20), ('second', 200, 20)),
+            words(('third', 100, 20)),
+        ]
+
+        merged = tiling.merge(bands, results)
+
+        self.assertEqual(merged['text'], ['first', 'whole', 'cut', 'second', 'third'])
+        self.assertEqual(merged['top'], [100, 350, 390, 536, 772])
+        # The cut word is kept from the band which saw all of it
+        self.assertEqual(merged['height'][2], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import random
+import unittest
+
+import torch
+
+from types import SimpleNamespace
+
+from ocr_subnet.utils.uids import available_uids, check_uid_availability, get_random_uids
+
+
+def random_metagraph(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return SimpleNamespace(
+        n=torch.tensor(n),
+        axons=[SimpleNamespace(is_serving=rng.random() < 0.8) for _ in range(n)],
+        validator_permit=torch.tensor([rng.random() < 0.3 for _ in range(n)]),
+        S=torch.tensor([rng.uniform(0, 10000) for _ in range(n)]),
+    )
+
+
+class UidsTestCase(unittest.TestCase):
+    """
+    Tests the vectorized uid availability and sampling.
+    """
+
+    def setUp(self):
+        self.neuron = SimpleNamespace(
+            metagraph=random_metagraph(500),
+            config=SimpleNamespace(neuron=SimpleNamespace(vpermit_tao_limit=4096)),
+        )
+
+    def test_matches_check_uid_availability(self):
+        metagraph = self.neuron.metagraph
+        expected = [uid for uid in range(500) if check_uid_availability(metagraph, uid, 4096)]
+        self.assertEqual(available_uids(metagraph, 4096).tolist(), expected)
+
+    def test_sampling(self):
+        available = set(available_uids(self.neuron.metagraph, 4096).tolist())
+        exclude = sorted(available)[:50]
+        uids = get_random_uids(self.neuron, k=20, exclude=exclude).tolist()
+
+        self.assertEqual(len(set(uids)), 20)
+        self.assertTrue(set(uids) <= available - set(exclude))
+
+    def test_sampling_falls_back_to_excluded_uids(self):
+        available = available_uids(self.neuron.metagraph, 4096).tolist()
+        uids = get_random_uids(self.neuron, k=len(available) + 10, exclude=available[5:]).tolist()
+        self.assertEqual(sorted(uids), available)
+
+    def test_cache_follows_metagraph(self):
+        get_random_uids(self.neuron, k=5)
+        self.assertIs(self.neuron._available_uids[0], self.neuron.metagraph)
+
+        self.neuron.metagraph = random_metagraph(100, seed=1)
+        self.assertTrue(all(uid < 100 for uid in get_random_uids(self.neuron, k=50).tolist()))
+
+
+if __name__ == "__main__":
+    unittest.main()